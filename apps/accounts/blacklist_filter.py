@@ -0,0 +1,129 @@
+"""
+Filtre de Bloom des JTI blacklistés (simplejwt ``token_blacklist``)
+
+Chaque refresh ou logout vérifie la blacklist en base. Le filtre, propre au
+processus, contient les JTI blacklistés non expirés : une réponse négative
+("sûrement pas blacklisté") évite la requête, une réponse positive est
+confirmée en base.
+
+- Le filtre est reconstruit (une requête) toutes les
+  ``JWT_BLACKLIST_FILTER_REFRESH`` secondes, à la première vérification
+  suivante.
+- Un token blacklisté par ce processus y est ajouté immédiatement.
+- Pour les autres workers, le JTI est aussi noté dans le cache partagé
+  jusqu'à leur prochaine reconstruction. Sans cache partagé (``LocMemCache``),
+  un worker ne peut pas voir les blacklistages des autres : le filtre n'est
+  alors pas utilisé et chaque vérification va en base.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+
+from apps.cache.tiered import shared_cache
+
+BLACKLIST_APP = 'rest_framework_simplejwt.token_blacklist'
+RECENT_CACHE_PREFIX = 'auth:jwt-blacklisted:'
+DEFAULT_REFRESH = 300
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+# Marge de capacité pour les ajouts entre deux reconstructions
+MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom sur un ``bytearray`` (double hachage BLAKE2b)
+    """
+
+    def __init__(self, capacity, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return ((first + index * second) % self.size for index in range(self.hash_count))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class _State:
+    lock = threading.Lock()
+    bloom = None
+    built_at = 0.0
+
+
+def enabled():
+    return apps.is_installed(BLACKLIST_APP) and shared_cache() is not None
+
+
+def refresh_interval():
+    return getattr(settings, 'JWT_BLACKLIST_FILTER_REFRESH', DEFAULT_REFRESH)
+
+
+def _blacklisted_model():
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+    return BlacklistedToken
+
+
+def rebuild():
+    """Recharge les JTI blacklistés non expirés (une requête)"""
+    jtis = list(
+        _blacklisted_model().objects.filter(
+            token__expires_at__gt=timezone.now()
+        ).values_list('token__jti', flat=True)
+    )
+    bloom = BloomFilter(
+        max(len(jtis) * 2, MIN_CAPACITY),
+        getattr(settings, 'JWT_BLACKLIST_FILTER_FALSE_POSITIVE_RATE', DEFAULT_FALSE_POSITIVE_RATE),
+    )
+    for jti in jtis:
+        bloom.add(jti)
+
+    with _State.lock:
+        _State.bloom = bloom
+        _State.built_at = time.monotonic()
+    return len(jtis)
+
+
+def _current_filter():
+    if _State.bloom is None or time.monotonic() - _State.built_at > refresh_interval():
+        rebuild()
+    return _State.bloom
+
+
+def is_blacklisted(jti):
+    """Vérification de blacklist, en base seulement si le filtre ne peut pas conclure"""
+    if enabled():
+        if jti not in _current_filter() and shared_cache().get(RECENT_CACHE_PREFIX + jti) is None:
+            return False
+    return _blacklisted_model().objects.filter(token__jti=jti).exists()
+
+
+def note_blacklisted(jti):
+    """À appeler après chaque blacklistage"""
+    if not enabled():
+        return
+    with _State.lock:
+        if _State.bloom is not None:
+            _State.bloom.add(jti)
+    # Visible des autres workers jusqu'à leur prochaine reconstruction
+    shared_cache().set(RECENT_CACHE_PREFIX + jti, True, refresh_interval() * 2)
+
+
+def reset():
+    with _State.lock:
+        _State.bloom = None
+        _State.built_at = 0.0
@@ -4,7 +4,8 @@ Middleware hybride pour gérer Django Token et JWT
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework.authtoken.models import Token
-from rest_framework import status
+
+from .token_auth import load_user
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,16 +27,13 @@ class HybridTokenAuthentication:
         try:
             # Essaie d'abord avec JWT
             if auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
                 jwt_auth = JWTAuthentication()
                 return jwt_auth.authenticate(request)
             else:
-                # Essaie avec Django Token
-                token_key = auth_header
-                token = Token.objects.get(key=token_key)
-                if token and token.user.is_active:
-                    return token.user
-                return None
+                # Essaie avec Django Token (instantané en cache, voir token_auth)
+                token_key = auth_header.split(' ')[1]
+                user = load_user(token_key)
+                return (user, Token(key=token_key, user=user))
                 
         except InvalidToken:
             logger.warning("JWT token invalide")
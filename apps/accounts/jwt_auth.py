@@ -3,10 +3,14 @@ JWT Authentication with proper security
 """
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework import status
+from django.conf import settings
 from django.utils import timezone
 import logging
 
+from .token_user import TokenUser, current_stamp
+
 logger = logging.getLogger('apps.authentication')
 
 class CustomJWTAuthentication(JWTAuthentication):
@@ -26,6 +30,9 @@ class CustomJWTAuthentication(JWTAuthentication):
     
     def get_user(self, validated_token):
         """Get user with security checks"""
+        if getattr(settings, 'JWT_STATELESS_USER', False) and 'stamp' in validated_token:
+            return self.get_token_user(validated_token)
+
         try:
             user = super().get_user(validated_token)
             
@@ -40,3 +47,27 @@ class CustomJWTAuthentication(JWTAuthentication):
         except Exception as e:
             logger.error(f"Error getting user from JWT: {str(e)}")
             raise AuthenticationFailed('Erreur d\'authentification')
+
+    def get_token_user(self, validated_token):
+        """Utilisateur allégé depuis les claims, stamp vérifié via le cache"""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+            user = TokenUser(
+                user_id,
+                validated_token.get('username', ''),
+                validated_token['role'],
+                validated_token['is_active'],
+            )
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Incomplete JWT claims: {str(e)}")
+            raise AuthenticationFailed('Token invalide ou expiré')
+
+        if not user.is_active:
+            logger.error(f"Inactive user attempted access: {user.id}")
+            raise AuthenticationFailed('Utilisateur désactivé')
+
+        if current_stamp(user.id) != validated_token['stamp']:
+            logger.warning(f"Stale security stamp for user: {user.id}")
+            raise AuthenticationFailed('Session expirée, veuillez vous reconnecter')
+
+        return user
@@ -5,18 +5,42 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework.throttling import ScopedRateThrottle
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.utils.translation import gettext_lazy as _
 import logging
 
+from apps.ratelimit.throttles import ScopedRateThrottle
 from .serializers import UserLoginSerializer
 from .models import User
+from .token_user import add_claims
+from . import blacklist_filter
 
 logger = logging.getLogger("apps.authentication")
 
 
+class FilteredRefreshToken(RefreshToken):
+    """
+    Refresh token dont la vérification de blacklist passe par le filtre de Bloom
+    """
+
+    def check_blacklist(self):
+        if blacklist_filter.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_filter.note_blacklisted(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FilteredRefreshToken
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
     JWT Login with security logging
@@ -33,7 +57,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
             user = serializer.validated_data['user']
             
             # Generate tokens
-            refresh = RefreshToken.for_user(user)
+            refresh = add_claims(FilteredRefreshToken.for_user(user), user)
             
             # Log successful login
             logger.info(f"User login successful: {user.username}")
@@ -63,6 +87,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
 
 
 class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = FilteredTokenRefreshSerializer
     throttle_classes = [ScopedRateThrottle]
     throttle_scope = "refresh"
 
@@ -84,7 +109,7 @@ def jwt_logout_view(request):
         return Response({"error": _("Refresh token requis")}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        token = RefreshToken(refresh_token)
+        token = FilteredRefreshToken(refresh_token)
         token.blacklist()
         return Response({"message": _("Déconnexion réussie")}, status=status.HTTP_200_OK)
     except Exception as e:
@@ -0,0 +1,46 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.accounts.blacklist_filter import BLACKLIST_APP
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime les refresh tokens JWT expirés (outstanding et blacklistés) par lots, "
+        "sans verrouiller les tables pendant toute la purge"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if not apps.is_installed(BLACKLIST_APP):
+            raise CommandError(f"{BLACKLIST_APP} n'est pas dans INSTALLED_APPS")
+
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+        expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+        if options['dry_run']:
+            self.stdout.write(
+                f"[dry-run] {expired.count()} token(s) expiré(s), dont "
+                f"{BlacklistedToken.objects.filter(token__in=expired).count()} blacklisté(s)"
+            )
+            return
+
+        outstanding = blacklisted = 0
+        while True:
+            ids = list(expired.order_by().values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            with transaction.atomic():
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                outstanding += OutstandingToken.objects.filter(pk__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{outstanding} token(s) expiré(s) supprimé(s), dont {blacklisted} blacklisté(s)"
+        ))
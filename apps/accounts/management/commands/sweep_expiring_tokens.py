@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.accounts.token_sweeper import DEFAULT_BATCH_SIZE, sweep_expiring_tokens, sweepable
+
+
+class Command(BaseCommand):
+    help = "Supprime par lots les tokens expirants expirés ou désactivés"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f"[dry-run] {sweepable().count()} token(s) à supprimer")
+            return
+
+        deleted = sweep_expiring_tokens(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} token(s) supprimé(s)"))
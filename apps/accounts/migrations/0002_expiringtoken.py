@@ -0,0 +1,49 @@
+# Generated by Django 5.0.6 on 2026-10-19 02:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExpiringToken",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=40, primary_key=True, serialize=False),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("expires_at", models.DateTimeField()),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="auth_tokens",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Token expirant",
+                "verbose_name_plural": "Tokens expirants",
+                "db_table": "accounts_expiring_tokens",
+                "indexes": [
+                    models.Index(
+                        fields=["expires_at"], name="accounts_ex_expires_1581c8_idx"
+                    ),
+                    models.Index(
+                        condition=models.Q(("is_active", False)),
+                        fields=["expires_at"],
+                        name="accounts_exp_tok_inactive_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -89,10 +89,15 @@ class ExpiringToken(models.Model):
         db_table = 'accounts_expiring_tokens'
         verbose_name = _('Token expirant')
         verbose_name_plural = _('Tokens expirants')
+        # key (clé primaire) et user (clé étrangère) sont déjà indexés
         indexes = [
-            models.Index(fields=['user']),
             models.Index(fields=['expires_at']),
-            models.Index(fields=['key']),
+            # Balayage des tokens révoqués (voir token_sweeper.py)
+            models.Index(
+                fields=['expires_at'],
+                name='accounts_exp_tok_inactive_idx',
+                condition=models.Q(is_active=False),
+            ),
         ]
     
     def __str__(self):
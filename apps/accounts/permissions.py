@@ -45,7 +45,7 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
         
-        return obj.user == request.user
+        return obj.user_id == request.user.pk
 
 
 class IsFinanceUser(permissions.BasePermission):
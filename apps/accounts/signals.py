@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .models import User
+from .token_auth import invalidate_token, invalidate_user
+from .token_user import forget_stamp
+
+# Champs écrits par la connexion elle-même : pas d'effet sur les droits
+IGNORED_UPDATE_FIELDS = {'last_login'}
+
+
+@receiver(post_save, sender=User, dispatch_uid='accounts_user_token_cache')
+def invalidate_user_tokens(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    """Désactivation, mot de passe ou rôle modifiés : les instantanés en cache sont périmés"""
+    if created or raw:
+        return
+    if update_fields is not None and set(update_fields) <= IGNORED_UPDATE_FIELDS:
+        return
+    _forget_user(instance.pk)
+    # Avant la validation, une autre requête lit encore l'ancienne ligne et peut la remettre en cache
+    transaction.on_commit(lambda: _forget_user(instance.pk))
+
+
+def _forget_user(user_id):
+    invalidate_user(user_id)
+    forget_stamp(user_id)
+
+
+@receiver(post_delete, sender=User, dispatch_uid='accounts_user_stamp')
+def forget_deleted_user_stamp(sender, instance, **kwargs):
+    forget_stamp(instance.pk)
+
+
+@receiver(post_delete, sender=Token, dispatch_uid='accounts_token_cache')
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
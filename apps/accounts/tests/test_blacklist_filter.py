@@ -0,0 +1,21 @@
+import uuid
+
+from django.test import SimpleTestCase
+
+from apps.accounts.blacklist_filter import BloomFilter
+
+
+class TestBloomFilter(SimpleTestCase):
+    def test_no_false_negative(self):
+        bloom = BloomFilter(1000)
+        jtis = [uuid.uuid4().hex for _ in range(1000)]
+        for jti in jtis:
+            bloom.add(jti)
+        self.assertTrue(all(jti in bloom for jti in jtis))
+
+    def test_false_positive_rate_close_to_target(self):
+        bloom = BloomFilter(1000, false_positive_rate=0.01)
+        for _ in range(1000):
+            bloom.add(uuid.uuid4().hex)
+        false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+        self.assertLess(false_positives, 300)
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+
+from apps.accounts.models import ExpiringToken, User
+from apps.accounts.token_auth import ExpiringTokenAuthentication
+from apps.accounts import token_sweeper
+from apps.accounts.token_sweeper import sweep_expiring_tokens
+from config import gunicorn
+
+
+class TestExpiringTokens(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="pharma", password="pass")
+        now = timezone.now()
+        self.valid = ExpiringToken.objects.create(key="v" * 40, user=self.user, expires_at=now + timedelta(days=1))
+        self.expired = ExpiringToken.objects.create(key="e" * 40, user=self.user, expires_at=now - timedelta(days=1))
+        for index in range(5):
+            ExpiringToken.objects.create(
+                key=f"r{index}".ljust(40, "x"), user=self.user,
+                expires_at=now + timedelta(days=1), is_active=False,
+            )
+
+    def test_sweep_deletes_expired_and_revoked_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(sweep_expiring_tokens(batch_size=2), 6)
+        self.assertEqual(list(ExpiringToken.objects.values_list("key", flat=True)), [self.valid.key])
+        # 3 lots pleins + la sélection vide finale
+        self.assertEqual(len([q for q in queries if q["sql"].startswith("DELETE")]), 3)
+
+    def test_auth_is_a_single_query(self):
+        auth = ExpiringTokenAuthentication()
+        with CaptureQueriesContext(connection) as queries:
+            user, token = auth.authenticate_credentials(self.valid.key)
+        self.assertEqual(user, self.user)
+        self.assertEqual(len(queries), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.assertRaises(AuthenticationFailed):
+                auth.authenticate_credentials(self.expired.key)
+        self.assertEqual(len(queries), 1)
+
+
+class TestPeriodicSweep(SimpleTestCase):
+    def test_started_by_gunicorn_workers_only(self):
+        # Processus de test (comme toute commande manage.py) : pas de thread
+        self.assertIsNone(token_sweeper._Sweeper.thread)
+
+        with override_settings(EXPIRING_TOKEN_SWEEP_INTERVAL=3600):
+            self.addCleanup(token_sweeper.stop_periodic_sweep)
+            gunicorn.post_worker_init(worker=None)
+            self.assertTrue(token_sweeper._Sweeper.thread.is_alive())
+
+    def test_disabled_without_interval(self):
+        with override_settings(EXPIRING_TOKEN_SWEEP_INTERVAL=0):
+            gunicorn.post_worker_init(worker=None)
+        self.assertIsNone(token_sweeper._Sweeper.thread)
@@ -0,0 +1,149 @@
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from apps.accounts import blacklist_filter
+from apps.accounts.blacklist_filter import BLACKLIST_APP, RECENT_CACHE_PREFIX
+from apps.accounts.models import User
+from apps.cache.tiered import shared_cache
+
+if apps.is_installed(BLACKLIST_APP):
+    from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    from apps.accounts.jwt_views import FilteredRefreshToken, FilteredTokenRefreshSerializer, jwt_logout_view
+
+
+@skipUnless(apps.is_installed(BLACKLIST_APP), "simplejwt non installé")
+class BlacklistTestCase(TestCase):
+    def setUp(self):
+        # Filtre actif seulement avec un cache partagé entre workers
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": directory.name,
+        }})
+        settings.enable()
+        self.addCleanup(settings.disable)
+        blacklist_filter.reset()
+        self.addCleanup(blacklist_filter.reset)
+        self.user = User.objects.create_user(username="pharma", password="pass", role=User.Role.PHARMACIEN)
+
+    def refresh(self):
+        return FilteredRefreshToken.for_user(self.user)
+
+
+class TestBlacklistFilter(BlacklistTestCase):
+    def test_negative_answer_skips_database(self):
+        jti = self.refresh()["jti"]
+        self.assertTrue(blacklist_filter.enabled())
+        self.assertFalse(blacklist_filter.is_blacklisted(jti))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(blacklist_filter.is_blacklisted(jti))
+        self.assertEqual(len(queries), 0)
+
+    def test_own_blacklisting_is_seen_immediately(self):
+        token = self.refresh()
+        self.assertFalse(blacklist_filter.is_blacklisted(token["jti"]))
+
+        token.blacklist()
+
+        self.assertTrue(blacklist_filter.is_blacklisted(token["jti"]))
+
+    def test_other_worker_blacklisting_seen_through_shared_cache(self):
+        token = self.refresh()
+        self.assertFalse(blacklist_filter.is_blacklisted(token["jti"]))
+        bloom, built_at = blacklist_filter._State.bloom, blacklist_filter._State.built_at
+
+        # Autre worker : son propre filtre, seul le cache partagé est commun
+        blacklist_filter.reset()
+        token.blacklist()
+        blacklist_filter._State.bloom, blacklist_filter._State.built_at = bloom, built_at
+        self.assertNotIn(token["jti"], bloom)
+
+        self.assertTrue(shared_cache().get(RECENT_CACHE_PREFIX + token["jti"]))
+        self.assertTrue(blacklist_filter.is_blacklisted(token["jti"]))
+
+        # Sans la clé partagée, le filtre n'est à jour qu'après reconstruction
+        shared_cache().delete(RECENT_CACHE_PREFIX + token["jti"])
+        self.assertFalse(blacklist_filter.is_blacklisted(token["jti"]))
+        blacklist_filter.rebuild()
+        self.assertTrue(blacklist_filter.is_blacklisted(token["jti"]))
+
+    def test_process_local_cache_always_checks_database(self):
+        token = self.refresh()
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            self.assertFalse(blacklist_filter.enabled())
+            with CaptureQueriesContext(connection) as queries:
+                self.assertFalse(blacklist_filter.is_blacklisted(token["jti"]))
+            self.assertEqual(len(queries), 1)
+
+
+class TestRotationAndLogout(BlacklistTestCase):
+    def test_rotation_blacklists_old_token_and_rejects_reuse(self):
+        # api_settings importé tel quel par simplejwt : override_settings sans effet
+        for name in ("ROTATE_REFRESH_TOKENS", "BLACKLIST_AFTER_ROTATION"):
+            patcher = mock.patch.object(api_settings, name, True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        old = str(self.refresh())
+
+        serializer = FilteredTokenRefreshSerializer(data={"refresh": old})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        rotated = serializer.validated_data["refresh"]
+        self.assertNotEqual(rotated, old)
+        self.assertTrue(BlacklistedToken.objects.filter(token__token=old).exists())
+
+        # Réutilisation : TokenError, converti en 401 par TokenRefreshView
+        with self.assertRaises(TokenError):
+            FilteredTokenRefreshSerializer(data={"refresh": old}).is_valid()
+
+        # Le nouveau refresh token reste utilisable
+        self.assertFalse(blacklist_filter.is_blacklisted(FilteredRefreshToken(rotated)["jti"]))
+
+    def test_logout_blacklists_refresh_token(self):
+        token = self.refresh()
+        factory = APIRequestFactory()
+
+        r = jwt_logout_view(factory.post("/logout/", {"refresh": str(token)}, format="json"))
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(blacklist_filter.is_blacklisted(token["jti"]))
+
+        r = jwt_logout_view(factory.post("/logout/", {"refresh": str(token)}, format="json"))
+        self.assertEqual(r.status_code, 401)
+        r = jwt_logout_view(factory.post("/logout/", {}, format="json"))
+        self.assertEqual(r.status_code, 400)
+
+
+class TestPruneJwtTokens(BlacklistTestCase):
+    def test_prunes_only_expired_tokens(self):
+        tokens = [self.refresh() for _ in range(4)]
+        for token in tokens[:2]:
+            token.blacklist()
+        expired = [tokens[0]["jti"], tokens[2]["jti"]]
+        OutstandingToken.objects.filter(jti__in=expired).update(expires_at=timezone.now() - timedelta(days=1))
+
+        out = StringIO()
+        call_command("prune_jwt_tokens", dry_run=True, stdout=out)
+        self.assertIn("2 token(s) expiré(s), dont 1 blacklisté(s)", out.getvalue())
+        self.assertEqual(OutstandingToken.objects.count(), 4)
+
+        out = StringIO()
+        call_command("prune_jwt_tokens", batch_size=1, stdout=out)
+        self.assertIn("2 token(s) expiré(s) supprimé(s), dont 1 blacklisté(s)", out.getvalue())
+        self.assertEqual(
+            set(OutstandingToken.objects.values_list("jti", flat=True)), {tokens[1]["jti"], tokens[3]["jti"]}
+        )
+        self.assertEqual(list(BlacklistedToken.objects.values_list("token__jti", flat=True)), [tokens[1]["jti"]])
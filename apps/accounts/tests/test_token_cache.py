@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from apps.accounts import token_auth
+from apps.accounts.models import User
+
+
+class TestCachedTokenAuthentication(APITestCase):
+    def setUp(self):
+        cache.clear()
+        token_auth._snapshots.clear_local()
+        self.user = User.objects.create_user(username="compta", password="pass", role=User.Role.COMPTABLE)
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def _check_auth(self):
+        return self.client.get(reverse("accounts:check-auth"))
+
+    def test_steady_state_costs_no_query(self):
+        self.assertEqual(self._check_auth().status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            r = self._check_auth()
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["user"]["role"], User.Role.COMPTABLE)
+        self.assertEqual(len(queries), 0)
+
+    def test_deactivation_revokes_immediately(self):
+        self._check_auth()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self._check_auth().status_code, 401)
+
+    def test_password_change_invalidates_snapshot(self):
+        self._check_auth()
+        self.user.set_password("nouveau")
+        self.user.save()
+        self.assertIsNone(token_auth.get_cached(self.token.key))
+
+    def test_logout_revokes_token(self):
+        self._check_auth()
+        self.assertEqual(self.client.post(reverse("accounts:logout")).status_code, 200)
+        self.assertEqual(self._check_auth().status_code, 401)
+
+    def test_cached_user_save_does_not_touch_password(self):
+        self._check_auth()
+        r = self.client.patch(reverse("accounts:me"), {"phone": "0600000000"}, format="json")
+        self.assertEqual(r.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("pass"))
+        self.assertEqual(self.user.phone, "0600000000")
+
+    def test_snapshot_read_before_deactivation_is_not_cached(self):
+        remember = token_auth.remember
+
+        def deactivate_meanwhile(*args):
+            # Token et utilisateur déjà lus : la désactivation arrive avant la mise en cache
+            self.user.is_active = False
+            self.user.save()
+            return remember(*args)
+
+        with mock.patch.object(token_auth, "remember", deactivate_meanwhile):
+            self.assertEqual(self._check_auth().status_code, 200)
+        self.assertIsNone(token_auth.get_cached(self.token.key))
+        self.assertEqual(self._check_auth().status_code, 401)
+
+    def test_snapshot_cached_before_commit_is_invalidated_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.is_active = False
+            self.user.save()
+            # Autre requête, ancienne ligne encore visible : instantané remis en cache
+            active = User(**{field.attname: getattr(self.user, field.attname) for field in User._meta.concrete_fields})
+            active.is_active = True
+            token_auth.remember(self.token.key, active, token_auth.version(self.token.key))
+        self.assertIsNotNone(token_auth.get_cached(self.token.key))
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self._check_auth().status_code, 401)
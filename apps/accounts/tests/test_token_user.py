@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts import token_user
+from apps.accounts.models import User
+from apps.accounts.token_user import TokenUser, add_claims, current_stamp, get_full_user
+
+
+class TestSecurityStamp(TestCase):
+    def setUp(self):
+        token_user._stamps.clear_local()
+        self.user = User.objects.create_user(username="pharma", password="pass", role=User.Role.PHARMACIEN)
+        self.claims = add_claims({}, self.user)
+
+    def test_stamp_is_cached(self):
+        self.assertEqual(current_stamp(self.user.pk), self.claims["stamp"])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(current_stamp(self.user.pk), self.claims["stamp"])
+        self.assertEqual(len(queries), 0)
+
+    def test_password_change_and_deactivation_change_stamp(self):
+        current_stamp(self.user.pk)
+        self.user.set_password("nouveau")
+        self.user.save()
+        self.assertNotEqual(current_stamp(self.user.pk), self.claims["stamp"])
+
+        stamp = current_stamp(self.user.pk)
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertNotEqual(current_stamp(self.user.pk), stamp)
+
+    def test_last_login_update_keeps_stamp(self):
+        self.user.last_login = self.user.date_joined
+        self.user.save(update_fields=["last_login"])
+        self.assertEqual(current_stamp(self.user.pk), self.claims["stamp"])
+
+    def test_deleted_user_has_no_stamp(self):
+        user_id = self.user.pk
+        current_stamp(user_id)
+        self.user.delete()
+        self.assertIsNone(current_stamp(user_id))
+
+    def test_stamp_read_before_password_change_is_not_cached(self):
+        stamp = token_user.security_stamp
+
+        def change_password_meanwhile(*row):
+            # Ligne déjà lue : le mot de passe change avant la mise en cache
+            self.user.set_password("nouveau")
+            self.user.save()
+            return stamp(*row)
+
+        with mock.patch.object(token_user, "security_stamp", change_password_meanwhile):
+            self.assertEqual(current_stamp(self.user.pk), self.claims["stamp"])
+        self.assertNotEqual(current_stamp(self.user.pk), self.claims["stamp"])
+
+
+class TestTokenUser(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="compta", password="pass", role=User.Role.COMPTABLE)
+        claims = add_claims({}, self.user)
+        self.token_user = TokenUser(str(self.user.pk), claims["username"], claims["role"], claims["is_active"])
+
+    def test_permission_attributes_need_no_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.token_user.is_comptable)
+            self.assertFalse(self.token_user.is_admin)
+            self.assertEqual(self.token_user.get_role_display(), self.user.get_role_display())
+            self.assertEqual(self.token_user, self.user)
+        self.assertEqual(len(queries), 0)
+
+    def test_full_model_loaded_on_demand(self):
+        self.assertEqual(self.token_user.date_joined, self.user.date_joined)
+        self.assertIsInstance(get_full_user(self.token_user), User)
@@ -1,15 +1,16 @@
 """
 Custom throttling classes for authentication endpoints
 """
-from rest_framework.throttling import SimpleRateThrottle
 from rest_framework.response import Response
 from django.core.cache import cache
 import logging
 
+from apps.ratelimit.throttles import GCRARateThrottle
+
 logger = logging.getLogger(__name__)
 
 
-class LoginRateThrottle(SimpleRateThrottle):
+class LoginRateThrottle(GCRARateThrottle):
     """
     Throttle for login attempts to prevent brute force
     """
@@ -48,7 +49,7 @@ class LoginRateThrottle(SimpleRateThrottle):
         return 'unknown'
 
 
-class AdminRateThrottle(SimpleRateThrottle):
+class AdminRateThrottle(GCRARateThrottle):
     """
     Stricter throttling for admin endpoints
     """
@@ -61,7 +62,7 @@ class AdminRateThrottle(SimpleRateThrottle):
         self.duration = 3600
 
 
-class SensitiveOperationThrottle(SimpleRateThrottle):
+class SensitiveOperationThrottle(GCRARateThrottle):
     """
     Very strict throttling for sensitive operations
     """
@@ -0,0 +1,159 @@
+"""
+Authentification par Token avec cache (LRU du processus + cache Django partagé)
+
+``TokenAuthentication`` joint ``authtoken_token`` et ``accounts_users`` à
+chaque requête. Ici, un instantané de l'utilisateur (toutes les colonnes
+sauf le mot de passe) est conservé par token :
+
+- dans un LRU propre au processus, pendant ``AUTH_TOKEN_CACHE_LOCAL_TTL``
+  secondes (délai maximal de révocation vu par les *autres* workers) ;
+- dans le cache Django partagé, pendant ``AUTH_TOKEN_CACHE_TTL`` secondes
+  (seulement si ce cache est réellement partagé entre workers : avec
+  ``LocMemCache``, une invalidation ne serait vue que par un seul processus).
+
+Les entrées sont supprimées explicitement à la déconnexion, à la
+suppression du token et à chaque modification de l'utilisateur
+(désactivation, changement de mot de passe ou de rôle), voir ``signals.py``.
+Chaque suppression change la génération du token : une requête qui a lu la
+base avant l'invalidation ne remet pas en cache l'instantané révoqué
+(``version`` lue avant la requête, vérifiée par ``remember``).
+Les clés de cache sont des empreintes SHA-256 : le token n'y figure jamais.
+Les deux niveaux sont ceux de ``apps.cache.tiered.TieredCache``.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from apps.cache.tiered import MISSING, TieredCache
+
+from .models import ExpiringToken, User
+
+CACHE_NAME = 'auth:token'
+DEFAULT_TTL = 300
+DEFAULT_LOCAL_TTL = 2
+DEFAULT_LOCAL_SIZE = 1024
+
+# Le mot de passe n'est jamais mis en cache : champ différé sur l'instance reconstruite
+SNAPSHOT_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields if field.attname != 'password'
+)
+
+
+def local_ttl():
+    return getattr(settings, 'AUTH_TOKEN_CACHE_LOCAL_TTL', DEFAULT_LOCAL_TTL)
+
+
+def shared_ttl():
+    return getattr(settings, 'AUTH_TOKEN_CACHE_TTL', DEFAULT_TTL)
+
+
+_snapshots = TieredCache(
+    CACHE_NAME,
+    ttl=shared_ttl,
+    local_ttl=local_ttl,
+    local_size=getattr(settings, 'AUTH_TOKEN_CACHE_LOCAL_SIZE', DEFAULT_LOCAL_SIZE),
+    versioned=True,
+)
+
+
+def cache_key(token_key):
+    return hashlib.sha256(token_key.encode()).hexdigest()
+
+
+def snapshot(user):
+    """Valeurs des colonnes de l'utilisateur (sans le mot de passe)"""
+    return tuple(getattr(user, attname) for attname in SNAPSHOT_FIELDS)
+
+
+def user_from_snapshot(values):
+    """Instance ``User`` neuve ; ``save()`` n'écrit que les champs chargés"""
+    return User.from_db(DEFAULT_DB_ALIAS, SNAPSHOT_FIELDS, values)
+
+
+def get_cached(token_key):
+    """Instantané en cache pour ce token, ou ``None``"""
+    return _snapshots.get(cache_key(token_key))
+
+
+def version(token_key):
+    """Génération du token, à lire avant de charger l'utilisateur"""
+    return _snapshots.version(cache_key(token_key))
+
+
+def remember(token_key, user, version=MISSING):
+    """Met l'instantané en cache, sauf si le token a été invalidé depuis ``version``"""
+    return _snapshots.set(cache_key(token_key), snapshot(user), version=version)
+
+
+def invalidate_token(token_key):
+    _snapshots.delete(cache_key(token_key))
+
+
+def invalidate_user(user_id):
+    """Invalide les tokens d'un utilisateur (appelé sur modification du compte)"""
+    for token_key in Token.objects.filter(user_id=user_id).values_list('key', flat=True):
+        invalidate_token(token_key)
+
+
+def load_user(token_key):
+    """
+    Utilisateur actif du token, depuis le cache ou la base.
+
+    Lève ``AuthenticationFailed`` comme ``TokenAuthentication``.
+    """
+    values = get_cached(token_key)
+    if values is not None:
+        return user_from_snapshot(values)
+
+    generation = version(token_key)
+    try:
+        token = Token.objects.select_related('user').get(key=token_key)
+    except Token.DoesNotExist:
+        raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+    if not token.user.is_active:
+        raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+    return user_from_snapshot(remember(token_key, token.user, generation))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    ``TokenAuthentication`` sans requête SQL tant que l'instantané est en cache
+    """
+
+    def authenticate_credentials(self, key):
+        user = load_user(key)
+        return (user, Token(key=key, user=user))
+
+
+class ExpiringTokenAuthentication(TokenAuthentication):
+    """
+    Authentification par ``ExpiringToken`` : expiration et révocation sont
+    vérifiées dans la même requête que la recherche par clé (clé primaire)
+
+    Optionnelle : absente de ``DEFAULT_AUTHENTICATION_CLASSES`` (la connexion
+    émet des ``Token`` DRF) ; à déclarer sur les vues qui acceptent des
+    ``ExpiringToken``.
+    """
+    model = ExpiringToken
+
+    def authenticate_credentials(self, key):
+        token = (
+            ExpiringToken.objects.select_related('user')
+            .filter(key=key, is_active=True, expires_at__gt=timezone.now())
+            .first()
+        )
+        if token is None:
+            raise exceptions.AuthenticationFailed('Token invalide ou expiré')
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
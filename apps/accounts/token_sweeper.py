@@ -0,0 +1,97 @@
+"""
+Purge des ``ExpiringToken`` expirés ou révoqués
+
+Les suppressions se font par lots de clés primaires (``EXPIRING_TOKEN_SWEEP_BATCH_SIZE``),
+chacun dans sa propre transaction courte : une purge importante ne verrouille
+jamais la table d'un bloc.
+
+La purge est lancée par la commande ``sweep_expiring_tokens`` (cron) ou, si
+``EXPIRING_TOKEN_SWEEP_INTERVAL`` est positif, par un thread démon des workers
+gunicorn (hook ``post_worker_init`` de ``config/gunicorn.py``) toutes les
+``EXPIRING_TOKEN_SWEEP_INTERVAL`` secondes. Les autres processus (commandes
+``manage.py``, tests, serveur de développement) ne démarrent pas le thread.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ExpiringToken
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def sweepable(now=None):
+    """Tokens expirés ou désactivés"""
+    now = timezone.now() if now is None else now
+    return ExpiringToken.objects.filter(Q(expires_at__lte=now) | Q(is_active=False))
+
+
+def sweep_expiring_tokens(batch_size=None, now=None):
+    """Supprime les tokens expirés ou désactivés ; retourne le nombre de tokens supprimés"""
+    batch_size = batch_size or getattr(settings, 'EXPIRING_TOKEN_SWEEP_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    # Borne figée au début : les tokens qui expirent pendant la purge attendent la suivante
+    queryset = sweepable(now).order_by()
+
+    deleted = 0
+    while True:
+        keys = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not keys:
+            break
+        with transaction.atomic():
+            deleted += ExpiringToken.objects.filter(pk__in=keys).delete()[0]
+        if len(keys) < batch_size:
+            break
+    return deleted
+
+
+class _Sweeper:
+    lock = threading.Lock()
+    thread = None
+    stop = threading.Event()
+
+
+def _sweep_forever(interval):
+    while not _Sweeper.stop.wait(interval):
+        try:
+            deleted = sweep_expiring_tokens()
+            if deleted:
+                logger.info(f"{deleted} expiring token(s) swept")
+        except Exception:
+            logger.exception("Expiring token sweep failed")
+        finally:
+            connections.close_all()
+
+
+def start_periodic_sweep():
+    """
+    Démarre le thread de purge du processus (une seule fois),
+    si ``EXPIRING_TOKEN_SWEEP_INTERVAL`` est positif
+    """
+    interval = getattr(settings, 'EXPIRING_TOKEN_SWEEP_INTERVAL', 0)
+    if interval <= 0:
+        return None
+    with _Sweeper.lock:
+        if _Sweeper.thread is None:
+            _Sweeper.stop.clear()
+            _Sweeper.thread = threading.Thread(
+                target=_sweep_forever,
+                args=(interval,),
+                name="expiring-token-sweeper",
+                daemon=True,
+            )
+            _Sweeper.thread.start()
+    return _Sweeper.thread
+
+
+def stop_periodic_sweep():
+    with _Sweeper.lock:
+        if _Sweeper.thread is not None:
+            _Sweeper.stop.set()
+            _Sweeper.thread.join()
+            _Sweeper.thread = None
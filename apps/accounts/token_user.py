@@ -0,0 +1,124 @@
+"""
+Utilisateur allégé issu des claims JWT et "security stamp"
+
+En mode ``JWT_STATELESS_USER``, le rôle, ``is_active`` et un security stamp
+sont embarqués dans le token d'accès : les permissions s'évaluent sur un
+``TokenUser`` sans lire ``accounts_users``. Le modèle complet n'est chargé
+que si une vue accède à un autre attribut (ou via ``get_full_user``).
+
+Le stamp est une empreinte (HMAC de la SECRET_KEY) du mot de passe haché,
+du rôle et de ``is_active`` : il change à chaque changement de mot de passe,
+désactivation ou changement de rôle, sans colonne supplémentaire. Le stamp
+courant d'un utilisateur est mis en cache (mêmes niveaux et mêmes durées
+que ``token_auth``) et oublié par ``signals.py`` à chaque modification ; un
+stamp lu en base avant l'oubli n'est pas remis en cache (génération).
+"""
+import uuid
+
+from django.utils.crypto import salted_hmac
+
+from apps.cache.tiered import TieredCache
+
+from .models import User
+from .token_auth import DEFAULT_LOCAL_SIZE, local_ttl, shared_ttl
+
+STAMP_SALT = 'apps.accounts.token_user.security_stamp'
+# Utilisateur supprimé : valeur mise en cache à la place du stamp
+MISSING = ''
+
+_stamps = TieredCache(
+    'auth:stamp', ttl=shared_ttl, local_ttl=local_ttl, local_size=DEFAULT_LOCAL_SIZE,
+    versioned=True,
+)
+
+
+def security_stamp(password, role, is_active):
+    return salted_hmac(STAMP_SALT, f"{password}:{role}:{is_active}").hexdigest()[:32]
+
+
+def user_stamp(user):
+    return security_stamp(user.password, user.role, user.is_active)
+
+
+def current_stamp(user_id):
+    """Stamp courant de l'utilisateur (cache, sinon une requête), ``None`` s'il n'existe plus"""
+    stamp = _stamps.get(user_id)
+    if stamp is None:
+        version = _stamps.version(user_id)
+        row = User.objects.filter(pk=user_id).values_list('password', 'role', 'is_active').first()
+        stamp = _stamps.set(user_id, security_stamp(*row) if row else MISSING, version=version)
+    return stamp or None
+
+
+def forget_stamp(user_id):
+    _stamps.delete(user_id)
+
+
+def add_claims(token, user):
+    """Claims nécessaires au ``TokenUser`` (copiés du refresh vers l'access token)"""
+    token['username'] = user.username
+    token['role'] = user.role
+    token['is_active'] = user.is_active
+    token['stamp'] = user_stamp(user)
+    return token
+
+
+class TokenUser:
+    """
+    Utilisateur authentifié reconstruit depuis les claims du token.
+
+    Expose ce qu'utilisent les permissions (``is_admin``, ``is_comptable``,
+    ``is_pharmacien``...) ; tout autre attribut charge le ``User`` complet.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id, username, role, is_active):
+        self.pk = self.id = user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(str(user_id))
+        self.username = username
+        self.role = role
+        self.is_active = is_active
+        self._user = None
+
+    def __str__(self):
+        return self.username
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, User)):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    @property
+    def is_admin(self):
+        return self.role == User.Role.ADMIN
+
+    @property
+    def is_pharmacien(self):
+        return self.role == User.Role.PHARMACIEN
+
+    @property
+    def is_comptable(self):
+        return self.role == User.Role.COMPTABLE
+
+    def get_role_display(self):
+        return User.Role(self.role).label
+
+    @property
+    def user(self):
+        """``User`` complet, chargé au premier besoin"""
+        if self._user is None:
+            self._user = User.objects.get(pk=self.pk)
+        return self._user
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+
+def get_full_user(user):
+    """Modèle ``User`` pour les vues qui l'enregistrent ou le sérialisent"""
+    return user.user if isinstance(user, TokenUser) else user
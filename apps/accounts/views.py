@@ -16,6 +16,8 @@ from .serializers import (
 )
 from .permissions import IsAdminUser, IsFinanceUser
 from .throttles import LoginRateThrottle
+from .token_auth import invalidate_token
+from .token_user import get_full_user
 
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -105,6 +107,9 @@ class UserLogoutView(generics.GenericAPIView):
         responses={200: OpenApiTypes.OBJECT}
     )
     def post(self, request, *args, **kwargs):
+        if request.auth is not None and hasattr(request.auth, 'key'):
+            invalidate_token(request.auth.key)
+
         try:
             # Supprimer le token
             request.user.auth_token.delete()
@@ -127,7 +132,7 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        return self.request.user
+        return get_full_user(self.request.user)
     
     @extend_schema(
         summary="Obtenir le profil utilisateur",
@@ -0,0 +1,81 @@
+"""
+Vues DRF asynchrones (DRF 3.15 n'en fournit pas)
+
+``AsyncAPIView`` garde le cycle de ``APIView`` : authentification,
+permissions et throttles (code synchrone, accès base ou cache) passent par
+``sync_to_async`` ; seul le handler est une coroutine, qui utilise l'ORM
+asynchrone (``aaggregate``, ``acount``, ``async for``).
+
+Sous ASGI (profil ``asgi`` de ``config/gunicorn.py``), une requête de
+rapport lente libère la boucle pendant ses requêtes SQL au lieu d'occuper
+un worker entier. Sous WSGI, Django exécute ces vues dans une boucle
+propre à la requête : elles restent utilisables dans les deux profils.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def async_api_view(http_method_names=None):
+    """
+    Équivalent de ``@api_view`` pour une fonction ``async def``
+    (les décorateurs ``permission_classes`` etc. s'appliquent de la même façon)
+    """
+    http_method_names = ['GET'] if http_method_names is None else http_method_names
+
+    def decorator(func):
+        assert asyncio.iscoroutinefunction(func), '@async_api_view attend une fonction async def'
+
+        WrappedAsyncAPIView = type('WrappedAsyncAPIView', (AsyncAPIView,), {'__doc__': func.__doc__})
+        WrappedAsyncAPIView.http_method_names = [
+            method.lower() for method in set(http_method_names) | {'options'}
+        ]
+
+        async def handler(self, *args, **kwargs):
+            return await func(*args, **kwargs)
+
+        for method in http_method_names:
+            setattr(WrappedAsyncAPIView, method.lower(), handler)
+
+        WrappedAsyncAPIView.__name__ = func.__name__
+        WrappedAsyncAPIView.__module__ = func.__module__
+
+        for attr in (
+            'renderer_classes', 'parser_classes', 'authentication_classes',
+            'throttle_classes', 'permission_classes', 'schema',
+        ):
+            setattr(WrappedAsyncAPIView, attr, getattr(func, attr, getattr(APIView, attr)))
+
+        return WrappedAsyncAPIView.as_view()
+
+    return decorator
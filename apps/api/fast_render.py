@@ -0,0 +1,219 @@
+"""
+Rendu rapide des listes, sans la mécanique ModelSerializer
+
+Un ``FastRowRenderer`` est compilé une fois par serializer de liste : pour
+chaque champ il retient le chemin ORM à lire avec ``.values_list()`` et un
+convertisseur dédié (UUID → str, Decimal → str, date → isoformat...). Les
+lignes sont ensuite construites directement depuis les tuples, sans
+instancier de modèles. La sortie est identique à celle du serializer,
+y compris l'omission des champs ``source='relation.champ'`` quand la
+relation est nulle.
+"""
+import decimal
+
+from django.conf import settings
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .sparse_fields import model_path
+
+
+FAST_RENDER_PARAMETER = OpenApiParameter(
+    name='render',
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    required=False,
+    enum=['fast', 'serializer'],
+    description="'fast' : rendu direct depuis les tuples SQL (sortie identique au serializer).",
+)
+
+
+class UnsupportedField(Exception):
+    """Champ de serializer sans équivalent colonne (propriété, méthode...)"""
+
+
+def _decimal_converter(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    rounding = field.rounding
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+
+    def convert(value):
+        return '{:f}'.format(value.quantize(exponent, rounding=rounding, context=context))
+
+    return convert
+
+
+def _date_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+    if output_format is None or output_format.lower() != 'iso-8601':
+        return field.to_representation
+    return lambda value: value.isoformat()
+
+
+class _DateTimeConverter:
+    """
+    Convertisseur DateTimeField ISO 8601, lié une fois par rendu au fuseau courant
+    (même logique que ``DateTimeField.enforce_timezone`` pour les valeurs aware)
+    """
+
+    def __init__(self, field):
+        self.to_representation = field.to_representation
+        self.field_timezone = getattr(field, 'timezone', None)
+
+    def bind(self, current_timezone):
+        to_representation = self.to_representation
+        target = self.field_timezone or current_timezone
+
+        def convert(value):
+            if value.tzinfo is None:
+                return to_representation(value)
+            value = value.astimezone(target).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+
+        return convert
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != 'iso-8601' or not settings.USE_TZ:
+        return field.to_representation
+    return _DateTimeConverter(field)
+
+
+def _converter_for(field):
+    """Convertisseur précompilé d'un champ DRF (``None`` = valeur telle quelle)"""
+    if isinstance(field, serializers.UUIDField):
+        if field.uuid_format == 'hex_verbose':
+            return str
+        return field.to_representation
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, serializers.DateField):
+        return _date_converter(field)
+    if isinstance(field, (serializers.CharField, serializers.ChoiceField)):
+        return None
+    if isinstance(field, (serializers.IntegerField, serializers.BooleanField)):
+        return None
+    if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+        return None
+    raise UnsupportedField(field.field_name)
+
+
+class FastRowRenderer:
+    """
+    Rendu d'un queryset en liste de dicts compatible avec ``serializer_class``
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class()
+        model = serializer.Meta.model
+
+        self.paths = []
+        self.plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+
+            path = model_path(model, field.source)
+            if path is None:
+                raise UnsupportedField(name)
+
+            # Relation nullable traversée : DRF omet la clé si elle est nulle
+            guard = None
+            if '__' in path:
+                relation = path.split('__')[0]
+                if model._meta.get_field(relation).null:
+                    guard = self._column(relation)
+
+            self.plan.append((name, self._column(path), _converter_for(field), guard))
+
+    def _column(self, path):
+        if path not in self.paths:
+            self.paths.append(path)
+        return self.paths.index(path)
+
+    def rows(self, queryset):
+        """Queryset de tuples correspondant au plan"""
+        return queryset.values_list(*self.paths)
+
+    def render(self, rows):
+        current_timezone = timezone.get_current_timezone()
+        plan = [
+            (name, index, convert.bind(current_timezone) if isinstance(convert, _DateTimeConverter) else convert, guard)
+            for name, index, convert, guard in self.plan
+        ]
+        rendered = []
+        append = rendered.append
+        for row in rows:
+            item = {}
+            for name, index, convert, guard in plan:
+                if guard is not None and row[guard] is None:
+                    continue
+                value = row[index]
+                if value is None or convert is None:
+                    item[name] = value
+                else:
+                    item[name] = convert(value)
+            append(item)
+        return rendered
+
+
+_renderers = {}
+
+
+def get_renderer(serializer_class, fields=None):
+    """Renderer compilé (mis en cache), ou ``None`` si le serializer n'est pas éligible"""
+    key = (serializer_class, frozenset(fields) if fields is not None else None)
+    if key not in _renderers:
+        try:
+            _renderers[key] = FastRowRenderer(serializer_class, fields)
+        except UnsupportedField:
+            _renderers[key] = None
+    return _renderers[key]
+
+
+class FastListMixin:
+    """
+    Mixin de ViewSet : rendu rapide de l'action ``list``.
+
+    Activé par ``?render=fast`` ou globalement par ``API_FAST_LIST_RENDERING``.
+    Compatible avec ``SparseFieldsetMixin`` (``?fields=``).
+    """
+    fast_render_param = 'render'
+
+    def fast_rendering_enabled(self):
+        requested = self.request.query_params.get(self.fast_render_param)
+        if requested is not None:
+            return requested == 'fast'
+        return getattr(settings, 'API_FAST_LIST_RENDERING', False)
+
+    def fast_list(self, queryset):
+        """Response rendue sans serializer, ou ``None`` pour le chemin standard"""
+        if not self.fast_rendering_enabled():
+            return None
+
+        fields = self.get_sparse_fields() if hasattr(self, 'get_sparse_fields') else None
+        renderer = get_renderer(self.get_serializer_class(), fields)
+        if renderer is None:
+            return None
+
+        rows = renderer.rows(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(renderer.render(page))
+
+        return Response(renderer.render(rows))
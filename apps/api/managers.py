@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class ActiveQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(is_active=True)
+
+
+class ActiveManager(models.Manager.from_queryset(ActiveQuerySet)):
+    """
+    Manager restreint aux lignes ``is_active``.
+
+    Le filtre est exactement la condition des index partiels ``WHERE is_active``,
+    ce qui permet à PostgreSQL de les utiliser.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
@@ -0,0 +1,159 @@
+"""
+Sparse fieldsets pour les endpoints de liste (?fields=)
+
+``?fields=id,invoice_number,net_to_pay`` ne renvoie que ces champs ;
+``?fields=-notes,-created_at`` renvoie tout sauf ceux-là. La même sélection
+pilote ``.only()`` / ``.defer()`` sur le queryset pour que les colonnes non
+affichées (TEXT notamment) ne soient jamais lues depuis PostgreSQL.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+
+
+SPARSE_FIELDS_PARAMETER = OpenApiParameter(
+    name='fields',
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    required=False,
+    description=(
+        "Champs à renvoyer, séparés par des virgules (ex: id,invoice_number). "
+        "Préfixer par '-' pour exclure un champ (ex: -notes,-created_at)."
+    ),
+)
+
+
+def model_path(model, source):
+    """
+    Chemin ORM (``supplier__name``) d'une source de serializer (``supplier.name``).
+
+    Retourne ``None`` si la source n'est pas une colonne (propriété, méthode, '*').
+    """
+    if not source or source == '*':
+        return None
+
+    parts = source.split('.')
+    current = model
+    for index, part in enumerate(parts):
+        try:
+            field = current._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete:
+            return None
+        if index < len(parts) - 1:
+            if not (field.many_to_one or field.one_to_one):
+                return None
+            current = field.related_model
+    return '__'.join(parts)
+
+
+def _keep_select_related(queryset, relations):
+    """Retire du select_related les jointures qu'aucun champ demandé n'utilise"""
+    selected = queryset.query.select_related
+    if not isinstance(selected, dict):
+        return queryset
+
+    keep = [name for name in selected if name in relations]
+    queryset = queryset.select_related(None)
+    if keep:
+        queryset = queryset.select_related(*keep)
+    return queryset
+
+
+def restrict_queryset(queryset, serializer_fields, included):
+    """
+    Limite les colonnes chargées aux champs de serializer ``included``.
+
+    Si tous les champs demandés correspondent à des colonnes, on utilise
+    ``.only()`` ; sinon (propriétés calculées), on se contente de ``.defer()``
+    les colonnes des champs écartés.
+    """
+    model = queryset.model
+    included_paths = set()
+    resolvable = True
+    for name in included:
+        path = model_path(model, serializer_fields[name].source)
+        if path is None:
+            resolvable = False
+        else:
+            included_paths.add(path)
+
+    if resolvable:
+        relations = {path.split('__')[0] for path in included_paths if '__' in path}
+        queryset = _keep_select_related(queryset, relations)
+        return queryset.only(model._meta.pk.name, *included_paths)
+
+    selected = queryset.query.select_related
+    deferred = set()
+    for name, field in serializer_fields.items():
+        if name in included:
+            continue
+        path = model_path(model, field.source)
+        if path is None or path in included_paths or path == model._meta.pk.name:
+            continue
+        if '__' in path and not (isinstance(selected, dict) and path.split('__')[0] in selected):
+            continue
+        deferred.add(path)
+
+    return queryset.defer(*deferred) if deferred else queryset
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin de ViewSet ajoutant le paramètre ``?fields=`` aux actions de liste
+    """
+    sparse_fields_param = 'fields'
+    sparse_fields_actions = ('list',)
+
+    def get_sparse_fields(self):
+        """Ensemble des champs demandés, ou ``None`` si pas de restriction"""
+        if hasattr(self, '_sparse_fields'):
+            return self._sparse_fields
+
+        self._sparse_fields = None
+        raw = self.request.query_params.get(self.sparse_fields_param) if self.request else None
+        if not raw or self.action not in self.sparse_fields_actions:
+            return None
+
+        available = list(self.get_serializer_class()().fields)
+        names = [name.strip() for name in raw.split(',') if name.strip()]
+        excluded = {name[1:] for name in names if name.startswith('-')}
+        requested = {name for name in names if not name.startswith('-')}
+
+        unknown = (excluded | requested) - set(available)
+        if unknown:
+            raise serializers.ValidationError({
+                self.sparse_fields_param: f"Champs inconnus : {', '.join(sorted(unknown))}"
+            })
+
+        if requested:
+            included = requested - excluded
+        else:
+            included = set(available) - excluded
+
+        if not included:
+            raise serializers.ValidationError({
+                self.sparse_fields_param: "Au moins un champ doit être renvoyé"
+            })
+
+        self._sparse_fields = included
+        return included
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        included = self.get_sparse_fields()
+        if included is None:
+            return queryset
+        return restrict_queryset(queryset, self.get_serializer_class()().fields, included)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        included = self.get_sparse_fields()
+        if included is not None:
+            target = getattr(serializer, 'child', serializer)
+            for name in list(target.fields):
+                if name not in included:
+                    target.fields.pop(name)
+        return serializer
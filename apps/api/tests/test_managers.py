@@ -0,0 +1,56 @@
+from datetime import date
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models.sql import Query
+from django.test import SimpleTestCase, TestCase
+
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.suppliers.models import Supplier
+
+
+def where_sql(model, queryset=None, condition=None):
+    """WHERE compilé sans préfixe de table : filtre d'un queryset ou condition d'un index"""
+    query = Query(model, alias_cols=False)
+    where = query.build_where(condition) if condition is not None else queryset.query.where
+    compiler = query.get_compiler(connection=connection)
+    sql, params = where.as_sql(compiler, connection)
+    return sql.replace(f"{connection.ops.quote_name(model._meta.db_table)}.", ""), params
+
+
+class TestActivePredicate(SimpleTestCase):
+    def test_active_filter_is_the_partial_index_condition(self):
+        for model in (Invoice, CreditNote, Supplier):
+            partial = [index for index in model._meta.indexes
+                       if index.condition is not None and str(index.condition) == "(AND: ('is_active', True))"]
+            self.assertTrue(partial, model)
+            expected = where_sql(model, condition=partial[0].condition)
+
+            with self.subTest(model=model.__name__):
+                self.assertEqual(where_sql(model, model.active.all()), expected)
+                self.assertEqual(where_sql(model, model.objects.active()), expected)
+
+
+@skipUnless(connection.vendor == "postgresql", "Index partiels PostgreSQL uniquement")
+class TestPartialIndexPlans(TestCase):
+    def setUp(self):
+        self.supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        other = Supplier.objects.create(name="SUP B", code="SUPB", siret="12345678901235")
+        Invoice.objects.bulk_create([
+            Invoice(supplier=self.supplier if index % 5 == 0 else other, invoice_number=f"F{index}", net_to_pay=10,
+                    invoice_date=date(2024, 1 + index % 12, 1), month=1 + index % 12, year=2024,
+                    is_active=index % 3 != 0)
+            for index in range(3000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE invoices_invoices")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def test_active_supplier_listing_uses_partial_index(self):
+        plan = Invoice.active.filter(supplier=self.supplier).order_by("-invoice_date").explain()
+        self.assertIn("invoices_active_supplier_idx", plan)
+
+    def test_inactive_rows_cannot_use_partial_index(self):
+        plan = Invoice.objects.filter(supplier=self.supplier, is_active=False).order_by("-invoice_date").explain()
+        self.assertNotIn("invoices_active_", plan)
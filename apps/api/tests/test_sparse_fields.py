@@ -0,0 +1,101 @@
+from datetime import date
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import User
+from apps.api.sparse_fields import model_path
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.suppliers.models import Supplier
+
+
+class TestModelPath(SimpleTestCase):
+    def test_nested_sources(self):
+        self.assertEqual(model_path(Invoice, "invoice_number"), "invoice_number")
+        self.assertEqual(model_path(Invoice, "supplier.name"), "supplier__name")
+        self.assertEqual(model_path(CreditNote, "invoice.invoice_number"), "invoice__invoice_number")
+
+    def test_unresolvable_sources(self):
+        self.assertIsNone(model_path(Invoice, "*"))
+        self.assertIsNone(model_path(Invoice, "supplier.bogus"))
+        self.assertIsNone(model_path(Invoice, "bogus.name"))
+        # Chemin qui traverse une colonne non relationnelle
+        self.assertIsNone(model_path(Invoice, "invoice_number.upper"))
+
+
+class TestSparseFieldsets(APITestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username="admin", password="pass", role=User.Role.ADMIN)
+        supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        invoice = Invoice.objects.create(
+            supplier=supplier, invoice_number="F1", net_to_pay=10, invoice_date=date(2026, 1, 5), notes="long"
+        )
+        CreditNote.objects.create(
+            supplier=supplier, invoice=invoice, credit_note_number="A1", amount=5,
+            credit_note_date=date(2026, 1, 7), motif="Casse"
+        )
+        self.client.force_authenticate(user=admin)
+
+    def list_sql(self, name, table, fields):
+        """Ligne renvoyée et colonnes lues par la requête de page"""
+        with CaptureQueriesContext(connection) as queries:
+            r = self.client.get(reverse(name), {"fields": fields})
+        self.assertEqual(r.status_code, 200, r.data)
+        (sql,) = [sql for sql in (query["sql"] for query in queries)
+                  if sql.startswith("SELECT") and f'FROM "{table}"' in sql and "LIMIT" in sql]
+        return r.data["results"][0], sql.split(" FROM ", 1)[0]
+
+    def test_invoice_include_list(self):
+        row, sql = self.list_sql("invoices:invoice-list", "invoices_invoices", "id,invoice_number,net_to_pay")
+
+        self.assertEqual(set(row), {"id", "invoice_number", "net_to_pay"})
+        self.assertNotIn('"notes"', sql)
+        self.assertNotIn('"suppliers_suppliers"', sql)
+        self.assertIn('"invoices_invoices"."invoice_number"', sql)
+
+    def test_invoice_exclude_list(self):
+        row, sql = self.list_sql("invoices:invoice-list", "invoices_invoices", "-notes,-created_at")
+
+        self.assertNotIn("notes", row)
+        self.assertNotIn("created_at", row)
+        self.assertEqual(row["supplier_name"], "SUP A")
+        self.assertNotIn('"invoices_invoices"."notes"', sql)
+        self.assertNotIn('"invoices_invoices"."created_at"', sql)
+
+    def test_nested_field_keeps_only_its_join(self):
+        row, sql = self.list_sql("invoices:invoice-list", "invoices_invoices", "invoice_number,supplier_name")
+
+        self.assertEqual(row, {"invoice_number": "F1", "supplier_name": "SUP A"})
+        self.assertIn('"suppliers_suppliers"."name"', sql)
+        self.assertNotIn('"suppliers_suppliers"."siret"', sql)
+        self.assertNotIn('"notes"', sql)
+
+    def test_credit_note_include_and_exclude(self):
+        row, sql = self.list_sql("credit_notes:credit-note-list", "credit_notes_credit_notes",
+                                 "id,credit_note_number,invoice_number")
+        self.assertEqual(set(row), {"id", "credit_note_number", "invoice_number"})
+        self.assertIn('"invoices_invoices"."invoice_number"', sql)
+        self.assertNotIn('"invoices_invoices"."notes"', sql)
+        self.assertNotIn('"motif"', sql)
+        self.assertNotIn('"suppliers_suppliers"', sql)
+
+        row, sql = self.list_sql("credit_notes:credit-note-list", "credit_notes_credit_notes", "-motif")
+        self.assertNotIn("motif", row)
+        self.assertEqual(row["invoice_number"], "F1")
+        self.assertNotIn('"motif"', sql)
+        self.assertNotIn('"invoices_invoices"."notes"', sql)
+
+    def test_unknown_fields_rejected(self):
+        for fields in ("id,bogus", "-bogus", "supplier.name", "supplier__name"):
+            with self.subTest(fields=fields):
+                r = self.client.get(reverse("invoices:invoice-list"), {"fields": fields})
+                self.assertEqual(r.status_code, 400)
+                self.assertIn("fields", r.data)
+
+    def test_at_least_one_field(self):
+        r = self.client.get(reverse("invoices:invoice-list"), {"fields": "id,-id"})
+        self.assertEqual(r.status_code, 400)
@@ -0,0 +1,29 @@
+from django.contrib import admin
+
+from .models import ArchivedCreditNote, ArchivedInvoice, ArchivedYear, ArchiveRollup
+
+
+@admin.register(ArchivedYear)
+class ArchivedYearAdmin(admin.ModelAdmin):
+    list_display = ['year', 'invoices_count', 'credit_notes_count', 'archived_at']
+    readonly_fields = ['year', 'invoices_count', 'credit_notes_count', 'archived_at']
+
+
+@admin.register(ArchivedInvoice)
+class ArchivedInvoiceAdmin(admin.ModelAdmin):
+    list_display = ['invoice_number', 'supplier', 'net_to_pay', 'invoice_date', 'year', 'archived_at']
+    list_filter = ['year']
+    search_fields = ['invoice_number', 'supplier__name']
+
+
+@admin.register(ArchivedCreditNote)
+class ArchivedCreditNoteAdmin(admin.ModelAdmin):
+    list_display = ['credit_note_number', 'supplier', 'amount', 'credit_note_date', 'year', 'archived_at']
+    list_filter = ['year']
+    search_fields = ['credit_note_number', 'supplier__name']
+
+
+@admin.register(ArchiveRollup)
+class ArchiveRollupAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'supplier', 'year', 'month', 'total', 'count']
+    list_filter = ['kind', 'year']
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.models.signals import pre_save
+
+
+class ArchiveConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.archive'
+    verbose_name = 'Archives des exercices clos'
+
+    def ready(self):
+        from . import signals
+
+        pre_save.connect(signals.check_archived_number, sender='invoices.Invoice',
+                         dispatch_uid='archive_invoice_number')
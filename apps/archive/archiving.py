@@ -0,0 +1,146 @@
+"""
+Archivage des exercices clos
+
+Les factures et avoirs *inactifs* d'une année close sont déplacés par lots
+vers les tables ``archive_*`` : chaque lot est copié, ajouté aux cumuls
+``ArchiveRollup`` puis supprimé de la table chaude, dans une même transaction.
+Les tables chaudes et leurs index restent ainsi dimensionnés sur l'activité
+courante.
+
+Une facture encore référencée par un avoir de la table chaude n'est pas
+archivée (les avoirs sont traités en premier).
+"""
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from .models import ArchivedCreditNote, ArchivedInvoice, ArchivedYear, ArchiveRollup
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+INVOICE_FIELDS = (
+    'id', 'supplier_id', 'invoice_number', 'net_to_pay', 'invoice_date', 'due_date',
+    'status', 'notes', 'month', 'year', 'is_active', 'created_at', 'updated_at',
+)
+CREDIT_NOTE_FIELDS = (
+    'id', 'supplier_id', 'invoice_id', 'credit_note_number', 'amount', 'credit_note_date',
+    'motif', 'month', 'year', 'is_active', 'created_at', 'updated_at',
+)
+
+
+class ArchiveError(Exception):
+    """Archivage impossible (exercice non clos...)"""
+
+
+def last_closed_year():
+    """Dernier exercice clos : année courante moins ``ARCHIVE_CLOSED_YEAR_LAG`` (1 par défaut)"""
+    return timezone.now().year - getattr(settings, 'ARCHIVE_CLOSED_YEAR_LAG', 1)
+
+
+def archivable_years():
+    """Exercices clos ayant encore des lignes inactives en table chaude"""
+    limit = last_closed_year()
+    years = set(
+        Invoice.objects.filter(is_active=False, year__lte=limit).values_list('year', flat=True).distinct()
+    ) | set(
+        CreditNote.objects.filter(is_active=False, year__lte=limit).values_list('year', flat=True).distinct()
+    )
+    return sorted(years)
+
+
+def _add_to_rollups(kind, year, rows, amount_field):
+    """Ajoute un lot aux cumuls (fournisseur, mois) de l'année"""
+    sums = defaultdict(lambda: [Decimal('0.00'), 0])
+    for row in rows:
+        entry = sums[(row['supplier_id'], row['month'])]
+        entry[0] += row[amount_field]
+        entry[1] += 1
+
+    existing = {
+        (rollup.supplier_id, rollup.month): rollup
+        for rollup in ArchiveRollup.objects.select_for_update().filter(
+            kind=kind, year=year,
+            supplier_id__in={supplier_id for supplier_id, _ in sums},
+        )
+    }
+    to_update, to_create = [], []
+    for (supplier_id, month), (total, count) in sums.items():
+        rollup = existing.get((supplier_id, month))
+        if rollup is None:
+            to_create.append(ArchiveRollup(
+                kind=kind, supplier_id=supplier_id, year=year, month=month, total=total, count=count,
+            ))
+        else:
+            rollup.total += total
+            rollup.count += count
+            to_update.append(rollup)
+
+    ArchiveRollup.objects.bulk_create(to_create)
+    ArchiveRollup.objects.bulk_update(to_update, ['total', 'count'])
+
+
+def _move_batch(model, archive_model, fields, queryset, kind, year, amount_field, batch_size):
+    """Déplace un lot ; retourne le nombre de lignes archivées"""
+    with transaction.atomic():
+        rows = list(queryset.order_by('pk').values(*fields)[:batch_size])
+        if not rows:
+            return 0
+
+        archive_model.objects.bulk_create([archive_model(**row) for row in rows])
+        _add_to_rollups(kind, year, rows, amount_field)
+        # Suppression brute : pas de collecte des relations ni de signaux
+        # (les lignes ne sont pas supprimées, elles changent de table)
+        model.objects.filter(pk__in=[row['id'] for row in rows])._raw_delete(model.objects.db)
+    return len(rows)
+
+
+def archive_year(year, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Archive les lignes inactives de ``year``.
+
+    Retourne ``{'year', 'credit_notes', 'invoices'}`` (lignes archivées ou, en
+    ``dry_run``, archivables).
+    """
+    if year > last_closed_year():
+        raise ArchiveError(f"L'exercice {year} n'est pas clos")
+
+    credit_notes = CreditNote.objects.filter(year=year, is_active=False)
+    # Les factures encore liées à un avoir chaud restent en place
+    invoices = Invoice.objects.filter(year=year, is_active=False).exclude(
+        Exists(CreditNote.objects.filter(invoice_id=OuterRef('pk')))
+    )
+
+    if dry_run:
+        return {'year': year, 'credit_notes': credit_notes.count(), 'invoices': invoices.count()}
+
+    moved = {'year': year, 'credit_notes': 0, 'invoices': 0}
+    for key, model, archive_model, fields, queryset, kind, amount_field in (
+        ('credit_notes', CreditNote, ArchivedCreditNote, CREDIT_NOTE_FIELDS, credit_notes,
+         ArchiveRollup.Kind.CREDIT_NOTE, 'amount'),
+        ('invoices', Invoice, ArchivedInvoice, INVOICE_FIELDS, invoices,
+         ArchiveRollup.Kind.INVOICE, 'net_to_pay'),
+    ):
+        while True:
+            count = _move_batch(model, archive_model, fields, queryset, kind, year, amount_field, batch_size)
+            if not count:
+                break
+            moved[key] += count
+
+    archived_year, _ = ArchivedYear.objects.get_or_create(year=year)
+    archived_year.invoices_count = ArchivedInvoice.objects.filter(year=year).count()
+    archived_year.credit_notes_count = ArchivedCreditNote.objects.filter(year=year).count()
+    archived_year.save()
+
+    logger.info(
+        f"Archived year {year}: {moved['invoices']} invoices, {moved['credit_notes']} credit notes"
+    )
+    return moved
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.archive.archiving import (
+    DEFAULT_BATCH_SIZE,
+    ArchiveError,
+    archivable_years,
+    archive_year,
+)
+
+
+class Command(BaseCommand):
+    help = "Archive les factures et avoirs inactifs des exercices clos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, action='append',
+                            help="Exercice à archiver (répétable) ; par défaut tous les exercices clos")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        years = options['year'] or archivable_years()
+        if not years:
+            self.stdout.write("Aucun exercice à archiver")
+            return
+
+        for year in years:
+            try:
+                result = archive_year(year, batch_size=options['batch_size'], dry_run=options['dry_run'])
+            except ArchiveError as exc:
+                raise CommandError(str(exc))
+            prefix = "[dry-run] " if options['dry_run'] else ""
+            self.stdout.write(self.style.SUCCESS(
+                f"{prefix}{year} : {result['invoices']} facture(s), {result['credit_notes']} avoir(s)"
+            ))
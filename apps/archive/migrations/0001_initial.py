@@ -0,0 +1,269 @@
+# Generated by Django 5.0.6 on 2026-10-19 02:30
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("invoices", "0007_active_partial_indexes"),
+        ("suppliers", "0004_active_partial_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedYear",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "year",
+                    models.PositiveIntegerField(unique=True, verbose_name="Année"),
+                ),
+                (
+                    "invoices_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Factures archivées"
+                    ),
+                ),
+                (
+                    "credit_notes_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Avoirs archivés"
+                    ),
+                ),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Archivé le"),
+                ),
+            ],
+            options={
+                "verbose_name": "Exercice archivé",
+                "verbose_name_plural": "Exercices archivés",
+                "db_table": "archive_years",
+                "ordering": ["-year"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedCreditNote",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "credit_note_number",
+                    models.CharField(max_length=100, verbose_name="Numéro d'avoir"),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="Montant"
+                    ),
+                ),
+                ("credit_note_date", models.DateField(verbose_name="Date d'avoir")),
+                (
+                    "motif",
+                    models.TextField(blank=True, null=True, verbose_name="Motif"),
+                ),
+                ("month", models.PositiveSmallIntegerField(verbose_name="Mois")),
+                ("year", models.PositiveIntegerField(verbose_name="Année")),
+                ("is_active", models.BooleanField(default=False, verbose_name="Actif")),
+                ("created_at", models.DateTimeField(verbose_name="Créé le")),
+                ("updated_at", models.DateTimeField(verbose_name="Mis à jour le")),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Archivé le"),
+                ),
+                (
+                    "invoice",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="invoices.invoice",
+                        verbose_name="Facture associée",
+                    ),
+                ),
+                (
+                    "supplier",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="suppliers.supplier",
+                        verbose_name="Fournisseur",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Avoir archivé",
+                "verbose_name_plural": "Avoirs archivés",
+                "db_table": "archive_credit_notes",
+                "ordering": ["-credit_note_date", "-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["supplier", "year"],
+                        name="archive_cre_supplie_b92219_idx",
+                    ),
+                    models.Index(
+                        fields=["year", "month"], name="archive_cre_year_f2052c_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedInvoice",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "invoice_number",
+                    models.CharField(max_length=100, verbose_name="Numéro de facture"),
+                ),
+                (
+                    "net_to_pay",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="Net à payer"
+                    ),
+                ),
+                ("invoice_date", models.DateField(verbose_name="Date de facture")),
+                (
+                    "due_date",
+                    models.DateField(
+                        blank=True, null=True, verbose_name="Date d'échéance"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("DRAFT", "Brouillon"),
+                            ("PENDING", "En attente"),
+                            ("PAID", "Payé"),
+                        ],
+                        max_length=20,
+                        verbose_name="Statut",
+                    ),
+                ),
+                (
+                    "notes",
+                    models.TextField(blank=True, null=True, verbose_name="Notes"),
+                ),
+                ("month", models.PositiveSmallIntegerField(verbose_name="Mois")),
+                ("year", models.PositiveIntegerField(verbose_name="Année")),
+                ("is_active", models.BooleanField(default=False, verbose_name="Actif")),
+                ("created_at", models.DateTimeField(verbose_name="Créé le")),
+                ("updated_at", models.DateTimeField(verbose_name="Mis à jour le")),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Archivé le"),
+                ),
+                (
+                    "supplier",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="suppliers.supplier",
+                        verbose_name="Fournisseur",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Facture archivée",
+                "verbose_name_plural": "Factures archivées",
+                "db_table": "archive_invoices",
+                "ordering": ["-invoice_date", "-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["supplier", "year"],
+                        name="archive_inv_supplie_3353c1_idx",
+                    ),
+                    models.Index(
+                        fields=["year", "month"], name="archive_inv_year_bf6b4d_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchiveRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("INVOICE", "Factures"), ("CREDIT_NOTE", "Avoirs")],
+                        max_length=20,
+                        verbose_name="Type",
+                    ),
+                ),
+                ("year", models.PositiveIntegerField(verbose_name="Année")),
+                ("month", models.PositiveSmallIntegerField(verbose_name="Mois")),
+                (
+                    "total",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14, verbose_name="Total"
+                    ),
+                ),
+                (
+                    "count",
+                    models.PositiveIntegerField(default=0, verbose_name="Nombre"),
+                ),
+                (
+                    "supplier",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="suppliers.supplier",
+                        verbose_name="Fournisseur",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Cumul d'archive",
+                "verbose_name_plural": "Cumuls d'archive",
+                "db_table": "archive_rollups",
+                "indexes": [
+                    models.Index(
+                        fields=["kind", "year", "month"],
+                        name="archive_rol_kind_29e467_idx",
+                    )
+                ],
+                "unique_together": {("kind", "supplier", "year", "month")},
+            },
+        ),
+    ]
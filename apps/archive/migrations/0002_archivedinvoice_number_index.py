@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-19 04:16
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY : pas de verrou d'écriture sur la table
+    atomic = False
+
+    dependencies = [
+        ("archive", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="archivedinvoice",
+            index=models.Index(
+                fields=["supplier", "invoice_number"],
+                name="archive_inv_supplie_d0a215_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+"""
+Repli transparent des ViewSets sur les tables d'archive
+"""
+from django.core.exceptions import ValidationError
+from django.db.models import IntegerField, Value
+from django.http import Http404
+from rest_framework import filters
+from rest_framework.response import Response
+
+from .models import ArchivedYear
+
+
+def _page_keys(queryset, fields, archived):
+    """``(id, champs de tri, archivé)`` d'un des deux côtés de l'union"""
+    return queryset.order_by().annotate(
+        archived=Value(archived, output_field=IntegerField())
+    ).values('id', *fields, 'archived')
+
+
+def _fetch(queryset, ids):
+    return {instance.pk: instance for instance in queryset.filter(pk__in=ids)} if ids else {}
+
+
+class ArchiveFallbackMixin:
+    """
+    Mixin de ViewSet : ``retrieve`` d'un identifiant archivé et ``list`` d'une
+    année archivée (``?year=``) incluent les lignes des tables d'archive.
+
+    ``archive_model`` doit reprendre les noms de champs du modèle chaud.
+    """
+    archive_model = None
+
+    def archive_visible(self):
+        """Les lignes archivées (inactives) sont-elles visibles pour cet utilisateur ?"""
+        return True
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if self.action != 'retrieve' or not self.archive_visible():
+                raise
+            lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            try:
+                instance = self.archive_model.objects.select_related('supplier').filter(pk=lookup).first()
+            except (ValueError, ValidationError):
+                instance = None
+            if instance is None:
+                raise
+            self.check_object_permissions(self.request, instance)
+            return instance
+
+    def archive_list(self, queryset):
+        """
+        Response fusionnant chaud et archive pour une année archivée, sinon ``None``.
+
+        Tri et pagination sont faits en SQL sur un ``UNION ALL`` des clés des
+        deux tables (id et champs de tri) ; seules les lignes de la page sont
+        ensuite chargées, depuis leur table respective.
+        """
+        year = self.request.query_params.get('year')
+        if not year or not year.isdigit() or not self.archive_visible():
+            return None
+        if not ArchivedYear.objects.filter(year=int(year)).exists():
+            return None
+
+        archived = self.filter_queryset(self.archive_model.objects.select_related('supplier'))
+        ordering = filters.OrderingFilter().get_ordering(self.request, queryset, self) or []
+        fields = list(dict.fromkeys(field.lstrip('-') for field in ordering if field.lstrip('-') != 'id'))
+        # id en dernier critère : pagination stable à valeurs de tri égales
+        keys = _page_keys(queryset, fields, 0).union(_page_keys(archived, fields, 1), all=True)
+        keys = keys.order_by(*ordering, 'id')
+
+        page = self.paginate_queryset(keys)
+        rows = page if page is not None else list(keys)
+        instances = _fetch(queryset, [row['id'] for row in rows if not row['archived']])
+        instances.update(_fetch(archived, [row['id'] for row in rows if row['archived']]))
+        objects = [instances[row['id']] for row in rows if row['id'] in instances]
+
+        serializer = self.get_serializer(objects, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
@@ -0,0 +1,151 @@
+import uuid
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.invoices.models import Invoice
+from apps.suppliers.models import Supplier
+
+
+class ArchivedInvoice(models.Model):
+    """
+    Facture inactive d'un exercice clos, sortie de la table chaude.
+
+    Mêmes noms de champs que ``Invoice`` : les serializers et filtres des
+    factures s'appliquent tels quels.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    supplier = models.ForeignKey(
+        Supplier,
+        on_delete=models.PROTECT,
+        related_name='+',
+        db_index=False,
+        verbose_name=_('Fournisseur')
+    )
+    invoice_number = models.CharField(max_length=100, verbose_name=_('Numéro de facture'))
+    net_to_pay = models.DecimalField(max_digits=12, decimal_places=2, verbose_name=_('Net à payer'))
+    invoice_date = models.DateField(verbose_name=_('Date de facture'))
+    due_date = models.DateField(blank=True, null=True, verbose_name=_("Date d'échéance"))
+    status = models.CharField(max_length=20, choices=Invoice.Status.choices, verbose_name=_('Statut'))
+    notes = models.TextField(blank=True, null=True, verbose_name=_('Notes'))
+    month = models.PositiveSmallIntegerField(verbose_name=_('Mois'))
+    year = models.PositiveIntegerField(verbose_name=_('Année'))
+    is_active = models.BooleanField(default=False, verbose_name=_('Actif'))
+    created_at = models.DateTimeField(verbose_name=_('Créé le'))
+    updated_at = models.DateTimeField(verbose_name=_('Mis à jour le'))
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Archivé le'))
+
+    class Meta:
+        db_table = 'archive_invoices'
+        verbose_name = _('Facture archivée')
+        verbose_name_plural = _('Factures archivées')
+        ordering = ['-invoice_date', '-created_at']
+        indexes = [
+            models.Index(fields=['supplier', 'year']),
+            models.Index(fields=['year', 'month']),
+            # Unicité des numéros, archives comprises (apps/invoices/uniqueness.py)
+            models.Index(fields=['supplier', 'invoice_number']),
+        ]
+
+    def __str__(self):
+        return f"{self.supplier.name} - {self.invoice_number} (archivée)"
+
+
+class ArchivedCreditNote(models.Model):
+    """
+    Avoir inactif d'un exercice clos, sorti de la table chaude.
+
+    ``invoice`` n'a pas de contrainte en base : la facture peut être chaude ou archivée.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    supplier = models.ForeignKey(
+        Supplier,
+        on_delete=models.PROTECT,
+        related_name='+',
+        db_index=False,
+        verbose_name=_('Fournisseur')
+    )
+    invoice = models.ForeignKey(
+        Invoice,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        blank=True,
+        null=True,
+        related_name='+',
+        verbose_name=_('Facture associée')
+    )
+    credit_note_number = models.CharField(max_length=100, verbose_name=_("Numéro d'avoir"))
+    amount = models.DecimalField(max_digits=12, decimal_places=2, verbose_name=_('Montant'))
+    credit_note_date = models.DateField(verbose_name=_("Date d'avoir"))
+    motif = models.TextField(blank=True, null=True, verbose_name=_('Motif'))
+    month = models.PositiveSmallIntegerField(verbose_name=_('Mois'))
+    year = models.PositiveIntegerField(verbose_name=_('Année'))
+    is_active = models.BooleanField(default=False, verbose_name=_('Actif'))
+    created_at = models.DateTimeField(verbose_name=_('Créé le'))
+    updated_at = models.DateTimeField(verbose_name=_('Mis à jour le'))
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Archivé le'))
+
+    class Meta:
+        db_table = 'archive_credit_notes'
+        verbose_name = _('Avoir archivé')
+        verbose_name_plural = _('Avoirs archivés')
+        ordering = ['-credit_note_date', '-created_at']
+        indexes = [
+            models.Index(fields=['supplier', 'year']),
+            models.Index(fields=['year', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.supplier.name} - {self.credit_note_number} (archivé)"
+
+
+class ArchiveRollup(models.Model):
+    """
+    Totaux des lignes archivées par fournisseur et par mois, pour les rapports
+    """
+    class Kind(models.TextChoices):
+        INVOICE = 'INVOICE', _('Factures')
+        CREDIT_NOTE = 'CREDIT_NOTE', _('Avoirs')
+
+    kind = models.CharField(max_length=20, choices=Kind.choices, verbose_name=_('Type'))
+    supplier = models.ForeignKey(
+        Supplier,
+        on_delete=models.PROTECT,
+        related_name='+',
+        verbose_name=_('Fournisseur')
+    )
+    year = models.PositiveIntegerField(verbose_name=_('Année'))
+    month = models.PositiveSmallIntegerField(verbose_name=_('Mois'))
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name=_('Total'))
+    count = models.PositiveIntegerField(default=0, verbose_name=_('Nombre'))
+
+    class Meta:
+        db_table = 'archive_rollups'
+        verbose_name = _("Cumul d'archive")
+        verbose_name_plural = _("Cumuls d'archive")
+        unique_together = ['kind', 'supplier', 'year', 'month']
+        indexes = [
+            models.Index(fields=['kind', 'year', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.supplier_id} {self.month}/{self.year}"
+
+
+class ArchivedYear(models.Model):
+    """
+    Exercice dont les lignes inactives ont été archivées
+    """
+    year = models.PositiveIntegerField(unique=True, verbose_name=_('Année'))
+    invoices_count = models.PositiveIntegerField(default=0, verbose_name=_('Factures archivées'))
+    credit_notes_count = models.PositiveIntegerField(default=0, verbose_name=_('Avoirs archivés'))
+    archived_at = models.DateTimeField(auto_now=True, verbose_name=_('Archivé le'))
+
+    class Meta:
+        db_table = 'archive_years'
+        verbose_name = _('Exercice archivé')
+        verbose_name_plural = _('Exercices archivés')
+        ordering = ['-year']
+
+    def __str__(self):
+        return str(self.year)
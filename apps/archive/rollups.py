@@ -0,0 +1,42 @@
+"""
+Cumuls des lignes archivées, à ajouter aux agrégats qui incluent les lignes inactives
+"""
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from .models import ArchiveRollup
+
+INVOICE = ArchiveRollup.Kind.INVOICE
+CREDIT_NOTE = ArchiveRollup.Kind.CREDIT_NOTE
+
+
+def _rollups(kind, supplier_id=None, year=None, month=None):
+    queryset = ArchiveRollup.objects.filter(kind=kind)
+    if supplier_id:
+        queryset = queryset.filter(supplier_id=supplier_id)
+    if year:
+        queryset = queryset.filter(year=year)
+    if month:
+        queryset = queryset.filter(month=month)
+    return queryset
+
+
+def archived_totals(kind, supplier_id=None, year=None, month=None):
+    """``(total, nombre)`` archivés pour les filtres donnés"""
+    totals = _rollups(kind, supplier_id, year, month).aggregate(total=Sum('total'), count=Sum('count'))
+    return totals['total'] or Decimal('0.00'), totals['count'] or 0
+
+
+def archived_totals_by_supplier(kind, year=None, month=None):
+    """``{supplier_id: {'supplier__name', 'supplier__code', 'total', 'count'}}``"""
+    rows = _rollups(kind, year=year, month=month).values(
+        'supplier__id', 'supplier__name', 'supplier__code'
+    ).annotate(total=Sum('total'), count=Sum('count')).order_by()
+    return {row['supplier__id']: row for row in rows}
+
+
+async def aarchived_totals(kind, supplier_id=None, year=None, month=None):
+    """Version asynchrone de ``archived_totals``"""
+    totals = await _rollups(kind, supplier_id, year, month).aaggregate(total=Sum('total'), count=Sum('count'))
+    return totals['total'] or Decimal('0.00'), totals['count'] or 0
@@ -0,0 +1,11 @@
+from apps.invoices.uniqueness import DUPLICATE_MESSAGE, DuplicateInvoiceNumber, archived_numbers
+from apps.partitioning.partitions import enabled as partitioning_enabled
+
+
+def check_archived_number(sender, instance, raw=False, **kwargs):
+    """Avant écriture : numéro repris d'une facture archivée (hors de la contrainte d'unicité)"""
+    # Table partitionnée : check_unique_numbers (apps.partitioning) consulte déjà l'archive
+    if raw or partitioning_enabled():
+        return
+    if archived_numbers([(instance.supplier_id, instance.invoice_number)]):
+        raise DuplicateInvoiceNumber(DUPLICATE_MESSAGE)
@@ -0,0 +1,106 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.archive.archiving import archive_year
+from apps.archive.models import ArchivedCreditNote, ArchivedInvoice
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.invoices.uniqueness import DuplicateInvoiceNumber, check_unique_numbers
+from apps.suppliers.models import Supplier
+
+
+class TestColdArchive(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="pass", role=User.Role.ADMIN)
+        self.supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+
+        self.active = Invoice.objects.create(
+            supplier=self.supplier, invoice_number="F1", net_to_pay=10, invoice_date=date(2020, 3, 5)
+        )
+        self.inactive = Invoice.objects.create(
+            supplier=self.supplier, invoice_number="F2", net_to_pay=20, invoice_date=date(2020, 3, 6),
+            is_active=False
+        )
+        self.credit_note = CreditNote.objects.create(
+            supplier=self.supplier, credit_note_number="A1", amount=5,
+            credit_note_date=date(2020, 3, 7), is_active=False
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def test_archive_moves_inactive_rows_and_keeps_totals(self):
+        totals_before = self.client.get(
+            reverse("credit_notes:credit-note-monthly-total"), {"month": 3, "year": 2020}
+        ).data["totals"]
+
+        result = archive_year(2020, batch_size=1)
+
+        self.assertEqual(result, {"year": 2020, "credit_notes": 1, "invoices": 1})
+        self.assertFalse(Invoice.objects.filter(pk=self.inactive.pk).exists())
+        self.assertTrue(ArchivedInvoice.objects.filter(pk=self.inactive.pk).exists())
+        self.assertTrue(ArchivedCreditNote.objects.filter(pk=self.credit_note.pk).exists())
+        self.assertTrue(Invoice.objects.filter(pk=self.active.pk).exists())
+
+        totals_after = self.client.get(
+            reverse("credit_notes:credit-note-monthly-total"), {"month": 3, "year": 2020}
+        ).data["totals"]
+        self.assertEqual(totals_after["total_credit_notes"], Decimal("5.00"))
+        self.assertEqual(totals_after["credit_note_count"], totals_before["credit_note_count"])
+
+    def test_viewsets_fall_back_to_archive(self):
+        archive_year(2020)
+
+        r = self.client.get(reverse("invoices:invoice-detail", args=[self.inactive.pk]))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["invoice_number"], "F2")
+
+        r = self.client.get(reverse("invoices:invoice-list"), {"year": 2020})
+        self.assertEqual(r.status_code, 200)
+        results = r.data["results"] if isinstance(r.data, dict) else r.data
+        self.assertEqual({row["invoice_number"] for row in results}, {"F1", "F2"})
+
+    def test_archived_year_list_sorted_and_paginated_in_sql(self):
+        # 30 factures de plus, une sur deux inactive : chaud et archive entrelacés par montant
+        for index in range(30):
+            Invoice.objects.create(
+                supplier=self.supplier, invoice_number=f"P{index:02d}", net_to_pay=100 + index,
+                invoice_date=date(2020, 4, 1), is_active=bool(index % 2)
+            )
+        archive_year(2020)
+
+        with CaptureQueriesContext(connection) as queries:
+            r = self.client.get(reverse("invoices:invoice-list"), {"year": 2020, "ordering": "-net_to_pay", "page": 2})
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["count"], 32)
+        self.assertEqual([row["invoice_number"] for row in r.data["results"]],
+                         ["P09", "P08", "P07", "P06", "P05", "P04", "P03", "P02", "P01", "P00", "F2", "F1"])
+        union = [query["sql"] for query in queries if "UNION ALL" in query["sql"]]
+        self.assertTrue(union and all("LIMIT" in sql or "COUNT" in sql for sql in union))
+        # Seules les lignes de la page sont chargées depuis chaque table
+        loads = [query["sql"] for query in queries if query["sql"].startswith('SELECT "archive_invoices"."id"')]
+        self.assertEqual(len(loads), 1)
+        self.assertIn(" IN (", loads[0])
+
+    def test_archived_numbers_stay_taken(self):
+        archive_year(2020)
+        self.assertFalse(Invoice.objects.filter(invoice_number="F2").exists())
+
+        r = self.client.post(reverse("invoices:invoice-list"), {
+            "supplier": str(self.supplier.pk), "invoice_number": "F2", "net_to_pay": "10.00",
+            "invoice_date": "2026-01-05",
+        }, format="json")
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("invoice_number", r.data)
+
+        duplicate = Invoice(supplier=self.supplier, invoice_number="F2", net_to_pay=1, invoice_date=date(2026, 1, 5))
+        with self.assertRaises(DuplicateInvoiceNumber):
+            check_unique_numbers([duplicate])
+        with self.assertRaises(DuplicateInvoiceNumber), transaction.atomic():
+            duplicate.save()
+        self.assertFalse(Invoice.objects.filter(invoice_number="F2").exists())
@@ -0,0 +1,102 @@
+import tempfile
+import threading
+import time
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from apps.cache.tiered import TieredCache, invalidate_tags
+
+
+class TestLocalOnly(SimpleTestCase):
+    def test_hits_misses_and_tags_without_shared_cache(self):
+        cache = TieredCache("test:local", local_ttl=60)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1, tags=["supplier:1"])
+        self.assertEqual(cache.get("a"), 1)
+
+        invalidate_tags("supplier:1")
+        self.assertIsNone(cache.get("a"))
+        stats = cache.stats.snapshot()
+        self.assertEqual((stats["local_hits"], stats["misses"], stats["invalidated"]), (1, 2, 1))
+
+    def test_fill_older_than_delete_is_dropped(self):
+        cache = TieredCache("test:versioned", local_ttl=60, versioned=True)
+        version = cache.version("user")
+        cache.delete("user")
+        cache.set("user", "périmé", version=version)
+        self.assertIsNone(cache.get("user"))
+
+        cache.set("user", "frais", version=cache.version("user"))
+        self.assertEqual(cache.get("user"), "frais")
+
+
+class TestSharedTier(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": directory.name,
+        }})
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Deux workers : même nom, LRU distincts ; l'autre ne garde rien localement
+        self.worker = TieredCache("test:shared", local_ttl=60)
+        self.other = TieredCache("test:shared", local_ttl=0)
+
+    def test_value_and_tag_invalidation_cross_workers(self):
+        self.worker.set("report", {"net": 10}, tags=["period:2024-03"])
+        self.assertEqual(self.other.get("report"), {"net": 10})
+        self.assertEqual(self.other.stats.snapshot()["shared_hits"], 1)
+
+        invalidate_tags("period:2024-03")
+        self.assertIsNone(self.other.get("report"))
+        self.assertIsNone(self.worker.get("report"))
+
+    def test_single_flight_in_process(self):
+        calls = []
+
+        def produce():
+            calls.append(1)
+            time.sleep(0.1)
+            return "valeur"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.worker.get_or_set("slow", produce)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["valeur"] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_waits_for_other_worker_holding_lock(self):
+        caches["default"].add(self.worker.make_key("slow") + ":lock", 1, 10)
+        threading.Timer(0.1, lambda: self.other.set("slow", "calculée ailleurs")).start()
+
+        value = self.worker.get_or_set("slow", lambda: self.fail("calcul en double"))
+        self.assertEqual(value, "calculée ailleurs")
+        self.assertEqual(self.worker.stats.snapshot()["flight_waits"], 1)
+
+    def test_fill_older_than_other_worker_delete_is_dropped(self):
+        worker = TieredCache("test:versioned", local_ttl=0, versioned=True)
+        other = TieredCache("test:versioned", local_ttl=0, versioned=True)
+        version = worker.version("user")
+        worker.set("user", "ancien", version=version)
+        self.assertEqual(other.get("user"), "ancien")
+
+        other.delete("user")
+        worker.set("user", "périmé", version=version)
+        self.assertIsNone(other.get("user"))
+
+    def test_entry_of_previous_generation_is_a_miss(self):
+        # Remplissage vérifié juste avant l'invalidation d'un autre worker, écrit juste après
+        worker = TieredCache("test:versioned", local_ttl=0, versioned=True)
+        entry = ({}, "périmé", worker.version("user"))
+        worker.delete("user")
+        caches["default"].set(worker.make_key("user"), entry)
+        self.assertIsNone(worker.get("user"))
@@ -0,0 +1,327 @@
+"""
+Cache à deux niveaux : LRU du processus devant le cache Django partagé
+
+- Premier niveau : ``LocalLRU`` borné, entrées gardées ``local_ttl``
+  secondes (délai maximal pendant lequel un autre worker peut servir une
+  valeur invalidée ailleurs).
+- Second niveau : ``caches[alias]`` (``CACHE_BACKEND`` : fichiers, base ou
+  serveur Redis), ignoré s'il est propre au processus (``LocMemCache``,
+  ``DummyCache``) : une invalidation n'y serait vue que par un seul worker.
+
+Invalidation par tags : chaque tag a une version dans le cache partagé,
+recopiée dans les entrées à l'écriture. ``invalidate_tags`` change la
+version (les entrées partagées portant l'ancienne deviennent des absences)
+et purge immédiatement les entrées locales du processus.
+
+Remplissage protégé (``versioned=True``) : ``delete(key)`` change la
+génération de la clé. Un lecteur lit ``version(key)`` *avant* de charger la
+valeur et la passe à ``set(..., version=...)`` : si la clé a été invalidée
+entre-temps, la valeur chargée (peut-être périmée) n'est pas mise en cache.
+Les entrées partagées portent leur génération, comparée à la génération
+courante à chaque lecture (même aller-retour, ``get_many``).
+
+``get_or_set`` protège contre l'emballement : un seul thread par processus
+calcule une valeur absente, et un verrou ``add`` dans le cache partagé
+évite que plusieurs workers la calculent en même temps (atomique avec Redis
+et la base, au mieux avec les fichiers). Les autres attendent la valeur au
+plus ``lock_timeout`` secondes, puis la calculent eux-mêmes.
+
+Les valeurs du premier niveau sont partagées entre threads : à traiter en
+lecture seule. Compteurs par cache : ``stats()`` ou ``all_stats()``.
+"""
+import threading
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .lru import LocalLRU
+
+MISSING = object()
+TAG_PREFIX = 'cache:tag:'
+VERSION_SUFFIX = ':version'
+DEFAULT_TTL = 300
+DEFAULT_LOCAL_TTL = 2
+DEFAULT_LOCAL_SIZE = 1024
+DEFAULT_LOCK_TIMEOUT = 10
+WAIT_INTERVAL = 0.05
+
+_registry = weakref.WeakSet()
+_registry_lock = threading.Lock()
+
+# Succès et échecs de la requête HTTP en cours, ``{'hits': n, 'misses': n}`` (voir apps.perf)
+request_counters = ContextVar('cache_request_counters', default=None)
+
+
+def shared_cache(alias='default'):
+    """Cache Django ``alias`` s'il est partagé entre workers, sinon ``None``"""
+    backend = caches[alias]
+    if isinstance(backend, (LocMemCache, DummyCache)):
+        return None
+    return backend
+
+
+class CacheStats:
+    FIELDS = ('local_hits', 'shared_hits', 'misses', 'sets', 'invalidated', 'flight_waits')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, field, count=1):
+        with self._lock:
+            self._counts[field] += count
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        hits = counts['local_hits'] + counts['shared_hits']
+        lookups = hits + counts['misses']
+        counts['hit_rate'] = round(hits / lookups, 4) if lookups else None
+        return counts
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+
+
+def _resolve(value):
+    """Durée fixe, ou lue à chaque appel (fonction sans argument, un réglage par exemple)"""
+    return value() if callable(value) else value
+
+
+class TieredCache:
+    """
+    Cache nommé ; ses clés sont préfixées par ``name:``
+    """
+
+    def __init__(
+        self, name, ttl=DEFAULT_TTL, local_ttl=DEFAULT_LOCAL_TTL, local_size=DEFAULT_LOCAL_SIZE,
+        alias='default', lock_timeout=DEFAULT_LOCK_TIMEOUT, versioned=False,
+    ):
+        self.name = name
+        self.versioned = versioned
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.alias = alias
+        self.lock_timeout = lock_timeout
+        self.stats = CacheStats()
+        self._local = LocalLRU(local_size)
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        # Générations sans cache partagé ; verrou : vérification et écriture locale d'un seul tenant
+        self._versions = LocalLRU(local_size)
+        self._fill_lock = threading.Lock()
+        with _registry_lock:
+            _registry.add(self)
+
+    def make_key(self, key):
+        return f'{self.name}:{key}'
+
+    def get(self, key, default=None):
+        full_key = self.make_key(key)
+        entry = self._local.get(full_key, MISSING)
+        if entry is not MISSING:
+            self._count('local_hits')
+            return entry[1]
+
+        shared = shared_cache(self.alias)
+        if shared is not None:
+            if self.versioned:
+                version_key = full_key + VERSION_SUFFIX
+                found = shared.get_many([full_key, version_key])
+                entry = found.get(full_key, MISSING)
+                if entry is not MISSING and entry[2] != found.get(version_key):
+                    entry = MISSING
+            else:
+                entry = shared.get(full_key, MISSING)
+            if entry is not MISSING and _tags_current(shared, entry[0]):
+                self._local.set(full_key, entry, _resolve(self.local_ttl))
+                self._count('shared_hits')
+                return entry[1]
+
+        self._count('misses')
+        return default
+
+    def _version_ttl(self):
+        # Survit à toute entrée écrite avant l'invalidation
+        return 2 * max(_resolve(self.ttl), _resolve(self.local_ttl))
+
+    def version(self, key):
+        """Génération courante de la clé (``versioned``), à lire avant de charger la valeur"""
+        full_key = self.make_key(key) + VERSION_SUFFIX
+        shared = shared_cache(self.alias)
+        if shared is not None:
+            return shared.get(full_key)
+        return self._versions.get(full_key)
+
+    def set(self, key, value, ttl=None, tags=(), version=MISSING):
+        """
+        Met ``value`` en cache et la retourne.
+
+        ``version`` : génération lue avant le chargement ; rien n'est écrit si
+        la clé a été invalidée depuis.
+        """
+        full_key = self.make_key(key)
+        shared = shared_cache(self.alias)
+        entry = (_tag_versions(shared, tags), value)
+        if not self.versioned:
+            if shared is not None:
+                shared.set(full_key, entry, _resolve(self.ttl if ttl is None else ttl))
+            self._local.set(full_key, entry, _resolve(self.local_ttl))
+            self.stats.incr('sets')
+            return value
+
+        with self._fill_lock:
+            current = self.version(key)
+            if version is not MISSING and version != current:
+                self.stats.incr('invalidated')
+                return value
+            entry += (current,)
+            if shared is not None:
+                shared.set(full_key, entry, _resolve(self.ttl if ttl is None else ttl))
+            self._local.set(full_key, entry, _resolve(self.local_ttl))
+        self.stats.incr('sets')
+        return value
+
+    def delete(self, key):
+        full_key = self.make_key(key)
+        shared = shared_cache(self.alias)
+        if self.versioned:
+            # Nouvelle génération d'abord : un remplissage en cours ne sera pas écrit
+            version_key = full_key + VERSION_SUFFIX
+            if shared is not None:
+                shared.set(version_key, uuid.uuid4().hex, self._version_ttl())
+            else:
+                self._versions.set(version_key, uuid.uuid4().hex, self._version_ttl())
+            with self._fill_lock:
+                self._local.delete(full_key)
+        else:
+            self._local.delete(full_key)
+        if shared is not None:
+            shared.delete(full_key)
+
+    def get_or_set(self, key, producer, ttl=None, tags=()):
+        """Valeur en cache, sinon ``producer()`` (calculée une seule fois à la fois)"""
+        value = self.get(key, MISSING)
+        if value is not MISSING:
+            return value
+
+        full_key = self.make_key(key)
+        with self._flight(full_key):
+            # Calculée par un autre thread pendant l'attente du verrou ?
+            entry = self._local.get(full_key, MISSING)
+            if entry is not MISSING:
+                return entry[1]
+
+            shared = shared_cache(self.alias)
+            lock_key = f'{full_key}:lock'
+            locked = shared is not None and shared.add(lock_key, 1, self.lock_timeout)
+            if shared is not None and not locked:
+                self.stats.incr('flight_waits')
+                value = self._wait_for(key)
+                if value is not MISSING:
+                    return value
+            try:
+                return self.set(key, producer(), ttl, tags)
+            finally:
+                if locked:
+                    shared.delete(lock_key)
+
+    def _count(self, field):
+        self.stats.incr(field)
+        counters = request_counters.get()
+        if counters is not None:
+            counters['misses' if field == 'misses' else 'hits'] += 1
+
+    def invalidate_tags(self, *tags):
+        invalidate_tags(*tags)
+
+    def clear_local(self):
+        self._local.clear()
+
+    def _wait_for(self, key):
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            value = self.get(key, MISSING)
+            if value is not MISSING:
+                return value
+        return MISSING
+
+    @contextmanager
+    def _flight(self, full_key):
+        with self._flights_lock:
+            flight = self._flights.get(full_key)
+            if flight is None:
+                flight = self._flights[full_key] = [threading.Lock(), 0]
+            flight[1] += 1
+        try:
+            if not flight[0].acquire(blocking=False):
+                self.stats.incr('flight_waits')
+                flight[0].acquire()
+            try:
+                yield
+            finally:
+                flight[0].release()
+        finally:
+            with self._flights_lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del self._flights[full_key]
+
+
+def _tag_keys(tags):
+    return {TAG_PREFIX + tag: tag for tag in tags}
+
+
+def _tag_versions(shared, tags):
+    """``{tag: version}`` à recopier dans une entrée (versions créées au besoin)"""
+    if not tags:
+        return {}
+    if shared is None:
+        return dict.fromkeys(tags)
+
+    keys = _tag_keys(tags)
+    versions = shared.get_many(list(keys))
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            shared.add(key, uuid.uuid4().hex, None)
+        versions.update(shared.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def _tags_current(shared, versions):
+    if not versions:
+        return True
+    current = shared.get_many([TAG_PREFIX + tag for tag in versions])
+    return all(current.get(TAG_PREFIX + tag) == version for tag, version in versions.items())
+
+
+def invalidate_tags(*tags, alias='default'):
+    """Invalide, dans tous les caches, les entrées portant l'un de ces tags"""
+    if not tags:
+        return
+    shared = shared_cache(alias)
+    if shared is not None:
+        shared.set_many({key: uuid.uuid4().hex for key in _tag_keys(tags)}, None)
+
+    tags = set(tags)
+    with _registry_lock:
+        registered = list(_registry)
+    for cache in registered:
+        removed = cache._local.delete_matching(lambda entry: not tags.isdisjoint(entry[0]))
+        cache.stats.incr('invalidated', removed)
+
+
+def all_stats():
+    """Compteurs de chaque cache du processus, par nom"""
+    with _registry_lock:
+        registered = list(_registry)
+    return {cache.name: cache.stats.snapshot() for cache in registered}
@@ -0,0 +1,222 @@
+"""
+Rapprochement automatique des avoirs non liés avec les factures ouvertes
+
+Deux requêtes chargent l'ensemble des données (factures ouvertes avec leur
+reste à imputer, avoirs actifs sans facture) ; l'appariement se fait ensuite
+en mémoire, fournisseur par fournisseur, sur des tableaux triés par date :
+
+1. montant exact : l'avoir est rattaché à la facture dont le reste à imputer
+   est égal à son montant, la plus proche en date ;
+2. glouton par date : les avoirs restants, du plus ancien au plus récent,
+   sont rattachés à la facture la plus proche en date dont le reste couvre
+   le montant.
+
+Dans les deux cas, la facture doit être datée à ``tolerance_days`` près de l'avoir.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.invoices.models import Invoice
+from .models import CreditNote
+
+EXACT = 'exact'
+BY_DATE = 'date'
+
+UPDATE_BATCH_SIZE = 1000
+
+
+def default_tolerance_days():
+    return getattr(settings, 'CREDIT_NOTE_ALLOCATION_TOLERANCE_DAYS', 60)
+
+
+def _open_invoices(supplier_id=None):
+    """``(id, supplier_id, invoice_date, reste à imputer, numéro)`` des factures ouvertes"""
+    allocated = CreditNote.active.filter(invoice_id=OuterRef('pk')).order_by().values(
+        'invoice_id'
+    ).annotate(total=Sum('amount')).values('total')
+
+    queryset = Invoice.active.exclude(status=Invoice.Status.PAID)
+    if supplier_id:
+        queryset = queryset.filter(supplier_id=supplier_id)
+    rows = queryset.annotate(
+        allocated=Coalesce(
+            Subquery(allocated),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )
+    ).order_by().values_list('id', 'supplier_id', 'invoice_date', 'net_to_pay', 'allocated', 'invoice_number')
+
+    return [
+        (invoice_id, supplier, invoice_date, net_to_pay - allocated, number)
+        for invoice_id, supplier, invoice_date, net_to_pay, allocated, number in rows
+        if net_to_pay - allocated > 0
+    ]
+
+
+def _unlinked_credit_notes(supplier_id=None):
+    queryset = CreditNote.active.filter(invoice__isnull=True)
+    if supplier_id:
+        queryset = queryset.filter(supplier_id=supplier_id)
+    return list(queryset.order_by().values_list(
+        'id', 'supplier_id', 'credit_note_date', 'amount', 'credit_note_number'
+    ))
+
+
+class _SupplierBook:
+    """Factures ouvertes d'un fournisseur, triées par date"""
+
+    def __init__(self, invoices):
+        invoices.sort(key=lambda invoice: invoice[2])
+        self.ids = [invoice[0] for invoice in invoices]
+        self.dates = [invoice[2] for invoice in invoices]
+        self.remaining = [invoice[3] for invoice in invoices]
+        self.numbers = [invoice[4] for invoice in invoices]
+        # Reste à imputer → positions (dans l'ordre des dates)
+        self.by_amount = defaultdict(list)
+        for index, remaining in enumerate(self.remaining):
+            self.by_amount[remaining].append(index)
+
+    def window(self, day, tolerance):
+        return (bisect_left(self.dates, day - tolerance), bisect_right(self.dates, day + tolerance))
+
+    def exact(self, day, amount, tolerance):
+        candidates = self.by_amount.get(amount)
+        if not candidates:
+            return None
+        low, high = self.window(day, tolerance)
+        best = None
+        for index in candidates:
+            if low <= index < high and self.remaining[index] == amount:
+                if best is None or abs(self.dates[index] - day) < abs(self.dates[best] - day):
+                    best = index
+        return best
+
+    def nearest(self, day, amount, tolerance):
+        """Facture la plus proche en date dont le reste couvre ``amount``"""
+        low, high = self.window(day, tolerance)
+        pivot = bisect_left(self.dates, day, low, high)
+        before, after = pivot - 1, pivot
+        while before >= low or after < high:
+            # On avance du côté le plus proche de la date de l'avoir
+            if after < high and (before < low or self.dates[after] - day <= day - self.dates[before]):
+                index, after = after, after + 1
+            else:
+                index, before = before, before - 1
+            if self.remaining[index] >= amount:
+                return index
+        return None
+
+    def consume(self, index, amount):
+        self.remaining[index] -= amount
+
+
+def plan_allocations(supplier_id=None, tolerance_days=None):
+    """
+    Calcule les rattachements sans rien écrire.
+
+    Retourne ``(allocations, non_rapprochés)`` ; chaque allocation est un dict
+    ``credit_note_id, credit_note_number, invoice_id, invoice_number, amount, method``.
+    """
+    tolerance = timedelta(days=default_tolerance_days() if tolerance_days is None else tolerance_days)
+
+    invoices_by_supplier = defaultdict(list)
+    for invoice in _open_invoices(supplier_id):
+        invoices_by_supplier[invoice[1]].append(invoice)
+
+    credit_notes_by_supplier = defaultdict(list)
+    for credit_note in _unlinked_credit_notes(supplier_id):
+        credit_notes_by_supplier[credit_note[1]].append(credit_note)
+
+    allocations = []
+    unmatched = 0
+    for supplier, credit_notes in credit_notes_by_supplier.items():
+        if supplier not in invoices_by_supplier:
+            unmatched += len(credit_notes)
+            continue
+
+        book = _SupplierBook(invoices_by_supplier[supplier])
+        credit_notes.sort(key=lambda credit_note: credit_note[2])
+
+        def allocate(credit_note, index, method):
+            credit_note_id, _, _, amount, number = credit_note
+            book.consume(index, amount)
+            allocations.append({
+                'credit_note_id': credit_note_id,
+                'credit_note_number': number,
+                'invoice_id': book.ids[index],
+                'invoice_number': book.numbers[index],
+                'amount': amount,
+                'method': method,
+            })
+
+        pending = []
+        for credit_note in credit_notes:
+            index = book.exact(credit_note[2], credit_note[3], tolerance)
+            if index is None:
+                pending.append(credit_note)
+            else:
+                allocate(credit_note, index, EXACT)
+
+        for credit_note in pending:
+            index = book.nearest(credit_note[2], credit_note[3], tolerance)
+            if index is None:
+                unmatched += 1
+            else:
+                allocate(credit_note, index, BY_DATE)
+
+    return allocations, unmatched
+
+
+def apply_allocations(allocations):
+    """
+    Enregistre les rattachements ; ignore les avoirs liés entre-temps.
+
+    Retourne le nombre d'avoirs rattachés.
+    """
+    if not allocations:
+        return 0
+
+    targets = {allocation['credit_note_id']: allocation['invoice_id'] for allocation in allocations}
+    meta = CreditNote._meta
+    qn = connection.ops.quote_name
+    id_field = meta.pk
+    invoice_field = meta.get_field('invoice')
+    updated_at_field = meta.get_field('updated_at')
+    now = updated_at_field.get_db_prep_value(timezone.now(), connection)
+
+    # Un UPDATE ... FROM (VALUES ...) par lot : un seul aller-retour pour
+    # UPDATE_BATCH_SIZE avoirs (executemany en enverrait un par ligne sous
+    # psycopg2, bulk_update construirait un CASE par ligne côté Python).
+    # Colonnes ``column1``/``column2`` : noms implicites de VALUES sous
+    # PostgreSQL comme sous SQLite.
+    table = qn(meta.db_table)
+    update = (
+        f"UPDATE {table} SET {qn(invoice_field.column)} = v.column2, {qn(updated_at_field.column)} = %s "
+        f"FROM (VALUES {{values}}) AS v WHERE {table}.{qn(id_field.column)} = v.column1"
+    )
+    with transaction.atomic():
+        # Verrouille les avoirs encore sans facture
+        pending = list(
+            CreditNote.objects.select_for_update()
+            .filter(pk__in=targets, invoice__isnull=True)
+            .values_list('pk', flat=True)
+        )
+        with connection.cursor() as cursor:
+            for start in range(0, len(pending), UPDATE_BATCH_SIZE):
+                batch = pending[start:start + UPDATE_BATCH_SIZE]
+                params = [now]
+                for pk in batch:
+                    params += [
+                        id_field.get_db_prep_value(pk, connection),
+                        invoice_field.get_db_prep_value(targets[pk], connection),
+                    ]
+                cursor.execute(update.format(values=', '.join(['(%s, %s)'] * len(batch))), params)
+    return len(pending)
@@ -0,0 +1,120 @@
+"""
+Création d'avoirs par lots (relevés mensuels fournisseurs)
+
+Là où ``CreditNoteCreateSerializer`` interroge la base pour chaque avoir
+(facture, fournisseur, unicité du numéro), un lot est résolu en trois
+requêtes quel que soit sa taille : factures référencées, fournisseurs
+référencés, puis numéros déjà utilisés. Les avoirs valides sont insérés
+par un seul ``bulk_create``.
+"""
+from django.db import transaction
+from django.utils.translation import gettext as _
+from rest_framework import serializers
+
+from apps.invoices.models import Invoice
+from apps.partitioning.partitions import enabled as partitioning_enabled, ensure_year
+from apps.suppliers.models import Supplier
+from .models import CreditNote
+
+# Taille maximale d'un lot (CREDIT_NOTE_BULK_MAX_ITEMS)
+DEFAULT_MAX_ITEMS = 1000
+
+DOES_NOT_EXIST = serializers.PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+
+
+def _existing_numbers(pairs):
+    """Couples (fournisseur, numéro) déjà utilisés par des avoirs actifs (une requête)"""
+    if not pairs:
+        return set()
+    return set(
+        CreditNote.active.filter(
+            supplier_id__in={supplier_id for supplier_id, _number in pairs},
+            credit_note_number__in={number for _supplier_id, number in pairs},
+        ).values_list('supplier_id', 'credit_note_number')
+    )
+
+
+def build_credit_notes(items):
+    """
+    Valide un lot déjà nettoyé par ``CreditNoteBulkItemSerializer``.
+
+    Retourne ``(avoirs non sauvegardés, erreurs)`` ; ``erreurs`` est une liste
+    alignée sur ``items`` (``{}`` pour une ligne valide), vide si tout le lot
+    est valide.
+    """
+    invoice_suppliers = dict(
+        Invoice.objects.filter(
+            pk__in={item['invoice'] for item in items if item.get('invoice')}
+        ).values_list('id', 'supplier_id')
+    )
+    known_suppliers = set(
+        Supplier.objects.filter(
+            pk__in={item['supplier'] for item in items if item.get('supplier')}
+        ).values_list('id', flat=True)
+    )
+
+    errors = [{} for _item in items]
+    resolved = []
+    for index, item in enumerate(items):
+        invoice_id = item.get('invoice')
+        supplier_id = item.get('supplier')
+
+        if invoice_id and invoice_id not in invoice_suppliers:
+            errors[index]['invoice'] = [DOES_NOT_EXIST.format(pk_value=invoice_id)]
+        if supplier_id and supplier_id not in known_suppliers:
+            errors[index]['supplier'] = [DOES_NOT_EXIST.format(pk_value=supplier_id)]
+        if errors[index]:
+            continue
+
+        if invoice_id:
+            if supplier_id and invoice_suppliers[invoice_id] != supplier_id:
+                errors[index]['invoice'] = [_("La facture sélectionnée n'appartient pas au fournisseur indiqué")]
+                continue
+            supplier_id = invoice_suppliers[invoice_id]
+        elif not supplier_id:
+            errors[index]['supplier'] = [_("Ce champ est obligatoire.")]
+            continue
+
+        resolved.append((index, supplier_id))
+
+    existing = _existing_numbers({(supplier_id, items[index]['credit_note_number']) for index, supplier_id in resolved})
+    seen = set()
+    credit_notes = []
+    for index, supplier_id in resolved:
+        item = items[index]
+        key = (supplier_id, item['credit_note_number'])
+        if key in existing:
+            errors[index]['credit_note_number'] = [_("Un avoir avec ce numéro existe déjà pour ce fournisseur")]
+            continue
+        if key in seen:
+            errors[index]['credit_note_number'] = [_("Avoir en double dans le lot")]
+            continue
+        seen.add(key)
+
+        credit_note_date = item['credit_note_date']
+        credit_notes.append(CreditNote(
+            supplier_id=supplier_id,
+            invoice_id=item.get('invoice'),
+            credit_note_number=item['credit_note_number'],
+            amount=item['amount'],
+            credit_note_date=credit_note_date,
+            motif=item.get('motif') or item.get('reason') or None,
+            # bulk_create n'appelle pas save() : période renseignée ici
+            month=credit_note_date.month,
+            year=credit_note_date.year,
+        ))
+
+    if any(errors):
+        return [], errors
+    return credit_notes, []
+
+
+def create_credit_notes(credit_notes):
+    """Insère un lot validé en une transaction ; retourne les avoirs créés"""
+    if partitioning_enabled():
+        # bulk_create n'émet pas pre_save : partitions créées ici
+        for year in {credit_note.year for credit_note in credit_notes}:
+            ensure_year(CreditNote, year)
+
+    with transaction.atomic():
+        return CreditNote.objects.bulk_create(credit_notes, batch_size=500)
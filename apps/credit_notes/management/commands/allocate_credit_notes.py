@@ -0,0 +1,50 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.credit_notes.allocation import EXACT, apply_allocations, plan_allocations
+
+
+class Command(BaseCommand):
+    help = "Rattache les avoirs sans facture aux factures ouvertes (montant exact, puis date)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--supplier', help="Limiter à un fournisseur (UUID)")
+        parser.add_argument('--tolerance-days', type=int, help="Écart de date maximal")
+        parser.add_argument('--apply', action='store_true', help="Enregistrer (sinon simulation)")
+        parser.add_argument('--verbose-list', action='store_true', help="Afficher chaque rattachement")
+
+    def handle(self, *args, **options):
+        supplier_id = options['supplier']
+        if supplier_id is not None:
+            try:
+                supplier_id = uuid.UUID(supplier_id)
+            except ValueError:
+                raise CommandError(f"--supplier : UUID invalide ({supplier_id!r})")
+
+        start = time.monotonic()
+        allocations, unmatched = plan_allocations(
+            supplier_id=supplier_id,
+            tolerance_days=options['tolerance_days'],
+        )
+        elapsed = time.monotonic() - start
+
+        if options['verbose_list']:
+            for allocation in allocations:
+                self.stdout.write(
+                    f"{allocation['credit_note_number']} → {allocation['invoice_number']} "
+                    f"({allocation['amount']}, {allocation['method']})"
+                )
+
+        exact = sum(1 for allocation in allocations if allocation['method'] == EXACT)
+        self.stdout.write(
+            f"{len(allocations)} rattachement(s) dont {exact} au montant exact, "
+            f"{unmatched} avoir(s) sans correspondance ({elapsed:.2f}s)"
+        )
+
+        if options['apply']:
+            applied = apply_allocations(allocations)
+            self.stdout.write(self.style.SUCCESS(f"{applied} avoir(s) rattaché(s)"))
+        else:
+            self.stdout.write("Simulation : relancer avec --apply pour enregistrer")
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-19 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("credit_notes", "0004_remove_creditnote_status"),
+        ("invoices", "0005_invoice_invoices_in_updated_dc8602_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="creditnote",
+            index=models.Index(
+                fields=["updated_at"], name="credit_note_updated_55b364_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.6 on 2026-10-19 02:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY : pas de verrou d'écriture sur la table
+    atomic = False
+
+    dependencies = [
+        ("credit_notes", "0005_creditnote_credit_note_updated_55b364_idx"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="creditnote",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["supplier", "credit_note_date"],
+                name="credit_notes_active_supp_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="creditnote",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["credit_note_date"],
+                name="credit_notes_active_date_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="creditnote",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["month", "year"],
+                name="credit_notes_active_per_idx",
+            ),
+        ),
+        RemoveIndexConcurrently(
+            model_name="creditnote",
+            name="credit_note_is_acti_c6c872_idx",
+        ),
+        # Index complets rendus inutiles par les index partiels (fournisseur :
+        # index de la clé étrangère)
+        RemoveIndexConcurrently(
+            model_name="creditnote",
+            name="credit_note_supplie_c0bff5_idx",
+        ),
+        RemoveIndexConcurrently(
+            model_name="creditnote",
+            name="credit_note_credit__14285e_idx",
+        ),
+        RemoveIndexConcurrently(
+            model_name="creditnote",
+            name="credit_note_month_6a3b6f_idx",
+        ),
+    ]
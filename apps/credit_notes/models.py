@@ -4,6 +4,7 @@ from django.core.validators import MinValueValidator
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
 from apps.suppliers.models import Supplier
+from apps.api.managers import ActiveManager, ActiveQuerySet
 
 
 class CreditNote(models.Model):
@@ -71,17 +72,36 @@ class CreditNote(models.Model):
         auto_now=True,
         verbose_name=_('Mis à jour le')
     )
+
+    objects = ActiveQuerySet.as_manager()
+    active = ActiveManager()
     
     class Meta:
         db_table = 'credit_notes_credit_notes'
         verbose_name = _('Avoir')
         verbose_name_plural = _('Avoirs')
         ordering = ['-credit_note_date', '-created_at']
+        # Pas d'index complets sur la date ou la période : les requêtes passent
+        # par les lignes actives (index partiels ci-dessous). Fournisseur :
+        # index de la clé étrangère, qui couvre aussi les lignes inactives.
         indexes = [
-            models.Index(fields=['supplier']),
-            models.Index(fields=['credit_note_date']),
-            models.Index(fields=['month', 'year']),
-            models.Index(fields=['is_active']),
+            models.Index(fields=['updated_at']),
+            # Index partiels sur les lignes actives (CreditNote.active)
+            models.Index(
+                fields=['supplier', 'credit_note_date'],
+                name='credit_notes_active_supp_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['credit_note_date'],
+                name='credit_notes_active_date_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['month', 'year'],
+                name='credit_notes_active_per_idx',
+                condition=models.Q(is_active=True),
+            ),
         ]
     
     def __str__(self):
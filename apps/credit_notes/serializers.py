@@ -1,7 +1,9 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
 from .models import CreditNote
+from .bulk import DEFAULT_MAX_ITEMS, build_credit_notes, create_credit_notes
 from apps.suppliers.serializers import SupplierSerializer
 from apps.invoices.models import Invoice
 
@@ -193,3 +195,51 @@ class CreditNoteUpdateSerializer(serializers.ModelSerializer):
                     _("Un avoir avec ce numéro existe déjà pour ce fournisseur")
                 )
         return value
+
+
+class CreditNoteAllocationSerializer(serializers.Serializer):
+    """
+    Paramètres du rapprochement automatique avoirs → factures
+    """
+    supplier = serializers.UUIDField(required=False)
+    tolerance_days = serializers.IntegerField(required=False, min_value=0, max_value=366)
+    dry_run = serializers.BooleanField(default=True)
+
+
+class CreditNoteBulkItemSerializer(serializers.Serializer):
+    """
+    Ligne d'un lot d'avoirs : mêmes champs que la création unitaire,
+    les références étant résolues pour tout le lot (voir ``bulk.py``)
+    """
+    invoice = serializers.UUIDField(required=False, allow_null=True)
+    supplier = serializers.UUIDField(required=False, allow_null=True)
+    credit_note_number = serializers.CharField(max_length=100)
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.01'))
+    credit_note_date = serializers.DateField()
+    motif = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    reason = serializers.CharField(write_only=True, required=False, allow_blank=True)
+
+
+class CreditNoteBulkCreateSerializer(serializers.Serializer):
+    """
+    Création d'un lot d'avoirs (tout ou rien)
+    """
+    credit_notes = CreditNoteBulkItemSerializer(many=True, allow_empty=False)
+
+    def validate_credit_notes(self, value):
+        max_items = getattr(settings, 'CREDIT_NOTE_BULK_MAX_ITEMS', DEFAULT_MAX_ITEMS)
+        if len(value) > max_items:
+            raise serializers.ValidationError(
+                _("Un lot ne peut contenir plus de %(max)d avoirs") % {'max': max_items}
+            )
+        return value
+
+    def validate(self, attrs):
+        credit_notes, errors = build_credit_notes(attrs['credit_notes'])
+        if errors:
+            raise serializers.ValidationError({'credit_notes': errors})
+        attrs['instances'] = credit_notes
+        return attrs
+
+    def create(self, validated_data):
+        return create_credit_notes(validated_data['instances'])
@@ -0,0 +1,100 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.credit_notes import allocation
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.suppliers.models import Supplier
+
+
+class TestCreditNoteAllocation(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="pass", role=User.Role.ADMIN)
+        self.supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        other = Supplier.objects.create(name="SUP B", code="SUPB", siret="12345678901235")
+
+        self.inv_100 = Invoice.objects.create(
+            supplier=self.supplier, invoice_number="F1", net_to_pay=100,
+            invoice_date=date(2026, 1, 5), status=Invoice.Status.PENDING
+        )
+        self.inv_500 = Invoice.objects.create(
+            supplier=self.supplier, invoice_number="F2", net_to_pay=500,
+            invoice_date=date(2026, 1, 20), status=Invoice.Status.PENDING
+        )
+        Invoice.objects.create(
+            supplier=other, invoice_number="F3", net_to_pay=30,
+            invoice_date=date(2026, 1, 20), status=Invoice.Status.PENDING
+        )
+
+        # Montant exact sur F1 (plus ancienne), puis date la plus proche sur F2
+        self.cn_exact = CreditNote.objects.create(
+            supplier=self.supplier, credit_note_number="A1", amount=100, credit_note_date=date(2026, 1, 25)
+        )
+        self.cn_date = CreditNote.objects.create(
+            supplier=self.supplier, credit_note_number="A2", amount=30, credit_note_date=date(2026, 1, 22)
+        )
+        self.cn_far = CreditNote.objects.create(
+            supplier=self.supplier, credit_note_number="A3", amount=30, credit_note_date=date(2026, 9, 1)
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def test_dry_run_then_apply(self):
+        url = reverse("credit_notes:credit-note-allocate")
+
+        r = self.client.post(url, {}, format="json")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["matched_count"], 2)
+        self.assertEqual(r.data["exact_count"], 1)
+        self.assertEqual(r.data["unmatched_count"], 1)
+        planned = {a["credit_note_id"]: a["invoice_id"] for a in r.data["allocations"]}
+        self.assertEqual(planned, {self.cn_exact.pk: self.inv_100.pk, self.cn_date.pk: self.inv_500.pk})
+        self.cn_exact.refresh_from_db()
+        self.assertIsNone(self.cn_exact.invoice_id)
+
+        r = self.client.post(url, {"dry_run": False}, format="json")
+        self.assertEqual(r.data["applied_count"], 2)
+        self.cn_date.refresh_from_db()
+        self.assertEqual(self.cn_date.invoice_id, self.inv_500.pk)
+
+        # Plus rien à rapprocher hormis l'avoir hors tolérance
+        r = self.client.post(url, {}, format="json")
+        self.assertEqual(r.data["matched_count"], 0)
+
+    def test_apply_one_update_per_batch(self):
+        allocations = [
+            {"credit_note_id": self.cn_exact.pk, "invoice_id": self.inv_100.pk},
+            {"credit_note_id": self.cn_date.pk, "invoice_id": self.inv_500.pk},
+            {"credit_note_id": self.cn_far.pk, "invoice_id": self.inv_500.pk},
+        ]
+        # Avoir rattaché entre le calcul et l'enregistrement : ignoré
+        CreditNote.objects.filter(pk=self.cn_far.pk).update(invoice=self.inv_100)
+
+        with mock.patch.object(allocation, "UPDATE_BATCH_SIZE", 1), CaptureQueriesContext(connection) as queries:
+            applied = allocation.apply_allocations(allocations)
+
+        self.assertEqual(applied, 2)
+        updates = [query["sql"] for query in queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 2)
+        self.assertTrue(all("VALUES" in sql for sql in updates))
+        self.assertEqual(
+            dict(CreditNote.objects.values_list("credit_note_number", "invoice_id")),
+            {"A1": self.inv_100.pk, "A2": self.inv_500.pk, "A3": self.inv_100.pk},
+        )
+
+    def test_command_validates_supplier(self):
+        with self.assertRaisesMessage(CommandError, "UUID invalide"):
+            call_command("allocate_credit_notes", supplier="SUPA", stdout=StringIO())
+
+        out = StringIO()
+        call_command("allocate_credit_notes", supplier=str(self.supplier.pk), apply=True, stdout=out)
+        self.assertIn("2 avoir(s) rattaché(s)", out.getvalue())
+        self.cn_exact.refresh_from_db()
+        self.assertEqual(self.cn_exact.invoice_id, self.inv_100.pk)
@@ -0,0 +1,66 @@
+from datetime import date
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import User
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.suppliers.models import Supplier
+
+
+class TestCreditNoteBulkCreate(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="pass", role=User.Role.ADMIN)
+        self.supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        self.other = Supplier.objects.create(name="SUP B", code="SUPB", siret="12345678901235")
+        self.invoice = Invoice.objects.create(
+            supplier=self.supplier, invoice_number="F1", net_to_pay=100,
+            invoice_date=date.today(), status=Invoice.Status.PENDING
+        )
+        CreditNote.objects.create(
+            supplier=self.supplier, credit_note_number="A0", amount=5, credit_note_date=date.today()
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def _item(self, number, **extra):
+        item = {"credit_note_number": number, "amount": "10.00", "credit_note_date": date.today().isoformat()}
+        item.update(extra)
+        return item
+
+    def test_batch_is_created_with_constant_query_count(self):
+        items = [self._item(f"A{i}", supplier=str(self.supplier.pk)) for i in range(1, 40)]
+        items.append(self._item("B1", invoice=str(self.invoice.pk), reason="Casse"))
+
+        with CaptureQueriesContext(connection) as queries:
+            r = self.client.post(reverse("credit_notes:credit-note-bulk"), {"credit_notes": items}, format="json")
+
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(r.data["created_count"], 40)
+        # factures, fournisseurs, numéros existants, insertion (+ savepoint)
+        self.assertLessEqual(len(queries), 7)
+
+        created = CreditNote.objects.get(credit_note_number="B1")
+        self.assertEqual(created.supplier_id, self.supplier.pk)
+        self.assertEqual(created.motif, "Casse")
+        self.assertEqual((created.month, created.year), (date.today().month, date.today().year))
+
+    def test_invalid_row_rejects_whole_batch(self):
+        r = self.client.post(reverse("credit_notes:credit-note-bulk"), {"credit_notes": [
+            self._item("A1", supplier=str(self.supplier.pk)),
+            self._item("A0", supplier=str(self.supplier.pk)),
+            self._item("A1", supplier=str(self.supplier.pk)),
+            self._item("A2", supplier=str(self.other.pk), invoice=str(self.invoice.pk)),
+            self._item("A3"),
+        ]}, format="json")
+
+        self.assertEqual(r.status_code, 400)
+        errors = r.data["credit_notes"]
+        self.assertEqual(errors[0], {})
+        self.assertIn("credit_note_number", errors[1])
+        self.assertIn("credit_note_number", errors[2])
+        self.assertIn("invoice", errors[3])
+        self.assertIn("supplier", errors[4])
+        self.assertEqual(CreditNote.objects.count(), 1)
@@ -0,0 +1,44 @@
+from datetime import date
+
+from rest_framework.test import APITestCase
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.suppliers.models import Supplier
+
+
+class TestFastListRendering(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="pass", role=User.Role.ADMIN)
+        self.client.force_authenticate(user=self.admin)
+
+        supplier = Supplier.objects.create(name="SUP A", siret="12345678901234")
+        for i in range(25):
+            invoice = Invoice.objects.create(
+                supplier=supplier, invoice_number=f"F{i}", net_to_pay="12.5",
+                invoice_date=date(2026, 1, 1 + i), notes="note" if i % 2 else None,
+                due_date=date(2026, 3, 1) if i % 3 else None
+            )
+            CreditNote.objects.create(
+                supplier=supplier, invoice=invoice if i % 2 else None,
+                credit_note_number=f"A{i}", amount=2, credit_note_date=date(2026, 1, 2),
+                motif="retour" if i % 2 else None
+            )
+
+    def assertSameOutput(self, url):
+        standard = self.client.get(url + "render=serializer")
+        fast = self.client.get(url + "render=fast")
+        self.assertEqual(standard.status_code, 200)
+        self.assertEqual(standard.content.replace(b"render=serializer", b"render=fast"), fast.content)
+
+    def test_credit_notes_fast_path_matches_serializer(self):
+        # Les avoirs sans facture n'ont pas de clés invoice_id / invoice_number
+        self.assertSameOutput(reverse("credit_notes:credit-note-list") + "?")
+        self.assertSameOutput(reverse("credit_notes:credit-note-list") + "?page=2&")
+        self.assertSameOutput(reverse("credit_notes:credit-note-list") + "?fields=id,invoice_number,amount&")
+
+    def test_invoices_fast_path_matches_serializer(self):
+        self.assertSameOutput(reverse("invoices:invoice-list") + "?")
+        self.assertSameOutput(reverse("invoices:invoice-list") + "?ordering=net_to_pay&fields=-notes&")
@@ -11,16 +11,25 @@ from .serializers import (
     CreditNoteSerializer,
     CreditNoteListSerializer,
     CreditNoteCreateSerializer,
-    CreditNoteUpdateSerializer
+    CreditNoteUpdateSerializer,
+    CreditNoteAllocationSerializer,
+    CreditNoteBulkCreateSerializer
 )
+from .allocation import EXACT, apply_allocations, plan_allocations
+from apps.api.sparse_fields import SparseFieldsetMixin, SPARSE_FIELDS_PARAMETER
+from apps.api.fast_render import FastListMixin, FAST_RENDER_PARAMETER
 from apps.accounts.permissions import IsFinanceUser, IsAdminUser
+from apps.archive.mixins import ArchiveFallbackMixin
+from apps.archive.models import ArchivedCreditNote
+from apps.archive.rollups import CREDIT_NOTE, archived_totals, archived_totals_by_supplier
 
 
-class CreditNoteViewSet(viewsets.ModelViewSet):
+class CreditNoteViewSet(ArchiveFallbackMixin, SparseFieldsetMixin, FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet pour la gestion des avoirs
     """
     queryset = CreditNote.objects.select_related('supplier', 'invoice').all()
+    archive_model = ArchivedCreditNote
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['supplier', 'month', 'year']
     search_fields = [
@@ -39,11 +48,15 @@ class CreditNoteViewSet(viewsets.ModelViewSet):
             return CreditNoteCreateSerializer
         elif self.action in ['update', 'partial_update']:
             return CreditNoteUpdateSerializer
+        elif self.action == 'allocate':
+            return CreditNoteAllocationSerializer
+        elif self.action == 'bulk':
+            return CreditNoteBulkCreateSerializer
         return CreditNoteSerializer
     
     def get_permissions(self):
         """Gestion des permissions selon l'action"""
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'allocate', 'bulk']:
             permission_classes = [IsAdminUser]
         else:
             permission_classes = [IsFinanceUser]
@@ -51,10 +64,19 @@ class CreditNoteViewSet(viewsets.ModelViewSet):
     
     @extend_schema(
         summary="Lister les avoirs",
-        description="Lister tous les avoirs avec filtres et recherche"
+        description="Lister tous les avoirs avec filtres et recherche",
+        parameters=[SPARSE_FIELDS_PARAMETER, FAST_RENDER_PARAMETER]
     )
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.queryset)
+        archive_response = self.archive_list(queryset)
+        if archive_response is not None:
+            return archive_response
+
+        fast_response = self.fast_list(queryset)
+        if fast_response is not None:
+            return fast_response
+
         page = self.paginate_queryset(queryset)
         
         if page is not None:
@@ -133,14 +155,31 @@ class CreditNoteViewSet(viewsets.ModelViewSet):
         if year:
             queryset = queryset.filter(year=year)
         
-        stats = queryset.values(
+        stats = list(queryset.values(
             'supplier__id',
             'supplier__name',
             'supplier__code'
         ).annotate(
             total_credit_notes=Sum('amount'),
             credit_note_count=Count('id')
-        ).order_by('-total_credit_notes')
+        ).order_by('-total_credit_notes'))
+
+        # Cumuls des exercices archivés
+        archived = archived_totals_by_supplier(CREDIT_NOTE, year=year, month=month)
+        if archived:
+            for row in stats:
+                rollup = archived.pop(row['supplier__id'], None)
+                if rollup:
+                    row['total_credit_notes'] += rollup['total']
+                    row['credit_note_count'] += rollup['count']
+            stats.extend({
+                'supplier__id': rollup['supplier__id'],
+                'supplier__name': rollup['supplier__name'],
+                'supplier__code': rollup['supplier__code'],
+                'total_credit_notes': rollup['total'],
+                'credit_note_count': rollup['count'],
+            } for rollup in archived.values())
+            stats.sort(key=lambda row: row['total_credit_notes'], reverse=True)
         
         return Response({
             'period': {'month': month, 'year': year} if month or year else None,
@@ -179,8 +218,63 @@ class CreditNoteViewSet(viewsets.ModelViewSet):
             total_credit_notes=Sum('amount'),
             credit_note_count=Count('id')
         )
+        archived_total, archived_count = archived_totals(CREDIT_NOTE, year=year, month=month)
+        if archived_count:
+            totals['total_credit_notes'] = (totals['total_credit_notes'] or 0) + archived_total
+            totals['credit_note_count'] += archived_count
         
         return Response({
             'period': {'month': month, 'year': year},
             'totals': totals
         })
+
+    @extend_schema(
+        summary="Rapprochement automatique",
+        description=(
+            "Rattache les avoirs sans facture aux factures ouvertes du même fournisseur : "
+            "montant exact d'abord, puis date la plus proche dans la tolérance. "
+            "dry_run (par défaut) renvoie le plan sans rien enregistrer (Admin uniquement)."
+        )
+    )
+    @action(detail=False, methods=['post'])
+    def allocate(self, request):
+        """Rapprochement avoirs → factures"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        allocations, unmatched = plan_allocations(
+            supplier_id=params.get('supplier'),
+            tolerance_days=params.get('tolerance_days'),
+        )
+        applied = 0 if params['dry_run'] else apply_allocations(allocations)
+
+        return Response({
+            'dry_run': params['dry_run'],
+            'matched_count': len(allocations),
+            'exact_count': sum(1 for allocation in allocations if allocation['method'] == EXACT),
+            'unmatched_count': unmatched,
+            'applied_count': applied,
+            'allocations': allocations,
+        })
+
+    @extend_schema(
+        summary="Créer des avoirs par lot",
+        description=(
+            "Crée un lot d'avoirs (relevé mensuel fournisseur) en une seule transaction : "
+            "factures, fournisseurs et numéros déjà utilisés sont vérifiés pour tout le lot. "
+            "Si une ligne est invalide, rien n'est créé et les erreurs sont renvoyées "
+            "ligne par ligne (Admin uniquement)."
+        )
+    )
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Création d'avoirs par lot"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        credit_notes = serializer.save()
+
+        return Response({
+            'created_count': len(credit_notes),
+            'ids': [str(credit_note.pk) for credit_note in credit_notes],
+        }, status=status.HTTP_201_CREATED)
@@ -0,0 +1,91 @@
+"""
+Pools de connexions psycopg 3 (``psycopg_pool``), un par alias et par processus
+
+Utilisés par le backend ``apps.dbpool.postgresql`` (``DB_POOL = True``) :
+chaque requête emprunte une connexion déjà ouverte (TLS et authentification
+faits une fois) et la rend en fin de requête.
+Tailles : ``DB_POOL_MIN_SIZE``, ``DB_POOL_MAX_SIZE`` ; attente maximale d'une
+connexion libre : ``DB_POOL_TIMEOUT`` secondes.
+"""
+import atexit
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+DEFAULT_MIN_SIZE = 2
+DEFAULT_MAX_SIZE = 10
+DEFAULT_TIMEOUT = 10.0
+
+_pools = {}
+_lock = threading.Lock()
+
+
+def get_pool(alias, conn_params):
+    """Pool de l'alias, ouvert au premier emprunt"""
+    pool = _pools.get(alias)
+    if pool is not None:
+        return pool
+
+    try:
+        from psycopg_pool import ConnectionPool
+    except ImportError:
+        raise ImproperlyConfigured("DB_POOL nécessite psycopg 3 et psycopg_pool (paquet psycopg[pool])")
+
+    with _lock:
+        if alias not in _pools:
+            options = {}
+            if getattr(settings, 'DB_CONN_HEALTH_CHECKS', False) and hasattr(ConnectionPool, 'check_connection'):
+                # Connexion vérifiée à l'emprunt (psycopg_pool >= 3.2)
+                options['check'] = ConnectionPool.check_connection
+            _pools[alias] = ConnectionPool(
+                kwargs=conn_params,
+                min_size=getattr(settings, 'DB_POOL_MIN_SIZE', DEFAULT_MIN_SIZE),
+                max_size=getattr(settings, 'DB_POOL_MAX_SIZE', DEFAULT_MAX_SIZE),
+                timeout=getattr(settings, 'DB_POOL_TIMEOUT', DEFAULT_TIMEOUT),
+                name=alias,
+                open=True,
+                **options,
+            )
+    return _pools[alias]
+
+
+def pool_stats(alias='default'):
+    """
+    Métriques du pool de l'alias, ou ``None`` sans pool.
+
+    ``in_use`` et ``waiting`` sont instantanés ; les autres valeurs sont
+    cumulées depuis l'ouverture du pool (``waits`` : emprunts qui ont dû
+    attendre, ``timeouts`` : emprunts abandonnés après ``DB_POOL_TIMEOUT``).
+    """
+    pool = _pools.get(alias)
+    if pool is None:
+        return None
+
+    stats = pool.get_stats()
+    size = stats.get('pool_size', 0)
+    connects = stats.get('connections_num', 0) - stats.get('connections_errors', 0)
+    requests = stats.get('requests_num', 0)
+    return {
+        'min_size': stats.get('pool_min'),
+        'max_size': stats.get('pool_max'),
+        'size': size,
+        'in_use': size - stats.get('pool_available', 0),
+        'waiting': stats.get('requests_waiting', 0),
+        'requests': requests,
+        'waits': stats.get('requests_queued', 0),
+        'wait_ms_avg': round(stats.get('requests_wait_ms', 0) / requests, 2) if requests else 0.0,
+        'timeouts': stats.get('requests_errors', 0),
+        'connects': connects,
+        'connect_ms_avg': round(stats.get('connections_ms', 0) / connects, 2) if connects else 0.0,
+        'connect_errors': stats.get('connections_errors', 0),
+        'connections_lost': stats.get('connections_lost', 0),
+    }
+
+
+@atexit.register
+def close_pools():
+    with _lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
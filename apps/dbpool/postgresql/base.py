@@ -0,0 +1,46 @@
+"""
+Backend PostgreSQL à pool de connexions (``ENGINE = 'apps.dbpool.postgresql'``)
+
+Identique au backend de Django, mais les connexions sont empruntées au pool
+du processus (``apps.dbpool.pool``) au lieu d'être ouvertes, et lui sont
+rendues au lieu d'être fermées. ``CONN_MAX_AGE`` doit valoir 0 : la
+connexion retourne au pool à la fin de chaque requête.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+
+from ..pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        if not is_psycopg3:
+            raise ImproperlyConfigured("Le pool de connexions nécessite psycopg 3")
+
+        options = self.settings_dict['OPTIONS']
+        set_isolation_level = False
+        try:
+            isolation_level_value = options['isolation_level']
+        except KeyError:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        else:
+            try:
+                self.isolation_level = IsolationLevel(isolation_level_value)
+                set_isolation_level = True
+            except ValueError:
+                raise ImproperlyConfigured(
+                    f"Invalid transaction isolation level {isolation_level_value} "
+                    f"specified. Use one of the psycopg.IsolationLevel values."
+                )
+
+        connection = get_pool(self.alias, conn_params).getconn()
+        if set_isolation_level:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            # Transaction éventuelle annulée par le pool avant réutilisation
+            with self.wrap_database_errors:
+                get_pool(self.alias, None).putconn(self.connection)
@@ -0,0 +1,53 @@
+import importlib.util
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+from apps.dbpool import pool
+
+ALIAS = "pool_backend_test"
+
+
+@skipUnless(connection.vendor == "postgresql", "Backend à pool PostgreSQL uniquement")
+@skipUnless(importlib.util.find_spec("psycopg_pool"), "psycopg_pool non installé")
+@override_settings(DB_POOL_MIN_SIZE=1, DB_POOL_MAX_SIZE=1, DB_POOL_TIMEOUT=2)
+class TestPoolBackend(TransactionTestCase):
+    def setUp(self):
+        from apps.dbpool.postgresql.base import DatabaseWrapper
+
+        self.wrapper = DatabaseWrapper(
+            {**connection.settings_dict, "ENGINE": "apps.dbpool.postgresql", "CONN_MAX_AGE": 0}, ALIAS
+        )
+        self.addCleanup(lambda: pool._pools.pop(ALIAS).close())
+        self.addCleanup(self.wrapper.close)
+
+    def backend_pid(self):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def test_connection_borrowed_then_returned(self):
+        pid = self.backend_pid()
+        self.assertEqual(pool.pool_stats(ALIAS)["in_use"], 1)
+
+        self.wrapper.close()
+        self.assertIsNone(self.wrapper.connection)
+        stats = pool.pool_stats(ALIAS)
+        self.assertEqual((stats["size"], stats["in_use"]), (1, 0))
+
+        # Même connexion serveur réempruntée, sans nouvelle ouverture
+        self.assertEqual(self.backend_pid(), pid)
+        self.assertEqual(pool.pool_stats(ALIAS)["connects"], 1)
+
+    def test_open_transaction_rolled_back_on_return(self):
+        self.wrapper.ensure_connection()
+        self.wrapper.set_autocommit(False)
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("CREATE TEMPORARY TABLE pool_probe (id int)")
+            cursor.execute("INSERT INTO pool_probe VALUES (1)")
+        self.wrapper.close()
+
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pool_probe')")
+            self.assertIsNone(cursor.fetchone()[0])
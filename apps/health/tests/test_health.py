@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from apps.dbpool import pool
+
+
+class TestHealthConnections(TestCase):
+    def test_reports_connection_settings(self):
+        response = self.client.get("/api/health/")
+        self.assertEqual(response.status_code, 200)
+        connections = response.json()["services"]["database"]["connections"]
+        database = settings.DATABASES["default"]
+        self.assertEqual(connections["conn_max_age"], database.get("CONN_MAX_AGE", 0))
+        self.assertEqual(connections["health_checks"], database.get("CONN_HEALTH_CHECKS", False))
+        # Statistiques présentes seulement avec le backend à pool (DB_POOL)
+        if database["ENGINE"] == "apps.dbpool.postgresql":
+            self.assertIsNotNone(connections["pool"])
+        else:
+            self.assertIsNone(connections["pool"])
+
+    @override_settings(DB_POOL_MIN_SIZE=1, DB_POOL_MAX_SIZE=2, DB_POOL_TIMEOUT=0.2)
+    def test_pool_stats_shape(self):
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            self.skipTest("psycopg_pool non installé")
+
+        # Serveur injoignable : l'emprunt expire, les compteurs l'enregistrent
+        unreachable = pool.get_pool("unreachable", {"host": "127.0.0.1", "port": 1, "dbname": "x"})
+        self.addCleanup(lambda: pool._pools.pop("unreachable").close())
+        with self.assertRaises(psycopg_pool.PoolTimeout):
+            unreachable.getconn()
+
+        stats = pool.pool_stats("unreachable")
+        self.assertEqual((stats["min_size"], stats["max_size"]), (1, 2))
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["waits"], 1)
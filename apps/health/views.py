@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.db import connection
@@ -5,17 +6,23 @@ from django.conf import settings
 from django.utils import timezone
 import json
 
+from apps.dbpool.pool import pool_stats
+
+
+def _ping_database():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
 
 @require_http_methods(["GET"])
-def health_check(request):
+async def health_check(request):
     """
     Health check endpoint pour monitoring et status du backend
     """
     try:
         # Vérifier la connexion à la base de données
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            db_status = "healthy"
+        await sync_to_async(_ping_database)()
+        db_status = "healthy"
     except Exception as e:
         db_status = f"unhealthy: {str(e)}"
     
@@ -30,7 +37,13 @@ def health_check(request):
         "services": {
             "database": {
                 "status": db_status,
-                "engine": settings.DATABASES["default"]["ENGINE"]
+                "engine": settings.DATABASES["default"]["ENGINE"],
+                "connections": {
+                    "conn_max_age": settings.DATABASES["default"].get("CONN_MAX_AGE", 0),
+                    "health_checks": settings.DATABASES["default"].get("CONN_HEALTH_CHECKS", False),
+                    # Pool du worker qui répond (None sans DB_POOL)
+                    "pool": pool_stats(),
+                },
             },
             "api": {
                 "status": "healthy",
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from .models import Invoice
+from .models import Invoice, InvoiceImport
 
 
 @admin.register(Invoice)
@@ -62,3 +62,21 @@ class InvoiceAdmin(admin.ModelAdmin):
         if obj:  # Modification
             return self.readonly_fields + ['supplier']
         return self.readonly_fields
+
+
+@admin.register(InvoiceImport)
+class InvoiceImportAdmin(admin.ModelAdmin):
+    """Configuration admin pour le suivi des imports de factures"""
+
+    list_display = [
+        'original_filename', 'status', 'processed_rows',
+        'created_count', 'error_count', 'created_by', 'created_at'
+    ]
+    list_filter = ['status', 'created_at']
+    search_fields = ['original_filename']
+    ordering = ['-created_at']
+    readonly_fields = [
+        'status', 'file', 'original_filename', 'file_size', 'bytes_processed',
+        'chunk_size', 'processed_rows', 'created_count', 'error_count',
+        'errors', 'message', 'created_by', 'created_at', 'started_at', 'finished_at'
+    ]
@@ -0,0 +1,122 @@
+"""
+Opérations ensemblistes sur les factures (changement de statut, désactivation)
+
+Chaque opération s'exécute en un seul ``UPDATE ... RETURNING`` construit à
+partir du queryset de sélection, au lieu d'un chargement + save() par facture.
+"""
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Invoice
+
+
+def _selection_sql(queryset):
+    """SQL (et paramètres) de la sous-requête des ids sélectionnés"""
+    return queryset.order_by().values('pk').query.sql_with_params()
+
+
+def _normalize_ids(values):
+    """Convertit les ids renvoyés par le SGBD (UUID ou hex) en chaînes"""
+    to_python = Invoice._meta.pk.to_python
+    return [str(to_python(value)) for value in values]
+
+
+def _update_returning(assignments, assignment_params, queryset, extra_where='', extra_params=()):
+    """
+    Exécute ``UPDATE invoices SET ... WHERE id IN (sélection) ... RETURNING id``
+    """
+    qn = connection.ops.quote_name
+    table = qn(Invoice._meta.db_table)
+    pk_column = qn(Invoice._meta.pk.column)
+    selection_sql, selection_params = _selection_sql(queryset)
+
+    sql = (
+        f"UPDATE {table} SET {assignments} "
+        f"WHERE {pk_column} IN ({selection_sql}){extra_where} "
+        f"RETURNING {pk_column}"
+    )
+    params = [*assignment_params, *selection_params, *extra_params]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return _normalize_ids(row[0] for row in cursor.fetchall())
+
+
+def blocking_credit_notes(queryset):
+    """
+    Nombre d'avoirs actifs par facture pour toute la sélection (une requête)
+    """
+    from apps.credit_notes.models import CreditNote
+
+    rows = CreditNote.active.filter(
+        invoice_id__in=queryset.order_by().values('pk')
+    ).values('invoice_id').annotate(
+        credit_notes_count=Count('id')
+    ).order_by()
+
+    return {
+        str(row['invoice_id']): row['credit_notes_count']
+        for row in rows
+    }
+
+
+def bulk_update_status(queryset, new_status):
+    """
+    Passe toutes les factures sélectionnées au statut ``new_status``.
+
+    Les factures déjà dans ce statut ne sont pas touchées : seules les lignes
+    réellement modifiées sont renvoyées.
+    """
+    qn = connection.ops.quote_name
+    status_column = qn(Invoice._meta.get_field('status').column)
+    updated_at_column = qn(Invoice._meta.get_field('updated_at').column)
+
+    with transaction.atomic():
+        updated_ids = _update_returning(
+            f"{status_column} = %s, {updated_at_column} = %s",
+            [new_status, timezone.now()],
+            queryset,
+            extra_where=f" AND {status_column} <> %s",
+            extra_params=[new_status],
+        )
+
+    return {'updated': updated_ids, 'blocked': {}}
+
+
+def bulk_deactivate(queryset):
+    """
+    Désactive (soft delete) toutes les factures sélectionnées.
+
+    Comme pour ``InvoiceViewSet.destroy``, une facture ayant des avoirs actifs
+    ne peut pas être désactivée : la règle est vérifiée pour tout l'ensemble
+    en une requête, puis reprise dans le ``WHERE`` de l'``UPDATE``.
+    """
+    from apps.credit_notes.models import CreditNote
+
+    qn = connection.ops.quote_name
+    table = qn(Invoice._meta.db_table)
+    pk_column = qn(Invoice._meta.pk.column)
+    is_active_column = qn(Invoice._meta.get_field('is_active').column)
+    updated_at_column = qn(Invoice._meta.get_field('updated_at').column)
+
+    credit_notes_table = qn(CreditNote._meta.db_table)
+    invoice_fk_column = qn(CreditNote._meta.get_field('invoice').column)
+    credit_note_active_column = qn(CreditNote._meta.get_field('is_active').column)
+
+    with transaction.atomic():
+        blocked = blocking_credit_notes(queryset)
+        updated_ids = _update_returning(
+            f"{is_active_column} = %s, {updated_at_column} = %s",
+            [False, timezone.now()],
+            queryset,
+            extra_where=(
+                f" AND {is_active_column} = %s"
+                f" AND NOT EXISTS (SELECT 1 FROM {credit_notes_table} cn"
+                f" WHERE cn.{invoice_fk_column} = {table}.{pk_column}"
+                f" AND cn.{credit_note_active_column} = %s)"
+            ),
+            extra_params=[True, True],
+        )
+
+    return {'updated': updated_ids, 'blocked': blocked}
@@ -0,0 +1,97 @@
+"""
+Échéancier des factures impayées (buckets journaliers et hebdomadaires)
+
+Une seule requête de plage sur l'index partiel ``(status, due_date)`` des
+factures actives non payées. Les factures sans ``due_date`` reçoivent une
+échéance dérivée : ``invoice_date + Supplier.payment_terms``.
+"""
+from collections import OrderedDict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Invoice
+
+DEFAULT_PAYMENT_TERMS = 30
+MAX_RANGE_DAYS = 366
+
+
+def unpaid_invoices():
+    """Factures couvertes par l'index partiel (mêmes prédicats que sa condition)"""
+    return Invoice.active.exclude(status=Invoice.Status.PAID)
+
+
+def _rows(date_from, date_to):
+    # Échéance dérivée : l'invoice_date précède l'échéance d'au plus le délai maximal
+    max_terms = getattr(settings, 'INVOICE_CALENDAR_MAX_PAYMENT_TERMS', 365)
+    return unpaid_invoices().filter(
+        Q(due_date__range=(date_from, date_to))
+        | Q(due_date__isnull=True,
+            invoice_date__range=(date_from - timedelta(days=max_terms), date_to))
+    ).order_by().values_list(
+        'id', 'due_date', 'invoice_date', 'supplier__payment_terms', 'net_to_pay'
+    )
+
+
+def _bucket(key_fields):
+    bucket = dict(key_fields)
+    bucket.update(total=Decimal('0.00'), count=0, invoice_ids=[])
+    return bucket
+
+
+def _add(bucket, invoice_id, amount):
+    bucket['total'] += amount
+    bucket['count'] += 1
+    bucket['invoice_ids'].append(str(invoice_id))
+
+
+def build_calendar(date_from, date_to):
+    """
+    Buckets ``daily`` et ``weekly`` (semaines ISO, lundi → dimanche) du net à
+    payer des factures impayées échéant entre ``date_from`` et ``date_to`` inclus.
+    """
+    entries = []
+    for invoice_id, due_date, invoice_date, payment_terms, net_to_pay in _rows(date_from, date_to):
+        derived = due_date is None
+        if derived:
+            terms = DEFAULT_PAYMENT_TERMS if payment_terms is None else payment_terms
+            due_date = invoice_date + timedelta(days=terms)
+            if not date_from <= due_date <= date_to:
+                continue
+        entries.append((due_date, str(invoice_id), net_to_pay, derived))
+    entries.sort()
+
+    daily = OrderedDict()
+    weekly = OrderedDict()
+    total = Decimal('0.00')
+    derived_ids = []
+    for due_date, invoice_id, amount, derived in entries:
+        day = daily.get(due_date)
+        if day is None:
+            day = daily[due_date] = _bucket({'date': due_date})
+        _add(day, invoice_id, amount)
+
+        week_start = due_date - timedelta(days=due_date.weekday())
+        week = weekly.get(week_start)
+        if week is None:
+            week = weekly[week_start] = _bucket({
+                'week_start': week_start,
+                'week_end': week_start + timedelta(days=6),
+            })
+        _add(week, invoice_id, amount)
+
+        total += amount
+        if derived:
+            derived_ids.append(invoice_id)
+
+    return {
+        'from': date_from,
+        'to': date_to,
+        'total': total,
+        'count': len(entries),
+        'derived_due_date_ids': derived_ids,
+        'daily': list(daily.values()),
+        'weekly': list(weekly.values()),
+    }
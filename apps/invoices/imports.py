@@ -0,0 +1,356 @@
+"""
+Import en flux de relevés fournisseurs (CSV, XLSX en option)
+
+Le fichier est lu ligne à ligne et traité par lots de ``chunk_size`` lignes :
+chaque lot est validé contre une table code fournisseur → id chargée une
+seule fois, puis inséré avec ``bulk_create`` dans sa propre transaction.
+L'avancement est enregistré sur l'``InvoiceImport`` après chaque lot.
+
+Sans colonne ``status`` (ou statut vide), une facture prend le statut par
+défaut du modèle.
+"""
+import csv
+import io
+import logging
+import threading
+import unicodedata
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from apps.partitioning.partitions import enabled as partitioning_enabled, ensure_year
+from apps.suppliers.models import Supplier
+from .models import Invoice, InvoiceImport
+from .uniqueness import DUPLICATE_MESSAGE, check_unique_numbers, existing_numbers
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ('supplier_code', 'invoice_number', 'invoice_date', 'net_to_pay')
+OPTIONAL_COLUMNS = ('due_date', 'status', 'notes')
+
+# Intitulés de colonnes acceptés dans les relevés français
+COLUMN_ALIASES = {
+    'code_fournisseur': 'supplier_code',
+    'fournisseur': 'supplier_code',
+    'numero': 'invoice_number',
+    'numero_facture': 'invoice_number',
+    'date_facture': 'invoice_date',
+    'date': 'invoice_date',
+    'montant': 'net_to_pay',
+    'net_a_payer': 'net_to_pay',
+    'date_echeance': 'due_date',
+    'echeance': 'due_date',
+    'statut': 'status',
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+MAX_STORED_ERRORS = 200
+# Invoice.net_to_pay : max_digits=12, decimal_places=2
+MAX_AMOUNT = Decimal('10000000000')
+
+
+class ImportFileError(Exception):
+    """Fichier illisible ou colonnes obligatoires manquantes"""
+
+
+def _normalize_header(name):
+    # « Numéro facture » → numero_facture
+    key = unicodedata.normalize('NFKD', str(name or '')).encode('ascii', 'ignore').decode()
+    key = key.strip().lower().replace(' ', '_').replace('-', '_')
+    return COLUMN_ALIASES.get(key, key)
+
+
+def _check_columns(columns):
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ImportFileError(
+            f"Colonnes obligatoires manquantes : {', '.join(missing)}"
+        )
+
+
+def iter_csv_rows(raw):
+    """
+    Lit un CSV binaire en flux.
+
+    Produit ``(numéro de ligne, dict, octets lus)``. Le séparateur (``;`` ou ``,``)
+    est déduit de la ligne d'en-tête.
+    """
+    text = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+    header_line = text.readline()
+    if not header_line:
+        raise ImportFileError("Fichier vide")
+
+    delimiter = ';' if header_line.count(';') > header_line.count(',') else ','
+    columns = [_normalize_header(name) for name in next(csv.reader([header_line], delimiter=delimiter))]
+    _check_columns(columns)
+
+    reader = csv.DictReader(text, fieldnames=columns, delimiter=delimiter)
+    for line_number, row in enumerate(reader, start=2):
+        yield line_number, row, raw.tell()
+
+
+def iter_xlsx_rows(raw, file_size):
+    """
+    Lit la première feuille d'un XLSX en mode ``read_only`` (flux, openpyxl requis).
+
+    Les octets lus sont estimés à partir du numéro de ligne.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError("Le support XLSX nécessite le paquet openpyxl")
+
+    workbook = load_workbook(raw, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            raise ImportFileError("Fichier vide")
+
+        columns = [_normalize_header(name) for name in header]
+        _check_columns(columns)
+
+        total_rows = max((sheet.max_row or 0) - 1, 1)
+        for index, values in enumerate(rows, start=1):
+            if not any(value not in (None, '') for value in values):
+                continue
+            position = min(file_size, file_size * index // total_rows)
+            yield index + 1, dict(zip(columns, values)), position
+    finally:
+        workbook.close()
+
+
+def _parse_date(value):
+    if value in (None, ''):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    value = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError("Date invalide")
+
+
+def _parse_amount(value):
+    if isinstance(value, (int, float)):
+        value = str(value)
+    value = str(value or '').strip().replace('\u00a0', '').replace(' ', '').replace(',', '.')
+    try:
+        amount = Decimal(value).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError("Montant invalide")
+    if amount < 0:
+        raise ValueError("Le net à payer ne peut être négatif")
+    if amount >= MAX_AMOUNT:
+        raise ValueError("Montant trop élevé")
+    return amount
+
+
+class InvoiceRowBuilder:
+    """
+    Valide les lignes et construit les instances ``Invoice`` (non sauvegardées)
+    """
+
+    def __init__(self):
+        self.supplier_ids = {
+            code.upper(): supplier_id
+            for code, supplier_id in Supplier.objects.filter(
+                code__isnull=False
+            ).values_list('code', 'id')
+        }
+        self.statuses = set(Invoice.Status.values)
+        # Colonne status absente ou vide : défaut du modèle
+        self.default_status = Invoice._meta.get_field('status').default
+        # Couples (fournisseur, numéro) déjà vus dans ce fichier
+        self.seen = set()
+
+    def build(self, row):
+        """Retourne ``(invoice, None)`` ou ``(None, erreurs)``"""
+        errors = {}
+
+        code = str(row.get('supplier_code') or '').strip().upper()
+        supplier_id = self.supplier_ids.get(code)
+        if not supplier_id:
+            errors['supplier_code'] = f"Fournisseur inconnu : {code or '(vide)'}"
+
+        invoice_number = str(row.get('invoice_number') or '').strip()
+        if not invoice_number:
+            errors['invoice_number'] = "Ce champ est obligatoire."
+        elif len(invoice_number) > Invoice._meta.get_field('invoice_number').max_length:
+            errors['invoice_number'] = "Numéro de facture trop long"
+
+        invoice_date = due_date = net_to_pay = None
+        try:
+            invoice_date = _parse_date(row.get('invoice_date'))
+            if invoice_date is None:
+                errors['invoice_date'] = "Ce champ est obligatoire."
+        except ValueError as exc:
+            errors['invoice_date'] = str(exc)
+        try:
+            due_date = _parse_date(row.get('due_date'))
+        except ValueError as exc:
+            errors['due_date'] = str(exc)
+        try:
+            net_to_pay = _parse_amount(row.get('net_to_pay'))
+        except ValueError as exc:
+            errors['net_to_pay'] = str(exc)
+
+        status = str(row.get('status') or '').strip().upper() or self.default_status
+        if status not in self.statuses:
+            errors['status'] = f"Statut invalide : {status}"
+
+        if not errors:
+            key = (supplier_id, invoice_number)
+            if key in self.seen:
+                errors['invoice_number'] = "Facture en double dans le fichier"
+            else:
+                self.seen.add(key)
+
+        if errors:
+            return None, errors
+
+        notes = str(row.get('notes') or '').strip() or None
+        return Invoice(
+            supplier_id=supplier_id,
+            invoice_number=invoice_number,
+            invoice_date=invoice_date,
+            due_date=due_date,
+            net_to_pay=net_to_pay,
+            status=status,
+            notes=notes,
+            # bulk_create n'appelle pas save() : période renseignée ici
+            month=invoice_date.month,
+            year=invoice_date.year,
+        ), None
+
+
+def _process_chunk(builder, chunk):
+    """Valide et insère un lot ; retourne ``(créées, erreurs)``"""
+    candidates = []
+    errors = []
+    for line_number, row, _position in chunk:
+        invoice, row_errors = builder.build(row)
+        if row_errors:
+            errors.append({'row': line_number, 'errors': row_errors})
+        else:
+            candidates.append((line_number, invoice))
+
+    if candidates:
+        existing = existing_numbers((invoice.supplier_id, invoice.invoice_number) for _, invoice in candidates)
+        invoices = []
+        for line_number, invoice in candidates:
+            if (invoice.supplier_id, invoice.invoice_number) in existing:
+                errors.append({
+                    'row': line_number,
+                    'errors': {'invoice_number': DUPLICATE_MESSAGE},
+                })
+            else:
+                invoices.append(invoice)
+
+        partitioned = partitioning_enabled()
+        if partitioned:
+            # bulk_create n'émet pas pre_save : partitions créées ici
+            for year in {invoice.year for invoice in invoices}:
+                ensure_year(Invoice, year)
+
+        with transaction.atomic():
+            if partitioned:
+                # Unicité inter-années non imposée en base : revérifiée sous verrou
+                check_unique_numbers(invoices)
+            Invoice.objects.bulk_create(invoices, batch_size=len(invoices) or None)
+        return len(invoices), errors
+
+    return 0, errors
+
+
+def run_import(invoice_import):
+    """Traite un import de bout en bout (appelé dans un thread ou en ligne)"""
+    InvoiceImport.objects.filter(pk=invoice_import.pk).update(
+        status=InvoiceImport.Status.RUNNING,
+        started_at=timezone.now(),
+    )
+
+    processed = created = error_count = 0
+    stored_errors = []
+
+    try:
+        builder = InvoiceRowBuilder()
+        with invoice_import.file.open('rb') as handle:
+            raw = getattr(handle, 'file', handle)
+            if invoice_import.original_filename.lower().endswith('.xlsx'):
+                rows = iter_xlsx_rows(raw, invoice_import.file_size)
+            else:
+                rows = iter_csv_rows(raw)
+
+            while True:
+                chunk = list(islice(rows, invoice_import.chunk_size))
+                if not chunk:
+                    break
+
+                chunk_created, chunk_errors = _process_chunk(builder, chunk)
+                processed += len(chunk)
+                created += chunk_created
+                error_count += len(chunk_errors)
+                stored_errors.extend(chunk_errors[:MAX_STORED_ERRORS - len(stored_errors)])
+
+                InvoiceImport.objects.filter(pk=invoice_import.pk).update(
+                    processed_rows=processed,
+                    created_count=created,
+                    error_count=error_count,
+                    errors=stored_errors,
+                    bytes_processed=chunk[-1][2],
+                )
+
+        InvoiceImport.objects.filter(pk=invoice_import.pk).update(
+            status=InvoiceImport.Status.COMPLETED,
+            bytes_processed=invoice_import.file_size,
+            finished_at=timezone.now(),
+            message=f"{created} facture(s) créée(s), {error_count} ligne(s) en erreur",
+        )
+    except Exception as exc:
+        logger.error(f"Invoice import {invoice_import.pk} failed: {exc}")
+        InvoiceImport.objects.filter(pk=invoice_import.pk).update(
+            status=InvoiceImport.Status.FAILED,
+            finished_at=timezone.now(),
+            message=str(exc) if isinstance(exc, ImportFileError) else "Erreur lors de l'import",
+        )
+
+    invoice_import.refresh_from_db()
+    return invoice_import
+
+
+def _run_in_thread(import_id):
+    try:
+        run_import(InvoiceImport.objects.get(pk=import_id))
+    finally:
+        connections.close_all()
+
+
+def start_import(invoice_import):
+    """
+    Lance le traitement après le commit de la requête.
+
+    ``INVOICE_IMPORT_ASYNC = False`` force un traitement en ligne (tests, commandes).
+    """
+    if not getattr(settings, 'INVOICE_IMPORT_ASYNC', True):
+        return run_import(invoice_import)
+
+    transaction.on_commit(
+        lambda: threading.Thread(
+            target=_run_in_thread,
+            args=(invoice_import.pk,),
+            name=f"invoice-import-{invoice_import.pk}",
+            daemon=True,
+        ).start()
+    )
+    return invoice_import
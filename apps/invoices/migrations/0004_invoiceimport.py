@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("invoices", "0003_remove_invoice_totals_add_status_notes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InvoiceImport",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "En attente"),
+                            ("RUNNING", "En cours"),
+                            ("COMPLETED", "Terminé"),
+                            ("FAILED", "Échoué"),
+                        ],
+                        default="PENDING",
+                        max_length=20,
+                        verbose_name="Statut",
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(upload_to="imports/invoices/", verbose_name="Fichier"),
+                ),
+                (
+                    "original_filename",
+                    models.CharField(max_length=255, verbose_name="Nom du fichier"),
+                ),
+                (
+                    "file_size",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Taille du fichier (octets)"),
+                ),
+                (
+                    "bytes_processed",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Octets traités"),
+                ),
+                (
+                    "chunk_size",
+                    models.PositiveIntegerField(default=1000, verbose_name="Taille des lots"),
+                ),
+                (
+                    "processed_rows",
+                    models.PositiveIntegerField(default=0, verbose_name="Lignes traitées"),
+                ),
+                (
+                    "created_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Factures créées"),
+                ),
+                (
+                    "error_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Lignes en erreur"),
+                ),
+                (
+                    "errors",
+                    models.JSONField(blank=True, default=list, verbose_name="Erreurs"),
+                ),
+                (
+                    "message",
+                    models.TextField(blank=True, default="", verbose_name="Message"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Créé le"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Démarré le"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Terminé le"),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="invoice_imports",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Créé par",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Import de factures",
+                "verbose_name_plural": "Imports de factures",
+                "db_table": "invoices_imports",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
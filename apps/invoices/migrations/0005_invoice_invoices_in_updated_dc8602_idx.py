@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-19 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("invoices", "0004_invoiceimport"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["updated_at"], name="invoices_in_updated_dc8602_idx"
+            ),
+        ),
+    ]
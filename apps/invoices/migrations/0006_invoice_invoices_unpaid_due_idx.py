@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-19 02:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("invoices", "0005_invoice_invoices_in_updated_dc8602_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_active", True), models.Q(("status", "PAID"), _negated=True)
+                ),
+                fields=["status", "due_date"],
+                name="invoices_unpaid_due_idx",
+            ),
+        ),
+    ]
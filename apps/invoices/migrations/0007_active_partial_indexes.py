@@ -0,0 +1,58 @@
+# Generated by Django 5.0.6 on 2026-10-19 02:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY : pas de verrou d'écriture sur la table
+    atomic = False
+
+    dependencies = [
+        ("invoices", "0006_invoice_invoices_unpaid_due_idx"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="invoice",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["supplier", "invoice_date"],
+                name="invoices_active_supplier_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="invoice",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["invoice_date"],
+                name="invoices_active_date_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="invoice",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["month", "year"],
+                name="invoices_active_period_idx",
+            ),
+        ),
+        RemoveIndexConcurrently(
+            model_name="invoice",
+            name="invoices_in_is_acti_d792a5_idx",
+        ),
+        # Index complets rendus inutiles par les index partiels (fournisseur :
+        # index de la clé étrangère)
+        RemoveIndexConcurrently(
+            model_name="invoice",
+            name="invoices_in_supplie_aa47a8_idx",
+        ),
+        RemoveIndexConcurrently(
+            model_name="invoice",
+            name="invoices_in_invoice_bf9295_idx",
+        ),
+        RemoveIndexConcurrently(
+            model_name="invoice",
+            name="invoices_in_month_51308f_idx",
+        ),
+    ]
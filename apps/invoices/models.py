@@ -4,6 +4,7 @@ from django.core.validators import MinValueValidator
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
 from apps.suppliers.models import Supplier
+from apps.api.managers import ActiveManager, ActiveQuerySet
 
 
 class Invoice(models.Model):
@@ -80,6 +81,9 @@ class Invoice(models.Model):
         auto_now=True,
         verbose_name=_('Mis à jour le')
     )
+
+    objects = ActiveQuerySet.as_manager()
+    active = ActiveManager()
     
     class Meta:
         db_table = 'invoices_invoices'
@@ -87,11 +91,33 @@ class Invoice(models.Model):
         verbose_name_plural = _('Factures')
         ordering = ['-invoice_date', '-created_at']
         unique_together = ['supplier', 'invoice_number']
+        # Pas d'index complets sur la date ou la période : les requêtes passent
+        # par les lignes actives (index partiels ci-dessous). Fournisseur :
+        # index de la clé étrangère, qui couvre aussi les lignes inactives.
         indexes = [
-            models.Index(fields=['supplier']),
-            models.Index(fields=['invoice_date']),
-            models.Index(fields=['month', 'year']),
-            models.Index(fields=['is_active']),
+            models.Index(fields=['updated_at']),
+            # Index partiels sur les lignes actives (Invoice.active)
+            models.Index(
+                fields=['supplier', 'invoice_date'],
+                name='invoices_active_supplier_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['invoice_date'],
+                name='invoices_active_date_idx',
+                condition=models.Q(is_active=True),
+            ),
+            models.Index(
+                fields=['month', 'year'],
+                name='invoices_active_period_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # Échéancier des impayés (apps/invoices/calendar.py)
+            models.Index(
+                fields=['status', 'due_date'],
+                name='invoices_unpaid_due_idx',
+                condition=models.Q(is_active=True) & ~models.Q(status='PAID'),
+            ),
         ]
     
     def __str__(self):
@@ -102,3 +128,119 @@ class Invoice(models.Model):
             self.month = self.invoice_date.month
             self.year = self.invoice_date.year
         super().save(*args, **kwargs)
+
+
+class InvoiceImport(models.Model):
+    """
+    Import de factures depuis un relevé fournisseur (CSV / XLSX)
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', _('En attente')
+        RUNNING = 'RUNNING', _('En cours')
+        COMPLETED = 'COMPLETED', _('Terminé')
+        FAILED = 'FAILED', _('Échoué')
+
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name=_('Statut')
+    )
+
+    file = models.FileField(
+        upload_to='imports/invoices/',
+        verbose_name=_('Fichier')
+    )
+
+    original_filename = models.CharField(
+        max_length=255,
+        verbose_name=_('Nom du fichier')
+    )
+
+    file_size = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_('Taille du fichier (octets)')
+    )
+
+    bytes_processed = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_('Octets traités')
+    )
+
+    chunk_size = models.PositiveIntegerField(
+        default=1000,
+        verbose_name=_('Taille des lots')
+    )
+
+    processed_rows = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Lignes traitées')
+    )
+
+    created_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Factures créées')
+    )
+
+    error_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Lignes en erreur')
+    )
+
+    errors = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name=_('Erreurs')
+    )
+
+    message = models.TextField(
+        blank=True,
+        default='',
+        verbose_name=_('Message')
+    )
+
+    created_by = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='invoice_imports',
+        verbose_name=_('Créé par')
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Créé le')
+    )
+
+    started_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_('Démarré le')
+    )
+
+    finished_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_('Terminé le')
+    )
+
+    class Meta:
+        db_table = 'invoices_imports'
+        verbose_name = _('Import de factures')
+        verbose_name_plural = _('Imports de factures')
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.original_filename} ({self.get_status_display()})"
+
+    @property
+    def progress(self):
+        """Avancement en pourcentage, calculé sur les octets lus"""
+        if self.status == self.Status.COMPLETED:
+            return 100
+        if not self.file_size:
+            return 0
+        return min(99, int(self.bytes_processed * 100 / self.file_size))
@@ -1,12 +1,12 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils.translation import gettext_lazy as _
 from drf_spectacular.utils import extend_schema
 
+from apps.ratelimit.throttles import ScopedRateThrottle
 from .models import Invoice
 from .serializers import (
     InvoiceSerializer,
@@ -59,17 +59,15 @@ class MultiTenantInvoiceViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
 
-        base = Invoice.objects.select_related("supplier")
-
         if user.is_admin:
-            return base.all()
+            return Invoice.objects.select_related("supplier").all()
 
         # Multi-tenant strict via table d'accès
         from apps.suppliers.models import UserSupplierAccess
-        supplier_ids = UserSupplierAccess.objects.filter(user=user).values_list("supplier_id", flat=True)
+        supplier_ids = UserSupplierAccess.objects.filter(user_id=user.pk).values_list("supplier_id", flat=True)
 
         # Si aucun supplier assigné => accès à rien
-        qs = base.filter(supplier_id__in=supplier_ids, is_active=True)
+        qs = Invoice.active.select_related("supplier").filter(supplier_id__in=supplier_ids)
         return qs
 
     @extend_schema(
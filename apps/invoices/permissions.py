@@ -27,7 +27,7 @@ class CanAccessInvoice(BasePermission):
 
         from apps.suppliers.models import UserSupplierAccess
         return UserSupplierAccess.objects.filter(
-            user=user,
+            user_id=user.pk,
             supplier=supplier
         ).exists()
 
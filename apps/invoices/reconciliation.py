@@ -0,0 +1,105 @@
+"""
+Rapprochement de relevé fournisseur : factures d'une période et leurs avoirs
+
+Deux requêtes au total, quel que soit le nombre de factures : les factures
+actives de la période (avec le fournisseur en jointure), puis les avoirs
+actifs rattachés à ces factures (``invoice_id__in``) ou, sans facture, au
+même fournisseur et à la même période. L'imbrication et les nets sont
+calculés en Python.
+"""
+from decimal import Decimal
+
+from django.db.models import Q
+
+from apps.credit_notes.models import CreditNote
+from .models import Invoice
+
+ZERO = Decimal('0.00')
+
+
+def _amount(value):
+    return f"{value:.2f}"
+
+
+def build_reconciliation(supplier_id, year, month=None):
+    """
+    Factures actives du fournisseur pour ``year`` (et ``month`` si fourni),
+    chacune avec ses avoirs et son net (net à payer - avoirs), plus les
+    avoirs de la période non rattachés à une facture.
+    """
+    period = {'year': year} if month is None else {'year': year, 'month': month}
+    invoice_rows = list(
+        Invoice.active.filter(supplier_id=supplier_id, **period)
+        .order_by('invoice_date', 'invoice_number')
+        .values_list(
+            'id', 'invoice_number', 'invoice_date', 'due_date', 'status', 'net_to_pay',
+            'supplier__name', 'supplier__code',
+        )
+    )
+
+    invoices = {}
+    for invoice_id, number, invoice_date, due_date, status, net_to_pay, _name, _code in invoice_rows:
+        invoices[invoice_id] = {
+            'id': str(invoice_id),
+            'invoice_number': number,
+            'invoice_date': invoice_date.isoformat(),
+            'due_date': due_date.isoformat() if due_date else None,
+            'status': status,
+            'net_to_pay': net_to_pay,
+            'credit_notes': [],
+            'credited': ZERO,
+        }
+
+    credit_note_rows = (
+        CreditNote.active.filter(
+            Q(invoice_id__in=list(invoices))
+            | Q(invoice__isnull=True, supplier_id=supplier_id, **period)
+        )
+        .order_by('credit_note_date', 'credit_note_number')
+        .values_list('id', 'invoice_id', 'credit_note_number', 'credit_note_date', 'amount', 'motif')
+    )
+
+    unlinked = []
+    unlinked_total = ZERO
+    for credit_note_id, invoice_id, number, credit_note_date, amount, motif in credit_note_rows:
+        credit_note = {
+            'id': str(credit_note_id),
+            'credit_note_number': number,
+            'credit_note_date': credit_note_date.isoformat(),
+            'amount': _amount(amount),
+            'motif': motif,
+        }
+        invoice = invoices.get(invoice_id)
+        if invoice is None:
+            unlinked.append(credit_note)
+            unlinked_total += amount
+        else:
+            invoice['credit_notes'].append(credit_note)
+            invoice['credited'] += amount
+
+    invoiced_total = credited_total = ZERO
+    for invoice in invoices.values():
+        invoiced_total += invoice['net_to_pay']
+        credited_total += invoice['credited']
+        invoice['net'] = _amount(invoice['net_to_pay'] - invoice['credited'])
+        invoice['net_to_pay'] = _amount(invoice['net_to_pay'])
+        invoice['credited'] = _amount(invoice['credited'])
+
+    supplier = {'id': str(supplier_id)}
+    if invoice_rows:
+        supplier.update(name=invoice_rows[0][6], code=invoice_rows[0][7])
+
+    return {
+        'supplier': supplier,
+        'year': year,
+        'month': month,
+        'invoices': list(invoices.values()),
+        'unlinked_credit_notes': unlinked,
+        'totals': {
+            'invoices_count': len(invoices),
+            'invoiced': _amount(invoiced_total),
+            'credited': _amount(credited_total),
+            'unlinked_credited': _amount(unlinked_total),
+            'net': _amount(invoiced_total - credited_total - unlinked_total),
+        },
+    }
@@ -70,7 +70,7 @@ class SecureInvoiceViewSet(viewsets.ModelViewSet):
         
         # Autres utilisateurs voient seulement les factures actives
         # ET SEULEMENT celles de leurs fournisseurs autorisés
-        queryset = Invoice.objects.select_related('supplier').filter(is_active=True)
+        queryset = Invoice.active.select_related('supplier')
         
         # TODO: Ajouter filtrage par organisation/fournisseur
         # user_suppliers = self.get_user_suppliers(user)
@@ -2,7 +2,8 @@ from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from decimal import Decimal
-from .models import Invoice
+from .models import Invoice, InvoiceImport
+from .uniqueness import DUPLICATE_MESSAGE, existing_numbers
 from apps.suppliers.serializers import SupplierSerializer
 
 
@@ -24,22 +25,12 @@ class InvoiceSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'month', 'year', 'created_at', 'updated_at']
     
     def validate_invoice_number(self, value):
-        """Validation du numéro de facture unique par fournisseur"""
+        """Validation du numéro de facture unique par fournisseur (toutes années)"""
         supplier = self.initial_data.get('supplier')
         if supplier:
-            queryset = Invoice.objects.filter(
-                supplier_id=supplier,
-                invoice_number=value,
-                is_active=True
-            )
-            
-            if self.instance:
-                queryset = queryset.exclude(id=self.instance.id)
-            
-            if queryset.exists():
-                raise serializers.ValidationError(
-                    "Une facture avec ce numéro existe déjà pour ce fournisseur"
-                )
+            exclude_ids = [self.instance.id] if self.instance else ()
+            if existing_numbers([(supplier, value)], exclude_ids):
+                raise serializers.ValidationError(DUPLICATE_MESSAGE)
         return value
     
     def validate(self, attrs):
@@ -103,17 +94,10 @@ class InvoiceCreateSerializer(serializers.ModelSerializer):
         ]
     
     def validate_invoice_number(self, value):
-        """Validation du numéro de facture unique par fournisseur"""
+        """Validation du numéro de facture unique par fournisseur (toutes années)"""
         supplier = self.initial_data.get('supplier')
-        if supplier:
-            if Invoice.objects.filter(
-                supplier_id=supplier,
-                invoice_number=value,
-                is_active=True
-            ).exists():
-                raise serializers.ValidationError(
-                    "Une facture avec ce numéro existe déjà pour ce fournisseur"
-                )
+        if supplier and existing_numbers([(supplier, value)]):
+            raise serializers.ValidationError(DUPLICATE_MESSAGE)
         return value
 
 
@@ -130,20 +114,141 @@ class InvoiceUpdateSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'month', 'year', 'created_at', 'updated_at', 'is_active']
     
     def validate_invoice_number(self, value):
-        """Validation du numéro de facture unique par fournisseur"""
+        """Validation du numéro de facture unique par fournisseur (toutes années)"""
         supplier = self.initial_data.get('supplier') or (self.instance.supplier.id if self.instance.supplier else None)
         if supplier:
-            queryset = Invoice.objects.filter(
-                supplier_id=supplier,
-                invoice_number=value,
-                is_active=True
+            exclude_ids = [self.instance.id] if self.instance else ()
+            if existing_numbers([(supplier, value)], exclude_ids):
+                raise serializers.ValidationError(DUPLICATE_MESSAGE)
+        return value
+
+
+class InvoiceBulkSelectionSerializer(serializers.Serializer):
+    """
+    Sélection de factures pour les opérations en masse :
+    soit une liste d'ids, soit une expression de filtre
+    """
+    MAX_IDS = 1000
+    FILTER_FIELDS = {
+        'supplier': serializers.UUIDField(),
+        'status': serializers.ChoiceField(choices=Invoice.Status.choices),
+        'month': serializers.IntegerField(min_value=1, max_value=12),
+        'year': serializers.IntegerField(min_value=2000),
+        'invoice_date_from': serializers.DateField(),
+        'invoice_date_to': serializers.DateField(),
+    }
+    FILTER_LOOKUPS = {
+        'supplier': 'supplier_id',
+        'status': 'status',
+        'month': 'month',
+        'year': 'year',
+        'invoice_date_from': 'invoice_date__gte',
+        'invoice_date_to': 'invoice_date__lte',
+    }
+
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_IDS
+    )
+    filter = serializers.DictField(required=False)
+
+    def validate_filter(self, value):
+        """Validation de l'expression de filtre"""
+        unknown = set(value) - set(self.FILTER_FIELDS)
+        if unknown:
+            raise serializers.ValidationError(
+                _("Critères de filtre inconnus : {}").format(", ".join(sorted(unknown)))
+            )
+        if not value:
+            raise serializers.ValidationError(
+                _("Le filtre doit contenir au moins un critère")
+            )
+
+        cleaned = {}
+        errors = {}
+        for name, raw in value.items():
+            try:
+                cleaned[name] = self.FILTER_FIELDS[name].run_validation(raw)
+            except serializers.ValidationError as exc:
+                errors[name] = exc.detail
+        if errors:
+            raise serializers.ValidationError(errors)
+        return cleaned
+
+    def validate(self, attrs):
+        has_ids = 'ids' in attrs
+        has_filter = 'filter' in attrs
+        if has_ids == has_filter:
+            raise serializers.ValidationError(
+                _("Fournir soit 'ids', soit 'filter' (exclusivement)")
+            )
+        return attrs
+
+    def filter_queryset(self, queryset):
+        """Applique la sélection validée au queryset"""
+        if 'ids' in self.validated_data:
+            return queryset.filter(id__in=self.validated_data['ids'])
+
+        lookups = {
+            self.FILTER_LOOKUPS[name]: value
+            for name, value in self.validated_data['filter'].items()
+        }
+        return queryset.filter(**lookups)
+
+
+class InvoiceBulkStatusSerializer(InvoiceBulkSelectionSerializer):
+    """
+    Changement de statut en masse
+    """
+    status = serializers.ChoiceField(choices=Invoice.Status.choices)
+
+
+class InvoiceImportSerializer(serializers.ModelSerializer):
+    """
+    Serializer de suivi d'un import (lecture seule)
+    """
+    progress = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = InvoiceImport
+        fields = [
+            'id', 'status', 'original_filename', 'file_size', 'chunk_size',
+            'progress', 'processed_rows', 'created_count', 'error_count',
+            'errors', 'message', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
+class InvoiceImportCreateSerializer(serializers.Serializer):
+    """
+    Serializer pour le dépôt d'un relevé fournisseur à importer
+    """
+    ALLOWED_EXTENSIONS = ('.csv', '.xlsx')
+
+    file = serializers.FileField()
+    chunk_size = serializers.IntegerField(
+        required=False,
+        min_value=100,
+        max_value=10000,
+        default=1000
+    )
+
+    def validate_file(self, value):
+        """Validation de l'extension du fichier"""
+        if not value.name.lower().endswith(self.ALLOWED_EXTENSIONS):
+            raise serializers.ValidationError(
+                _("Formats acceptés : CSV, XLSX")
             )
-            
-            if self.instance:
-                queryset = queryset.exclude(id=self.instance.id)
-            
-            if queryset.exists():
-                raise serializers.ValidationError(
-                    "Une facture avec ce numéro existe déjà pour ce fournisseur"
-                )
         return value
+
+    def create(self, validated_data):
+        upload = validated_data['file']
+        return InvoiceImport.objects.create(
+            file=upload,
+            original_filename=upload.name,
+            file_size=upload.size,
+            chunk_size=validated_data['chunk_size'],
+            created_by=validated_data.get('created_by'),
+        )
@@ -0,0 +1,86 @@
+from datetime import date
+
+from rest_framework.test import APITestCase
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.suppliers.models import Supplier
+
+
+class TestInvoiceBulkOperations(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="pass", role=User.Role.ADMIN)
+        self.comptable = User.objects.create_user(username="compta", password="pass", role=User.Role.COMPTABLE)
+
+        self.supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+
+        self.inv_1 = Invoice.objects.create(
+            supplier=self.supplier, invoice_number="F1", net_to_pay=10,
+            invoice_date=date(2026, 1, 5), status=Invoice.Status.PENDING
+        )
+        self.inv_2 = Invoice.objects.create(
+            supplier=self.supplier, invoice_number="F2", net_to_pay=20,
+            invoice_date=date(2026, 1, 6), status=Invoice.Status.PAID
+        )
+        self.inv_3 = Invoice.objects.create(
+            supplier=self.supplier, invoice_number="F3", net_to_pay=30,
+            invoice_date=date(2026, 2, 6), status=Invoice.Status.PENDING
+        )
+        CreditNote.objects.create(
+            supplier=self.supplier, invoice=self.inv_3, credit_note_number="A1",
+            amount=5, credit_note_date=date(2026, 2, 7)
+        )
+
+    def test_bulk_status_reports_only_changed_rows(self):
+        self.client.force_authenticate(user=self.admin)
+        r = self.client.post(reverse("invoices:invoice-bulk-status"), {
+            "ids": [str(self.inv_1.pk), str(self.inv_2.pk)],
+            "status": "PAID",
+        }, format="json")
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["updated"], [str(self.inv_1.pk)])
+        self.assertEqual(r.data["skipped"], [str(self.inv_2.pk)])
+        self.inv_1.refresh_from_db()
+        self.assertEqual(self.inv_1.status, Invoice.Status.PAID)
+
+    def test_bulk_status_with_filter(self):
+        self.client.force_authenticate(user=self.admin)
+        r = self.client.post(reverse("invoices:invoice-bulk-status"), {
+            "filter": {"month": 1, "year": 2026},
+            "status": "DRAFT",
+        }, format="json")
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(sorted(r.data["updated"]), sorted([str(self.inv_1.pk), str(self.inv_2.pk)]))
+        self.assertNotIn("skipped", r.data)
+
+    def test_bulk_deactivate_blocks_invoices_with_credit_notes(self):
+        self.client.force_authenticate(user=self.admin)
+        r = self.client.post(reverse("invoices:invoice-bulk-deactivate"), {
+            "ids": [str(self.inv_1.pk), str(self.inv_3.pk)],
+        }, format="json")
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["updated"], [str(self.inv_1.pk)])
+        self.assertEqual(r.data["blocked"], [{"id": str(self.inv_3.pk), "credit_notes_count": 1}])
+        self.inv_3.refresh_from_db()
+        self.assertTrue(self.inv_3.is_active)
+
+    def test_ids_and_filter_are_exclusive(self):
+        self.client.force_authenticate(user=self.admin)
+        r = self.client.post(reverse("invoices:invoice-bulk-deactivate"), {
+            "ids": [str(self.inv_1.pk)],
+            "filter": {"year": 2026},
+        }, format="json")
+        self.assertEqual(r.status_code, 400)
+
+    def test_non_admin_is_rejected(self):
+        self.client.force_authenticate(user=self.comptable)
+        r = self.client.post(reverse("invoices:invoice-bulk-status"), {
+            "ids": [str(self.inv_1.pk)],
+            "status": "PAID",
+        }, format="json")
+        self.assertEqual(r.status_code, 403)
@@ -0,0 +1,54 @@
+from datetime import date
+
+from rest_framework.test import APITestCase
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.invoices.models import Invoice
+from apps.suppliers.models import Supplier
+
+
+class TestInvoiceCalendar(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="compta", password="pass", role=User.Role.COMPTABLE)
+        supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        supplier.payment_terms = 10
+        supplier.save()
+
+        # Lundi 2 et mercredi 4 mars 2026 (même semaine), puis lundi 9
+        self.inv_1 = Invoice.objects.create(
+            supplier=supplier, invoice_number="F1", net_to_pay=10,
+            invoice_date=date(2026, 2, 1), due_date=date(2026, 3, 2), status=Invoice.Status.PENDING
+        )
+        self.inv_2 = Invoice.objects.create(
+            supplier=supplier, invoice_number="F2", net_to_pay=20,
+            invoice_date=date(2026, 2, 22), status=Invoice.Status.DRAFT
+        )
+        self.inv_3 = Invoice.objects.create(
+            supplier=supplier, invoice_number="F3", net_to_pay=30,
+            invoice_date=date(2026, 2, 1), due_date=date(2026, 3, 9), status=Invoice.Status.PENDING
+        )
+        Invoice.objects.create(
+            supplier=supplier, invoice_number="F4", net_to_pay=40,
+            invoice_date=date(2026, 2, 1), due_date=date(2026, 3, 3), status=Invoice.Status.PAID
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_buckets_with_derived_due_date(self):
+        r = self.client.get(reverse("invoices:invoice-calendar"), {"from": "2026-03-01", "to": "2026-03-15"})
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["count"], 3)
+        self.assertEqual([day["date"] for day in r.data["daily"]],
+                         [date(2026, 3, 2), date(2026, 3, 4), date(2026, 3, 9)])
+        self.assertEqual(r.data["derived_due_date_ids"], [str(self.inv_2.pk)])
+
+        first_week, second_week = r.data["weekly"]
+        self.assertEqual(first_week["week_start"], date(2026, 3, 2))
+        self.assertEqual(first_week["total"], 30)
+        self.assertEqual(first_week["invoice_ids"], [str(self.inv_1.pk), str(self.inv_2.pk)])
+        self.assertEqual(second_week["invoice_ids"], [str(self.inv_3.pk)])
+
+    def test_invalid_range(self):
+        r = self.client.get(reverse("invoices:invoice-calendar"), {"from": "2026-03-15", "to": "2026-03-01"})
+        self.assertEqual(r.status_code, 400)
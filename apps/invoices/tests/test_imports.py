@@ -0,0 +1,157 @@
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import User
+from apps.archive.models import ArchivedInvoice
+from apps.invoices import imports
+from apps.invoices.models import Invoice, InvoiceImport
+from apps.suppliers.models import Supplier
+
+
+class MediaRootMixin:
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(MEDIA_ROOT=directory.name, INVOICE_IMPORT_ASYNC=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def make_import(self, content, chunk_size=1000, name="releve.csv"):
+        content = content.encode()
+        return InvoiceImport.objects.create(
+            file=SimpleUploadedFile(name, content),
+            original_filename=name,
+            file_size=len(content),
+            chunk_size=chunk_size,
+        )
+
+
+class TestRunImport(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        Invoice.objects.create(
+            supplier=self.supplier, invoice_number="EXIST", net_to_pay=10, invoice_date=date(2026, 1, 2)
+        )
+        ArchivedInvoice.objects.create(
+            supplier=self.supplier, invoice_number="OLD", net_to_pay=10, invoice_date=date(2019, 1, 2),
+            status=Invoice.Status.PAID, month=1, year=2019, created_at=timezone.now(), updated_at=timezone.now(),
+        )
+
+    def test_french_headers_and_semicolon_separator(self):
+        invoice_import = imports.run_import(self.make_import(
+            "Code fournisseur;Numéro facture;Date facture;Net à payer;Échéance;Statut\n"
+            "supa;F100;05/01/2026;1 234,50;2026-02-04;pending\n"
+        ))
+
+        self.assertEqual(invoice_import.status, InvoiceImport.Status.COMPLETED)
+        self.assertEqual(invoice_import.created_count, 1)
+        invoice = Invoice.objects.get(invoice_number="F100")
+        self.assertEqual(invoice.net_to_pay, Decimal("1234.50"))
+        self.assertEqual((invoice.invoice_date, invoice.due_date), (date(2026, 1, 5), date(2026, 2, 4)))
+        self.assertEqual((invoice.status, invoice.month, invoice.year), (Invoice.Status.PENDING, 1, 2026))
+
+    def test_missing_status_uses_model_default(self):
+        imports.run_import(self.make_import(
+            "supplier_code,invoice_number,invoice_date,net_to_pay,status\n"
+            "SUPA,F1,2026-01-05,10,\n"
+            "SUPA,F2,2026-01-05,10,paid\n"
+        ))
+        imports.run_import(self.make_import(
+            "supplier_code,invoice_number,invoice_date,net_to_pay\nSUPA,F3,2026-01-05,10\n"
+        ))
+
+        statuses = dict(Invoice.objects.filter(invoice_number__in=["F1", "F2", "F3"])
+                        .values_list("invoice_number", "status"))
+        self.assertEqual(statuses, {"F1": Invoice.Status.DRAFT, "F2": Invoice.Status.PAID,
+                                    "F3": Invoice.Status.DRAFT})
+
+    def test_row_errors_do_not_block_valid_rows(self):
+        invoice_import = imports.run_import(self.make_import(
+            "fournisseur,numero,date,montant\n"
+            "SUPA,F1,2026-01-05,10\n"
+            "NOPE,F2,2026-01-05,10\n"
+            "SUPA,F3,32/01/2026,-1\n"
+        ))
+
+        self.assertEqual(invoice_import.status, InvoiceImport.Status.COMPLETED)
+        self.assertEqual((invoice_import.processed_rows, invoice_import.created_count), (3, 1))
+        self.assertEqual(invoice_import.error_count, 2)
+        errors = {error["row"]: error["errors"] for error in invoice_import.errors}
+        self.assertIn("supplier_code", errors[3])
+        self.assertEqual(set(errors[4]), {"invoice_date", "net_to_pay"})
+        self.assertEqual(invoice_import.message, "1 facture(s) créée(s), 2 ligne(s) en erreur")
+
+    def test_duplicates_in_file_and_in_database(self):
+        invoice_import = imports.run_import(self.make_import(
+            "supplier_code,invoice_number,invoice_date,net_to_pay\n"
+            "SUPA,F1,2026-01-05,10\n"
+            "SUPA,F1,2026-01-06,11\n"
+            "SUPA,EXIST,2026-01-07,12\n"
+            "SUPA,OLD,2026-01-08,13\n"
+        ))
+
+        self.assertEqual(invoice_import.created_count, 1)
+        errors = {error["row"]: error["errors"]["invoice_number"] for error in invoice_import.errors}
+        self.assertEqual(errors[3], "Facture en double dans le fichier")
+        self.assertEqual(errors[4], "Une facture avec ce numéro existe déjà pour ce fournisseur")
+        # Numéro d'une facture archivée (exercice clos)
+        self.assertEqual(errors[5], "Une facture avec ce numéro existe déjà pour ce fournisseur")
+        self.assertEqual(Invoice.objects.filter(invoice_number="F1").count(), 1)
+
+    def test_progress_recorded_after_each_chunk(self):
+        rows = "".join(f"SUPA,F{index},2026-01-05,10\n" for index in range(5))
+        invoice_import = self.make_import("supplier_code,invoice_number,invoice_date,net_to_pay\n" + rows, 2)
+        seen = []
+        process_chunk = imports._process_chunk
+
+        def record(builder, chunk):
+            seen.append(InvoiceImport.objects.values_list("processed_rows", "bytes_processed").get(
+                pk=invoice_import.pk
+            ))
+            return process_chunk(builder, chunk)
+
+        with mock.patch.object(imports, "_process_chunk", side_effect=record):
+            invoice_import = imports.run_import(invoice_import)
+
+        self.assertEqual([processed for processed, _ in seen], [0, 2, 4])
+        # Octets lus par blocs du lecteur texte : croissants, pas forcément strictement
+        self.assertLessEqual(seen[1][1], seen[2][1])
+        self.assertGreater(seen[1][1], 0)
+        self.assertEqual(invoice_import.processed_rows, 5)
+        self.assertEqual(invoice_import.bytes_processed, invoice_import.file_size)
+        self.assertEqual(invoice_import.progress, 100)
+        self.assertIsNotNone(invoice_import.finished_at)
+
+    def test_missing_columns_fail_the_import(self):
+        invoice_import = imports.run_import(self.make_import("supplier_code,invoice_number\nSUPA,F1\n"))
+
+        self.assertEqual(invoice_import.status, InvoiceImport.Status.FAILED)
+        self.assertIn("invoice_date", invoice_import.message)
+        self.assertEqual(invoice_import.created_count, 0)
+
+
+class TestImportEndpoint(MediaRootMixin, APITestCase):
+    def test_upload_runs_inline_and_reports_status(self):
+        Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        admin = User.objects.create_user(username="admin", password="pass", role=User.Role.ADMIN)
+        self.client.force_authenticate(user=admin)
+        upload = SimpleUploadedFile(
+            "releve.csv", b"supplier_code,invoice_number,invoice_date,net_to_pay\nSUPA,F1,2026-01-05,10\n"
+        )
+
+        r = self.client.post(reverse("invoices:invoice-import-list"), {"file": upload}, format="multipart")
+
+        self.assertEqual(r.status_code, 202)
+        self.assertEqual((r.data["status"], r.data["created_count"], r.data["progress"]), ("COMPLETED", 1, 100))
+        r = self.client.get(reverse("invoices:invoice-import-detail", args=[r.data["id"]]))
+        self.assertEqual(r.data["processed_rows"], 1)
@@ -0,0 +1,71 @@
+from datetime import date
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import User
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.suppliers.models import Supplier
+
+
+class TestSupplierReconciliation(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="compta", password="pass", role=User.Role.COMPTABLE)
+        self.supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        other = Supplier.objects.create(name="SUP B", code="SUPB", siret="12345678901235")
+
+        self.invoices = [
+            Invoice.objects.create(
+                supplier=self.supplier, invoice_number=f"F{i}", net_to_pay=100,
+                invoice_date=date(2026, 3, i), status=Invoice.Status.PENDING
+            )
+            for i in range(1, 6)
+        ]
+        for index, invoice in enumerate(self.invoices):
+            for n in range(index):
+                CreditNote.objects.create(
+                    supplier=self.supplier, invoice=invoice, credit_note_number=f"A{index}-{n}",
+                    amount=10, credit_note_date=date(2026, 3, 10)
+                )
+        CreditNote.objects.create(
+            supplier=self.supplier, credit_note_number="LIBRE", amount=7, credit_note_date=date(2026, 3, 12)
+        )
+        # Hors périmètre : autre mois, autre fournisseur
+        Invoice.objects.create(
+            supplier=self.supplier, invoice_number="F-AVRIL", net_to_pay=50,
+            invoice_date=date(2026, 4, 1), status=Invoice.Status.PENDING
+        )
+        Invoice.objects.create(
+            supplier=other, invoice_number="F-B", net_to_pay=50,
+            invoice_date=date(2026, 3, 1), status=Invoice.Status.PENDING
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_invoices_nested_with_credit_notes_in_two_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            r = self.client.get(reverse("invoices:invoice-reconciliation"), {
+                "supplier": str(self.supplier.pk), "year": 2026, "month": 3,
+            })
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(queries), 2)
+
+        self.assertEqual([inv["invoice_number"] for inv in r.data["invoices"]], ["F1", "F2", "F3", "F4", "F5"])
+        last = r.data["invoices"][-1]
+        self.assertEqual(len(last["credit_notes"]), 4)
+        self.assertEqual(last["credited"], "40.00")
+        self.assertEqual(last["net"], "60.00")
+        self.assertEqual([cn["credit_note_number"] for cn in r.data["unlinked_credit_notes"]], ["LIBRE"])
+        self.assertEqual(r.data["totals"], {
+            "invoices_count": 5,
+            "invoiced": "500.00",
+            "credited": "100.00",
+            "unlinked_credited": "7.00",
+            "net": "393.00",
+        })
+
+    def test_missing_parameters(self):
+        r = self.client.get(reverse("invoices:invoice-reconciliation"), {"year": 2026})
+        self.assertEqual(r.status_code, 400)
@@ -0,0 +1,94 @@
+"""
+Unicité du numéro de facture par fournisseur, toutes années confondues
+
+Sans partitionnement, la contrainte ``unique_together`` (fournisseur, numéro)
+suffit. Avec ``DB_PARTITION_BY_YEAR``, PostgreSQL n'impose plus que
+(fournisseur, numéro, année) : chaque chemin d'écriture passe par ce module.
+
+- ``save()`` : ``check_unique_numbers`` en ``pre_save`` (apps.partitioning),
+  qui lève ``DuplicateInvoiceNumber`` comme le ferait la contrainte ;
+- serializers et import : ``existing_numbers``, pour une erreur par champ
+  ou par ligne.
+
+Les factures archivées (``apps.archive``, hors de la table chaude) gardent
+leur numéro : ``existing_numbers`` consulte aussi ``archive_invoices``, et
+``apps.archive`` vérifie l'archive en ``pre_save`` quand la table n'est pas
+partitionnée.
+
+Les opérations ensemblistes (``bulk.py``) ne modifient ni le numéro ni la date.
+"""
+import zlib
+
+from django.db import IntegrityError, connection
+
+from apps.archive.models import ArchivedInvoice
+
+from .models import Invoice
+
+DUPLICATE_MESSAGE = "Une facture avec ce numéro existe déjà pour ce fournisseur"
+
+
+class DuplicateInvoiceNumber(IntegrityError):
+    """Numéro de facture déjà utilisé pour ce fournisseur (autre année comprise)"""
+
+
+def _numbers(model, pairs):
+    return model.objects.filter(
+        supplier_id__in={supplier_id for supplier_id, _ in pairs},
+        invoice_number__in={number for _, number in pairs},
+    ).order_by().values_list('supplier_id', 'invoice_number')
+
+
+def _found(pairs, rows):
+    # Ids comparés en chaînes : UUID ou valeur brute d'une requête
+    found = {(str(supplier_id), number) for supplier_id, number in rows}
+    return {(supplier_id, number) for supplier_id, number in pairs if (str(supplier_id), number) in found}
+
+
+def existing_numbers(pairs, exclude_ids=()):
+    """Couples ``(fournisseur, numéro)`` de ``pairs`` déjà en base, archives comprises (une requête)"""
+    pairs = set(pairs)
+    if not pairs:
+        return set()
+    queryset = _numbers(Invoice, pairs)
+    if exclude_ids:
+        queryset = queryset.exclude(pk__in=exclude_ids)
+    return _found(pairs, queryset.union(_numbers(ArchivedInvoice, pairs), all=True))
+
+
+def archived_numbers(pairs):
+    """Couples ``(fournisseur, numéro)`` de ``pairs`` présents dans l'archive"""
+    pairs = set(pairs)
+    if not pairs:
+        return set()
+    return _found(pairs, _numbers(ArchivedInvoice, pairs))
+
+
+def _lock(pairs):
+    # Sérialise deux transactions qui écrivent le même numéro (années
+    # différentes). Tous les verrous en une requête, pris dans l'ordre des
+    # clés : deux lots qui se recouvrent ne peuvent pas s'interbloquer.
+    keys = sorted({zlib.crc32(f"invoice:{supplier_id}:{number}".encode()) for supplier_id, number in pairs})
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(k) FROM unnest(%s::bigint[]) AS k ORDER BY k",
+            [keys],
+        )
+
+
+def check_unique_numbers(invoices):
+    """
+    Lève ``DuplicateInvoiceNumber`` si une facture reprend le numéro d'une
+    facture en base ou d'une autre facture du lot.
+
+    Sous PostgreSQL, dans une transaction, un verrou consultatif par numéro
+    est pris jusqu'au commit (une seule requête pour tout le lot).
+    """
+    pairs = [(invoice.supplier_id, invoice.invoice_number) for invoice in invoices]
+    if len(set(pairs)) != len(pairs):
+        raise DuplicateInvoiceNumber(DUPLICATE_MESSAGE)
+    if connection.vendor == 'postgresql' and connection.in_atomic_block:
+        _lock(pairs)
+    exclude_ids = [invoice.pk for invoice in invoices if not invoice._state.adding]
+    if existing_numbers(pairs, exclude_ids):
+        raise DuplicateInvoiceNumber(DUPLICATE_MESSAGE)
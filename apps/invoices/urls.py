@@ -3,6 +3,8 @@ from rest_framework.routers import DefaultRouter
 from . import views
 
 router = DefaultRouter()
+# Avant la route racine pour ne pas être capturé comme identifiant de facture
+router.register(r'imports', views.InvoiceImportViewSet, basename='invoice-import')
 router.register(r'', views.InvoiceViewSet, basename='invoice')
 
 app_name = 'invoices'
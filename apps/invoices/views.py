@@ -1,28 +1,48 @@
-from rest_framework import viewsets, status, filters
+import uuid
+
+from rest_framework import viewsets, mixins, status, filters
 from rest_framework.decorators import action, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils.translation import gettext_lazy as _
 from django.db.models import Sum, Count
-from drf_spectacular.utils import extend_schema
+from django.utils import timezone
+from datetime import date, timedelta
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 
-from .models import Invoice
+from .models import Invoice, InvoiceImport
 from .serializers import (
     InvoiceSerializer,
     InvoiceListSerializer,
     InvoiceCreateSerializer,
-    InvoiceUpdateSerializer
+    InvoiceUpdateSerializer,
+    InvoiceBulkSelectionSerializer,
+    InvoiceBulkStatusSerializer,
+    InvoiceImportSerializer,
+    InvoiceImportCreateSerializer
 )
+from . import bulk
+from .calendar import build_calendar, MAX_RANGE_DAYS
+from .reconciliation import build_reconciliation
+from .imports import start_import
+from apps.api.sparse_fields import SparseFieldsetMixin, SPARSE_FIELDS_PARAMETER
+from apps.api.fast_render import FastListMixin, FAST_RENDER_PARAMETER
 from apps.accounts.permissions import IsFinanceUser, IsAdminUser
+from apps.accounts.token_user import get_full_user
 from .permissions import CanAccessInvoice, CanModifyInvoice
+from apps.archive.mixins import ArchiveFallbackMixin
+from apps.archive.models import ArchivedInvoice
 
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(ArchiveFallbackMixin, SparseFieldsetMixin, FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet pour la gestion des factures
     """
     queryset = Invoice.objects.all()
+    archive_model = ArchivedInvoice
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['supplier', 'month', 'year', 'status', 'is_active']
     search_fields = [
@@ -35,7 +55,8 @@ class InvoiceViewSet(viewsets.ModelViewSet):
     
     def get_permissions(self):
         """Gestion des permissions selon l'action"""
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy',
+                           'bulk_status', 'bulk_deactivate']:
             permission_classes = [CanModifyInvoice]
         else:
             permission_classes = [CanAccessInvoice]
@@ -47,16 +68,29 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         
         # Les non-admins ne voient que les factures actives
         if not self.request.user.is_admin:
-            queryset = queryset.filter(is_active=True)
+            queryset = queryset.active()
         
         return queryset
+
+    def archive_visible(self):
+        """Les factures archivées sont inactives : réservées aux admins"""
+        return self.request.user.is_admin
     
     @extend_schema(
         summary="Lister les factures",
-        description="Lister toutes les factures avec filtres et recherche"
+        description="Lister toutes les factures avec filtres et recherche",
+        parameters=[SPARSE_FIELDS_PARAMETER, FAST_RENDER_PARAMETER]
     )
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        archive_response = self.archive_list(queryset)
+        if archive_response is not None:
+            return archive_response
+
+        fast_response = self.fast_list(queryset)
+        if fast_response is not None:
+            return fast_response
+
         page = self.paginate_queryset(queryset)
         
         if page is not None:
@@ -74,6 +108,10 @@ class InvoiceViewSet(viewsets.ModelViewSet):
             return InvoiceCreateSerializer
         elif self.action in ['update', 'partial_update']:
             return InvoiceUpdateSerializer
+        elif self.action == 'bulk_status':
+            return InvoiceBulkStatusSerializer
+        elif self.action == 'bulk_deactivate':
+            return InvoiceBulkSelectionSerializer
         return InvoiceSerializer
     
     @extend_schema(
@@ -115,9 +153,8 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         if not partial:
             # Modification complète (PUT) - vérifier les avoirs
             from apps.credit_notes.models import CreditNote
-            credit_notes_count = CreditNote.objects.filter(
-                invoice=instance, 
-                is_active=True
+            credit_notes_count = CreditNote.active.filter(
+                invoice=instance
             ).count()
             
             if credit_notes_count > 0:
@@ -133,9 +170,8 @@ class InvoiceViewSet(viewsets.ModelViewSet):
             
             if modified_fields:
                 from apps.credit_notes.models import CreditNote
-                credit_notes_count = CreditNote.objects.filter(
-                    invoice=instance, 
-                    is_active=True
+                credit_notes_count = CreditNote.active.filter(
+                    invoice=instance
                 ).count()
                 
                 if credit_notes_count > 0:
@@ -163,9 +199,8 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         
         # Vérifier si la facture a des avoirs associés
         from apps.credit_notes.models import CreditNote
-        credit_notes_count = CreditNote.objects.filter(
-            invoice=instance, 
-            is_active=True
+        credit_notes_count = CreditNote.active.filter(
+            invoice=instance
         ).count()
         
         if credit_notes_count > 0:
@@ -197,6 +232,72 @@ class InvoiceViewSet(viewsets.ModelViewSet):
             'message': 'Facture réactivée avec succès'
         })
     
+    def _bulk_response(self, serializer, result, message):
+        """Rapport détaillé d'une opération en masse"""
+        updated = result['updated']
+        blocked = result['blocked']
+        payload = {
+            'message': message,
+            'updated': updated,
+            'updated_count': len(updated),
+            'blocked': [
+                {'id': invoice_id, 'credit_notes_count': count}
+                for invoice_id, count in blocked.items()
+            ],
+        }
+
+        if 'ids' in serializer.validated_data:
+            requested = {str(invoice_id) for invoice_id in serializer.validated_data['ids']}
+            # Demandées mais non modifiées : introuvables, déjà dans l'état cible ou bloquées
+            payload['skipped'] = sorted(requested - set(updated) - set(blocked))
+
+        return Response(payload)
+
+    @extend_schema(
+        summary="Changer le statut de plusieurs factures",
+        description=(
+            "Appliquer un statut à une liste d'ids ou à un filtre en une seule "
+            "requête UPDATE (Admin uniquement)"
+        )
+    )
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        """Changement de statut en masse"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        queryset = serializer.filter_queryset(self.get_queryset())
+        result = bulk.bulk_update_status(queryset, serializer.validated_data['status'])
+
+        return self._bulk_response(
+            serializer,
+            result,
+            _('{} facture(s) mise(s) à jour').format(len(result['updated']))
+        )
+
+    @extend_schema(
+        summary="Désactiver plusieurs factures",
+        description=(
+            "Désactiver (soft delete) une liste d'ids ou un filtre en une seule "
+            "requête UPDATE. Les factures ayant des avoirs actifs sont refusées "
+            "(Admin uniquement)"
+        )
+    )
+    @action(detail=False, methods=['post'], url_path='bulk-deactivate')
+    def bulk_deactivate(self, request):
+        """Désactivation en masse"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        queryset = serializer.filter_queryset(self.get_queryset())
+        result = bulk.bulk_deactivate(queryset)
+
+        return self._bulk_response(
+            serializer,
+            result,
+            _('{} facture(s) désactivée(s)').format(len(result['updated']))
+        )
+
     @extend_schema(
         summary="Lister les avoirs d'une facture",
         description="Obtenir la liste des avoirs associés à cette facture"
@@ -208,12 +309,12 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         from apps.credit_notes.models import CreditNote
         from apps.credit_notes.serializers import CreditNoteListSerializer
         
-        credit_notes = CreditNote.objects.filter(
-            invoice=invoice,
-            is_active=True
+        credit_notes = CreditNote.active.filter(
+            invoice=invoice
         ).select_related('supplier').order_by('-created_at')
         
         serializer = CreditNoteListSerializer(credit_notes, many=True)
+        data = serializer.data
         
         return Response({
             'invoice': {
@@ -221,8 +322,8 @@ class InvoiceViewSet(viewsets.ModelViewSet):
                 'invoice_number': invoice.invoice_number,
                 'supplier_name': invoice.supplier.name
             },
-            'credit_notes': serializer.data,
-            'count': credit_notes.count()
+            'credit_notes': data,
+            'count': len(data)
         })
     
     @extend_schema(
@@ -235,7 +336,7 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         month = request.query_params.get('month')
         year = request.query_params.get('year')
         
-        queryset = self.get_queryset().filter(is_active=True)
+        queryset = self.get_queryset().active()
         
         if month:
             queryset = queryset.filter(month=month)
@@ -279,10 +380,9 @@ class InvoiceViewSet(viewsets.ModelViewSet):
                 'error': _('Paramètres month et year invalides')
             }, status=400)
         
-        queryset = self.get_queryset().filter(
+        queryset = self.get_queryset().active().filter(
             month=month,
-            year=year,
-            is_active=True
+            year=year
         )
         
         totals = queryset.aggregate(
@@ -294,3 +394,117 @@ class InvoiceViewSet(viewsets.ModelViewSet):
             'period': {'month': month, 'year': year},
             'totals': totals
         })
+
+    @extend_schema(
+        summary="Échéancier des impayés",
+        description=(
+            "Net à payer des factures non payées par jour et par semaine d'échéance, "
+            "avec les identifiants des factures de chaque bucket. Sans date d'échéance, "
+            "celle-ci est dérivée du délai de paiement du fournisseur."
+        ),
+        parameters=[
+            OpenApiParameter('from', OpenApiTypes.DATE, OpenApiParameter.QUERY,
+                             description="Début (inclus), par défaut aujourd'hui"),
+            OpenApiParameter('to', OpenApiTypes.DATE, OpenApiParameter.QUERY,
+                             description="Fin (incluse), par défaut début + 30 jours"),
+        ]
+    )
+    @action(detail=False, methods=['get'], permission_classes=[IsFinanceUser])
+    def calendar(self, request):
+        """Échéancier des factures impayées"""
+        try:
+            date_from = date.fromisoformat(request.query_params['from']) \
+                if request.query_params.get('from') else timezone.localdate()
+            date_to = date.fromisoformat(request.query_params['to']) \
+                if request.query_params.get('to') else date_from + timedelta(days=30)
+        except ValueError:
+            return Response({
+                'error': _('Paramètres from et to invalides (format AAAA-MM-JJ)')
+            }, status=400)
+
+        if date_to < date_from:
+            return Response({
+                'error': _('La date de fin doit être postérieure à la date de début')
+            }, status=400)
+        if (date_to - date_from).days > MAX_RANGE_DAYS:
+            return Response({
+                'error': _('La période ne peut dépasser {} jours').format(MAX_RANGE_DAYS)
+            }, status=400)
+
+        return Response(build_calendar(date_from, date_to))
+
+    @extend_schema(
+        summary="Rapprochement de relevé fournisseur",
+        description=(
+            "Factures actives d'un fournisseur sur une période, chacune avec ses avoirs "
+            "et son net, plus les avoirs de la période non rattachés à une facture"
+        ),
+        parameters=[
+            OpenApiParameter('supplier', OpenApiTypes.UUID, OpenApiParameter.QUERY, required=True),
+            OpenApiParameter('year', OpenApiTypes.INT, OpenApiParameter.QUERY, required=True),
+            OpenApiParameter('month', OpenApiTypes.INT, OpenApiParameter.QUERY,
+                             description="Mois (1-12), toute l'année si absent"),
+        ]
+    )
+    @action(detail=False, methods=['get'], permission_classes=[IsFinanceUser])
+    def reconciliation(self, request):
+        """Factures et avoirs d'un fournisseur pour une période"""
+        try:
+            supplier_id = uuid.UUID(request.query_params['supplier'])
+            year = int(request.query_params['year'])
+            month = int(request.query_params['month']) if request.query_params.get('month') else None
+        except (KeyError, ValueError):
+            return Response({
+                'error': _('Paramètres supplier (UUID) et year requis, month optionnel')
+            }, status=400)
+
+        if month is not None and not 1 <= month <= 12:
+            return Response({'error': _('Le mois doit être compris entre 1 et 12')}, status=400)
+
+        return Response(build_reconciliation(supplier_id, year, month))
+
+
+class InvoiceImportViewSet(mixins.CreateModelMixin,
+                           mixins.ListModelMixin,
+                           mixins.RetrieveModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    ViewSet pour l'import de relevés fournisseurs (CSV / XLSX)
+    """
+    queryset = InvoiceImport.objects.all()
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def get_serializer_class(self):
+        """Sélection du serializer selon l'action"""
+        if self.action == 'create':
+            return InvoiceImportCreateSerializer
+        return InvoiceImportSerializer
+
+    @extend_schema(
+        summary="Importer un relevé fournisseur",
+        description=(
+            "Déposer un fichier CSV (ou XLSX) de factures. Le fichier est traité "
+            "en flux par lots ; suivre l'avancement via GET /api/invoices/imports/{id}/ "
+            "(Admin uniquement)"
+        ),
+        responses={202: InvoiceImportSerializer}
+    )
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        invoice_import = serializer.save(created_by=get_full_user(request.user))
+
+        invoice_import = start_import(invoice_import)
+
+        return Response(
+            InvoiceImportSerializer(invoice_import).data,
+            status=status.HTTP_202_ACCEPTED
+        )
+
+    @extend_schema(
+        summary="Suivi d'un import",
+        description="Obtenir l'avancement et les erreurs d'un import de factures"
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
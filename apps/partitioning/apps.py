@@ -0,0 +1,19 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_save
+
+
+class PartitioningConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.partitioning'
+    verbose_name = 'Partitionnement par année'
+
+    def ready(self):
+        from . import signals
+        from .partitions import partitioned_models
+
+        post_migrate.connect(signals.create_upcoming_partitions, sender=self)
+        for model in partitioned_models():
+            pre_save.connect(signals.ensure_row_partition, sender=model,
+                             dispatch_uid=f'partition_{model._meta.label_lower}')
+        pre_save.connect(signals.check_invoice_number, sender='invoices.Invoice',
+                         dispatch_uid='partition_invoice_number')
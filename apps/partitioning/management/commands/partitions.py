@@ -0,0 +1,98 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from apps.partitioning.partitions import (
+    PartitioningError,
+    attach_partition,
+    attached_partitions,
+    convert_all,
+    detach_partition,
+    detached_partitions,
+    ensure_partitions,
+    is_partitioned,
+    partitioned_models,
+)
+
+
+class Command(BaseCommand):
+    help = "Gestion des partitions annuelles des factures et avoirs (PostgreSQL)"
+
+    def add_arguments(self, parser):
+        subcommands = parser.add_subparsers(dest='subcommand', required=True)
+
+        subcommands.add_parser('list', help="Partitions attachées et détachées")
+        subcommands.add_parser('convert', help="Convertit les tables en tables partitionnées")
+
+        ensure = subcommands.add_parser('ensure', help="Crée les partitions manquantes")
+        ensure.add_argument('--ahead', type=int, default=1,
+                            help="Nombre d'années à préparer après l'année courante")
+
+        detach = subcommands.add_parser('detach', help="Détache les anciennes partitions")
+        detach.add_argument('--before', type=int, required=True,
+                            help="Détache les années strictement antérieures")
+        detach.add_argument('--dry-run', action='store_true')
+
+        attach = subcommands.add_parser('attach', help="Rattache une partition détachée")
+        attach.add_argument('--year', type=int, required=True)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Le partitionnement nécessite PostgreSQL")
+        try:
+            getattr(self, f"handle_{options['subcommand']}")(**options)
+        except PartitioningError as exc:
+            raise CommandError(str(exc))
+
+    def _tables(self):
+        tables = [model._meta.db_table for model in partitioned_models()]
+        unpartitioned = [table for table in tables if not is_partitioned(table)]
+        if unpartitioned:
+            raise CommandError(
+                f"Tables non partitionnées : {', '.join(unpartitioned)} "
+                f"(lancer d'abord : manage.py partitions convert)"
+            )
+        return tables
+
+    def handle_list(self, **options):
+        for table in self._tables():
+            attached = attached_partitions(table)
+            detached = detached_partitions(table)
+            self.stdout.write(f"{table}")
+            for year in sorted(attached):
+                self.stdout.write(f"  {year}  attachée   {attached[year]}")
+            for year in sorted(detached):
+                self.stdout.write(f"  {year}  détachée   {detached[year]}")
+
+    def handle_convert(self, **options):
+        with connection.schema_editor() as schema_editor:
+            converted = convert_all(schema_editor)
+        if converted:
+            self.stdout.write(self.style.SUCCESS(f"Tables converties : {', '.join(converted)}"))
+        else:
+            self.stdout.write("Tables déjà partitionnées")
+
+    def handle_ensure(self, ahead, **options):
+        self._tables()
+        current = timezone.now().year
+        created = ensure_partitions(range(current, current + ahead + 1))
+        self.stdout.write(self.style.SUCCESS(
+            f"Partitions créées : {', '.join(created)}" if created else "Aucune partition manquante"
+        ))
+
+    def handle_detach(self, before, dry_run, **options):
+        for table in self._tables():
+            for year in sorted(year for year in attached_partitions(table) if year < before):
+                if dry_run:
+                    self.stdout.write(f"[dry-run] {table} {year}")
+                    continue
+                name = detach_partition(table, year)
+                self.stdout.write(self.style.SUCCESS(f"Partition {name} détachée"))
+
+    def handle_attach(self, year, **options):
+        tables = [table for table in self._tables() if year in detached_partitions(table)]
+        if not tables:
+            raise CommandError(f"Aucune partition détachée pour {year}")
+        for table in tables:
+            name = attach_partition(table, year)
+            self.stdout.write(self.style.SUCCESS(f"Partition {name} rattachée"))
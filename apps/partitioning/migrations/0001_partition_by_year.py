@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def partition_tables(apps, schema_editor):
+    from apps.partitioning.partitions import convert_all, enabled
+
+    # Sans DB_PARTITION_BY_YEAR (ou hors PostgreSQL) : rien à faire.
+    # La conversion reste possible plus tard : manage.py partitions convert
+    if not enabled():
+        return
+    convert_all(schema_editor, [
+        apps.get_model('invoices', 'Invoice'),
+        apps.get_model('credit_notes', 'CreditNote'),
+    ])
+
+
+def unpartition_tables(apps, schema_editor):
+    from apps.partitioning.partitions import revert_all
+
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # Factures d'abord : la clé étrangère credit_notes.invoice_id est recréée avec les avoirs
+    revert_all(schema_editor, [
+        apps.get_model('invoices', 'Invoice'),
+        apps.get_model('credit_notes', 'CreditNote'),
+    ])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("invoices", "0007_active_partial_indexes"),
+        ("credit_notes", "0006_active_partial_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
@@ -0,0 +1,352 @@
+"""
+Partitionnement optionnel par année (PostgreSQL)
+
+Activé par ``DB_PARTITION_BY_YEAR``. Les tables ``invoices_invoices`` et
+``credit_notes_credit_notes`` deviennent des tables partitionnées
+``PARTITION BY RANGE (year)`` avec :
+
+- une partition par année (``<table>_y2026``) ;
+- une partition ``<table>_default`` qui reçoit toute ligne sans partition,
+  si bien qu'une insertion n'échoue jamais faute de partition.
+
+Clé de partition : la colonne ``year`` plutôt que ``invoice_date`` /
+``credit_note_date``. Elle est dérivée de la date (``save()``, et renseignée
+explicitement par les chemins ``bulk_create`` / ``COPY``), donc chaque ligne
+tombe dans la même partition qu'avec un découpage sur la date. Mais :
+
+- les requêtes chaudes filtrent sur ``year`` (et ``month``) : rapports
+  mensuels, filtres ``?year=`` des listes, archivage par exercice, et non
+  sur des intervalles de dates. L'élagage des partitions ne se fait que sur
+  la clé de partition ;
+- la clé de partition doit figurer dans la clé primaire et dans chaque
+  contrainte d'unicité : ``(supplier, invoice_number, year)`` garantit
+  l'unicité du numéro par exercice, une contrainte sur la date ne
+  l'imposerait que par jour.
+
+Contraintes PostgreSQL sur une table partitionnée :
+
+- la clé primaire devient ``(id, year)`` et l'unicité
+  ``(supplier, invoice_number)`` devient ``(supplier, invoice_number, year)``.
+  L'unicité inter-années reste vérifiée par l'application
+  (``apps/invoices/uniqueness.py``, appelé en ``pre_save`` et par l'import) ;
+- aucune clé étrangère ne peut cibler ``invoices_invoices(id)`` : la contrainte
+  ``credit_notes.invoice_id`` est supprimée en base, ``on_delete=PROTECT``
+  reste appliqué par Django.
+
+Les partitions sont créées hors ligne (table autonome, transfert des lignes
+depuis la partition par défaut, puis ``ATTACH PARTITION``) : seul un verrou
+``SHARE UPDATE EXCLUSIVE`` est pris sur la table parente.
+"""
+import logging
+import re
+import zlib
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_MODELS = ('invoices.Invoice', 'credit_notes.CreditNote')
+PARTITION_KEY = 'year'
+
+# Années dont la partition est connue dans ce processus, par table
+_known_years = {}
+
+
+class PartitioningError(Exception):
+    """Opération de partitionnement impossible"""
+
+
+def enabled():
+    return getattr(settings, 'DB_PARTITION_BY_YEAR', False) and connection.vendor == 'postgresql'
+
+
+def partitioned_models():
+    return [apps.get_model(label) for label in PARTITIONED_MODELS]
+
+
+def partition_name(table, year):
+    return f"{table}_y{year}"
+
+
+def default_partition_name(table):
+    return f"{table}_default"
+
+
+def _year_of(table, name):
+    match = re.fullmatch(re.escape(table) + r'_y(\d{4})', name)
+    return int(match.group(1)) if match else None
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def attached_partitions(table):
+    """``{année: nom}`` des partitions annuelles attachées"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return {_year_of(table, name): name for name in names if _year_of(table, name)}
+
+
+def detached_partitions(table):
+    """``{année: nom}`` des tables annuelles présentes mais détachées"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname FROM pg_class "
+            "WHERE relkind = 'r' AND NOT relispartition AND relname LIKE %s "
+            "AND pg_table_is_visible(oid)",
+            [f"{table}_y%"],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return {_year_of(table, name): name for name in names if _year_of(table, name)}
+
+
+def _lock(cursor, table):
+    # Verrou consultatif : deux workers ne créent pas la même partition
+    cursor.execute("SELECT pg_advisory_xact_lock(%s)", [zlib.crc32(table.encode())])
+
+
+def _attach(cursor, table, name, year):
+    qn = connection.ops.quote_name
+    default = default_partition_name(table)
+    # Les lignes de cette année tombées dans la partition par défaut sont transférées
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {qn(default)} "
+        f"WHERE {qn(PARTITION_KEY)} >= %s AND {qn(PARTITION_KEY)} < %s RETURNING *) "
+        f"INSERT INTO {qn(name)} SELECT * FROM moved",
+        [year, year + 1],
+    )
+    cursor.execute(
+        f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} "
+        f"FOR VALUES FROM (%s) TO (%s)",
+        [year, year + 1],
+    )
+
+
+def create_partition(table, year):
+    """Crée et attache la partition ``year`` ; retourne ``False`` si elle existe déjà"""
+    qn = connection.ops.quote_name
+    name = partition_name(table, year)
+    with transaction.atomic(), connection.cursor() as cursor:
+        _lock(cursor, table)
+        if year in attached_partitions(table):
+            return False
+        if year in detached_partitions(table):
+            # Année archivée : ses nouvelles lignes restent dans la partition par défaut
+            return False
+
+        cursor.execute(
+            f"CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        _attach(cursor, table, name, year)
+
+    logger.info(f"Partition {name} created")
+    return True
+
+
+def attach_partition(table, year):
+    """Rattache une partition annuelle précédemment détachée"""
+    name = detached_partitions(table).get(year)
+    if name is None:
+        raise PartitioningError(f"Aucune partition détachée {partition_name(table, year)}")
+    with transaction.atomic(), connection.cursor() as cursor:
+        _lock(cursor, table)
+        _attach(cursor, table, name, year)
+    _known_years.pop(table, None)
+    return name
+
+
+def detach_partition(table, year):
+    """
+    Détache une partition annuelle : la table reste en base, hors des requêtes
+    de l'application (sauvegarde, archivage ou suppression à la main).
+    """
+    qn = connection.ops.quote_name
+    name = attached_partitions(table).get(year)
+    if name is None:
+        raise PartitioningError(f"Aucune partition attachée {partition_name(table, year)}")
+    with transaction.atomic(), connection.cursor() as cursor:
+        _lock(cursor, table)
+        cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}")
+    _known_years.pop(table, None)
+    return name
+
+
+def ensure_partitions(years=None):
+    """
+    Crée les partitions manquantes (par défaut : année courante et suivante).
+
+    Retourne la liste des partitions créées.
+    """
+    current = timezone.now().year
+    years = set(years or (current, current + 1))
+    created = []
+    for model in partitioned_models():
+        table = model._meta.db_table
+        if not is_partitioned(table):
+            continue
+        for year in sorted(years):
+            if create_partition(table, year):
+                created.append(partition_name(table, year))
+        _known_years[table] = set(attached_partitions(table))
+    return created
+
+
+def ensure_year(model, year):
+    """
+    Garantit la partition de ``year`` avant une écriture (appelé en ``pre_save``).
+
+    Le coût est une recherche dans un ensemble tant que l'année est connue.
+    """
+    table = model._meta.db_table
+    if table not in _known_years:
+        _known_years[table] = set(attached_partitions(table)) if is_partitioned(table) else None
+    known = _known_years[table]
+    if known is None or not year or year in known:
+        return
+    create_partition(table, year)
+    known.add(year)
+
+
+def _recreate_constraints(schema_editor, model):
+    """Clé primaire, unicités, index et clés étrangères de la table partitionnée"""
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    pk_column = model._meta.pk.column
+
+    schema_editor.execute(
+        f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(table + '_pkey')} "
+        f"PRIMARY KEY ({qn(pk_column)}, {qn(PARTITION_KEY)})"
+    )
+    for fields in model._meta.unique_together:
+        columns = [model._meta.get_field(name).column for name in fields]
+        if PARTITION_KEY not in columns:
+            columns.append(PARTITION_KEY)
+        schema_editor.execute(
+            f"ALTER TABLE {qn(table)} ADD CONSTRAINT "
+            f"{qn(schema_editor._create_index_name(table, columns, suffix='_uniq'))} "
+            f"UNIQUE ({', '.join(qn(column) for column in columns)})"
+        )
+
+    for field in model._meta.local_fields:
+        for statement in schema_editor._field_indexes_sql(model, field):
+            schema_editor.execute(statement)
+        remote = field.remote_field
+        if remote and field.db_constraint:
+            if remote.model._meta.label in PARTITIONED_MODELS:
+                # Pas de clé étrangère possible vers une table partitionnée par année
+                continue
+            schema_editor.execute(
+                schema_editor._create_fk_sql(model, field, "_fk_%(to_table)s_%(to_column)s")
+            )
+    for index in model._meta.indexes:
+        schema_editor.add_index(model, index)
+
+
+def convert_table(schema_editor, model):
+    """
+    Convertit la table de ``model`` en table partitionnée par année (données
+    comprises). À exécuter dans une transaction, table par table.
+    """
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    legacy = f"{table}_legacy"
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT DISTINCT {qn(PARTITION_KEY)} FROM {qn(table)}")
+        years = {row[0] for row in cursor.fetchall()}
+    current = timezone.now().year
+    years |= {current, current + 1}
+
+    schema_editor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+    schema_editor.execute(
+        f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE ({qn(PARTITION_KEY)})"
+    )
+    schema_editor.execute(
+        f"CREATE TABLE {qn(default_partition_name(table))} PARTITION OF {qn(table)} DEFAULT"
+    )
+    for year in sorted(years):
+        schema_editor.execute(
+            f"CREATE TABLE {qn(partition_name(table, year))} PARTITION OF {qn(table)} "
+            f"FOR VALUES FROM ({int(year)}) TO ({int(year) + 1})"
+        )
+    schema_editor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}")
+    # CASCADE : supprime les clés étrangères entrantes (credit_notes.invoice_id)
+    schema_editor.execute(f"DROP TABLE {qn(legacy)} CASCADE")
+    _recreate_constraints(schema_editor, model)
+    _known_years[table] = years
+
+
+def revert_table(schema_editor, model):
+    """
+    Inverse de ``convert_table`` : table ordinaire aux contraintes d'origine
+    (données comprises). Les partitions détachées restent en base.
+    """
+    qn = schema_editor.quote_name
+    table = model._meta.db_table
+    partitioned = f"{table}_partitioned"
+
+    schema_editor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(partitioned)}")
+    # Noms d'index et de contraintes libérés pour la table recréée
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f')",
+            [partitioned],
+        )
+        constraints = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT indexname FROM pg_indexes WHERE tablename = %s AND schemaname = current_schema()",
+            [partitioned],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+    for name in constraints:
+        schema_editor.execute(f"ALTER TABLE {qn(partitioned)} DROP CONSTRAINT {qn(name)}")
+    for name in indexes:
+        if name not in constraints:
+            schema_editor.execute(f"DROP INDEX {qn(name)}")
+
+    schema_editor.create_model(model)
+    columns = ', '.join(qn(field.column) for field in model._meta.concrete_fields)
+    schema_editor.execute(f"INSERT INTO {qn(table)} ({columns}) SELECT {columns} FROM {qn(partitioned)}")
+    schema_editor.execute(f"DROP TABLE {qn(partitioned)}")
+    _known_years.pop(table, None)
+
+
+def convert_all(schema_editor, models=None):
+    """Convertit les tables non encore partitionnées ; retourne leurs noms"""
+    converted = []
+    for model in models or partitioned_models():
+        table = model._meta.db_table
+        if not is_partitioned(table):
+            convert_table(schema_editor, model)
+            converted.append(table)
+    return converted
+
+
+def revert_all(schema_editor, models=None):
+    """Inverse de ``convert_all`` ; retourne les noms des tables rétablies"""
+    reverted = []
+    for model in models or partitioned_models():
+        table = model._meta.db_table
+        if is_partitioned(table):
+            revert_table(schema_editor, model)
+            reverted.append(table)
+    return reverted
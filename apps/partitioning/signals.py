@@ -0,0 +1,35 @@
+import logging
+
+from django.db import DatabaseError
+
+from .partitions import enabled, ensure_partitions, ensure_year
+
+logger = logging.getLogger(__name__)
+
+
+def create_upcoming_partitions(sender, **kwargs):
+    """Après ``migrate`` : partitions de l'année courante et de la suivante"""
+    if enabled():
+        created = ensure_partitions()
+        if created:
+            logger.info(f"Partitions created: {', '.join(created)}")
+
+
+def ensure_row_partition(sender, instance, raw=False, **kwargs):
+    """Avant écriture : crée la partition de l'année de la ligne si besoin"""
+    if raw or not enabled():
+        return
+    try:
+        ensure_year(sender, instance.year)
+    except DatabaseError as exc:
+        # La ligne sera rangée dans la partition par défaut
+        logger.warning(f"Partition creation for {sender._meta.db_table} {instance.year} failed: {exc}")
+
+
+def check_invoice_number(sender, instance, raw=False, **kwargs):
+    """Avant écriture : unicité (fournisseur, numéro) que la base n'impose plus qu'par année"""
+    if raw or not enabled():
+        return
+    from apps.invoices.uniqueness import check_unique_numbers
+
+    check_unique_numbers([instance])
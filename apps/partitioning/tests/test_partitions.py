@@ -0,0 +1,178 @@
+import importlib
+from datetime import date
+from unittest import skipUnless
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.invoices.uniqueness import DuplicateInvoiceNumber, check_unique_numbers, existing_numbers
+from apps.partitioning import partitions
+from apps.suppliers.models import Supplier
+
+migration = importlib.import_module("apps.partitioning.migrations.0001_partition_by_year")
+
+INVOICES = Invoice._meta.db_table
+CREDIT_NOTES = CreditNote._meta.db_table
+
+
+class TestInvoiceNumberUniqueness(TestCase):
+    def setUp(self):
+        self.supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        self.invoice = Invoice.objects.create(
+            supplier=self.supplier, invoice_number="F1", net_to_pay=10, invoice_date=date(2024, 3, 1)
+        )
+
+    def test_existing_numbers_any_year(self):
+        pairs = {(self.supplier.id, "F1"), (str(self.supplier.id), "F2")}
+        self.assertEqual(existing_numbers(pairs), {(self.supplier.id, "F1")})
+        self.assertEqual(existing_numbers([(str(self.supplier.id), "F1")], [self.invoice.pk]), set())
+
+    def test_check_rejects_database_and_batch_duplicates(self):
+        other_year = Invoice(supplier=self.supplier, invoice_number="F1", net_to_pay=1, invoice_date=date(2025, 1, 2))
+        with self.assertRaises(DuplicateInvoiceNumber):
+            check_unique_numbers([other_year])
+
+        batch = [
+            Invoice(supplier=self.supplier, invoice_number="F9", net_to_pay=1, invoice_date=date(2025, 1, 2)),
+            Invoice(supplier=self.supplier, invoice_number="F9", net_to_pay=1, invoice_date=date(2026, 1, 2)),
+        ]
+        with self.assertRaises(DuplicateInvoiceNumber):
+            check_unique_numbers(batch)
+
+        # Mise à jour de la facture elle-même : pas un doublon
+        self.invoice.invoice_date = date(2025, 6, 1)
+        check_unique_numbers([self.invoice])
+
+
+@skipUnless(connection.vendor == "postgresql", "Verrous consultatifs PostgreSQL uniquement")
+class TestAdvisoryLocks(TestCase):
+    def test_batch_locks_in_one_query(self):
+        supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        batch = [Invoice(supplier=supplier, invoice_number=f"F{index}", net_to_pay=1, invoice_date=date(2025, 1, 2))
+                 for index in range(50)]
+
+        with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+            check_unique_numbers(batch)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND pid = pg_backend_pid()")
+                held = cursor.fetchone()[0]
+
+        self.assertEqual(len([query for query in queries if "pg_advisory_xact_lock" in query["sql"]]), 1)
+        self.assertEqual(held, 50)
+
+
+@skipUnless(connection.vendor == "postgresql", "Partitionnement PostgreSQL uniquement")
+@override_settings(DB_PARTITION_BY_YEAR=True)
+class PartitionedTestCase(TestCase):
+    convert = True
+
+    def setUp(self):
+        # Pas de contrôles de clés étrangères différés en attente avant les ALTER TABLE
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        partitions._known_years.clear()
+        self.addCleanup(partitions._known_years.clear)
+        self.supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        if self.convert:
+            with connection.schema_editor() as editor:
+                partitions.convert_all(editor)
+
+    def invoice(self, number, invoice_date, **kwargs):
+        return Invoice(supplier=self.supplier, invoice_number=number, net_to_pay=10, invoice_date=invoice_date,
+                       month=invoice_date.month, year=invoice_date.year, **kwargs)
+
+    def partition_of(self, table, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT tableoid::regclass::text FROM {connection.ops.quote_name(table)} WHERE id = %s",
+                           [pk])
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    def constraints(self, table, kind):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = %s",
+                [table, kind],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class TestMigration(PartitionedTestCase):
+    convert = False
+
+    def test_forward_and_back(self):
+        invoice = Invoice.objects.create(
+            supplier=self.supplier, invoice_number="F1", net_to_pay=10, invoice_date=date(2024, 3, 1)
+        )
+        credit_note = CreditNote.objects.create(
+            supplier=self.supplier, invoice=invoice, credit_note_number="A1", amount=2,
+            credit_note_date=date(2024, 3, 5)
+        )
+
+        with connection.schema_editor() as editor:
+            migration.partition_tables(apps, editor)
+
+        self.assertTrue(partitions.is_partitioned(INVOICES))
+        self.assertTrue(partitions.is_partitioned(CREDIT_NOTES))
+        self.assertEqual(self.partition_of(INVOICES, invoice.pk), f"{INVOICES}_y2024")
+        self.assertEqual(self.partition_of(CREDIT_NOTES, credit_note.pk), f"{CREDIT_NOTES}_y2024")
+        self.assertEqual(self.constraints(INVOICES, "p"), ["PRIMARY KEY (id, year)"])
+        self.assertIn("UNIQUE (supplier_id, invoice_number, year)", self.constraints(INVOICES, "u"))
+        self.assertFalse([fk for fk in self.constraints(CREDIT_NOTES, "f") if INVOICES in fk])
+
+        with connection.schema_editor() as editor:
+            migration.unpartition_tables(apps, editor)
+
+        self.assertFalse(partitions.is_partitioned(INVOICES))
+        self.assertFalse(partitions.is_partitioned(CREDIT_NOTES))
+        self.assertEqual(self.partition_of(INVOICES, invoice.pk), INVOICES)
+        self.assertEqual(self.constraints(INVOICES, "p"), ["PRIMARY KEY (id)"])
+        self.assertIn("UNIQUE (supplier_id, invoice_number)", self.constraints(INVOICES, "u"))
+        self.assertTrue([fk for fk in self.constraints(CREDIT_NOTES, "f") if INVOICES in fk])
+        self.assertEqual(CreditNote.objects.get(pk=credit_note.pk).invoice_id, invoice.pk)
+
+
+class TestPartitions(PartitionedTestCase):
+    def test_pre_save_creates_year_partition(self):
+        self.assertNotIn(2031, partitions.attached_partitions(INVOICES))
+
+        invoice = self.invoice("F1", date(2031, 5, 1))
+        invoice.save()
+
+        self.assertIn(2031, partitions.attached_partitions(INVOICES))
+        self.assertEqual(self.partition_of(INVOICES, invoice.pk), f"{INVOICES}_y2031")
+
+    def test_bulk_create_default_partition_then_detach_attach_ensure(self):
+        (invoice,) = Invoice.objects.bulk_create([self.invoice("F1", date(2033, 2, 1))])
+        self.assertEqual(self.partition_of(INVOICES, invoice.pk), f"{INVOICES}_default")
+
+        self.assertIn(f"{INVOICES}_y2033", partitions.ensure_partitions([2033]))
+        self.assertEqual(self.partition_of(INVOICES, invoice.pk), f"{INVOICES}_y2033")
+
+        partitions.detach_partition(INVOICES, 2033)
+        self.assertFalse(Invoice.objects.filter(pk=invoice.pk).exists())
+        self.assertIn(2033, partitions.detached_partitions(INVOICES))
+        # Année détachée : pas de nouvelle partition, les lignes vont dans la partition par défaut
+        self.assertEqual(partitions.ensure_partitions([2033]), [])
+        (late,) = Invoice.objects.bulk_create([self.invoice("F2", date(2033, 3, 1))])
+        self.assertEqual(self.partition_of(INVOICES, late.pk), f"{INVOICES}_default")
+
+        partitions.attach_partition(INVOICES, 2033)
+        self.assertEqual(self.partition_of(INVOICES, invoice.pk), f"{INVOICES}_y2033")
+        self.assertEqual(self.partition_of(INVOICES, late.pk), f"{INVOICES}_y2033")
+
+    def test_cross_year_duplicate_rejected(self):
+        Invoice.objects.create(supplier=self.supplier, invoice_number="F1", net_to_pay=10,
+                               invoice_date=date(2024, 3, 1))
+
+        with self.assertRaises(DuplicateInvoiceNumber), transaction.atomic():
+            Invoice.objects.create(supplier=self.supplier, invoice_number="F1", net_to_pay=10,
+                                   invoice_date=date(2025, 3, 1))
+        self.assertEqual(Invoice.objects.filter(invoice_number="F1").count(), 1)
+
+        # Même année : la contrainte (fournisseur, numéro, année) reste en place en base
+        self.assertIn("UNIQUE (supplier_id, invoice_number, year)", self.constraints(INVOICES, "u"))
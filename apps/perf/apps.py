@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class PerfConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.perf'
+    verbose_name = 'Performances'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .profiling import install_on_connection
+
+        connection_created.connect(install_on_connection, dispatch_uid='perf_execute_wrapper')
@@ -0,0 +1,290 @@
+"""
+Jeu de données synthétique reproductible, à l'échelle de la production
+
+Fournisseurs, factures, avoirs liés aux factures et accès utilisateurs
+(``UserSupplierAccess``). Une même graine et une même date de fin donnent
+les mêmes données (hors horodatages ``created_at`` / ``updated_at``).
+
+- Les factures se concentrent sur quelques gros fournisseurs (répartiteurs)
+  et suivent une saisonnalité (pic hivernal, creux estival) en nombre comme
+  en montant ; échéance selon le délai de paiement du fournisseur, statut
+  selon l'échéance (payées pour l'essentiel une fois échues).
+- Une fraction des factures reçoit un avoir, quelques jours à quelques
+  semaines plus tard.
+
+Factures et avoirs sont générés et insérés par lots : ``COPY`` sous
+PostgreSQL (psycopg 2 ou 3), ``bulk_create`` ailleurs. Les fournisseurs,
+utilisateurs et accès, peu nombreux, passent toujours par ``bulk_create``.
+
+Commande : ``python manage.py generate_load_data``.
+"""
+import csv
+import io
+import itertools
+import math
+import random
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.partitioning.partitions import enabled as partitioning_enabled, ensure_year
+from apps.suppliers.models import Supplier, UserSupplierAccess
+
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_CREDIT_NOTE_RATIO = 0.1
+# Les fournisseurs générés se reconnaissent à leur code
+CODE_PREFIX = 'LD'
+USERNAME_PREFIX = 'load_user_'
+
+# Activité par mois (janvier à décembre) : épidémies hivernales, creux d'été
+SEASONALITY = (1.25, 1.2, 1.1, 0.95, 0.9, 0.85, 0.75, 0.7, 0.95, 1.05, 1.15, 1.25)
+# Poids du fournisseur de rang r : 1 / r ** SUPPLIER_SKEW
+SUPPLIER_SKEW = 0.9
+PAYMENT_TERMS = (30, 30, 45, 60)
+
+SUPPLIER_KINDS = ('Laboratoires', 'Répartiteur', 'Pharma', 'Distribution', 'Grossiste', 'Biologique')
+SUPPLIER_ROOTS = (
+    'Alpha', 'Boréal', 'Cèdre', 'Delta', 'Éole', 'Fleuve', 'Garance', 'Hélios', 'Iris', 'Jade',
+    'Kermès', 'Lys', 'Mistral', 'Nova', 'Olympe', 'Provence', 'Quartz', 'Rhône', 'Sirius', 'Tilleul',
+)
+CITIES = (
+    ('75011', 'Paris'), ('69003', 'Lyon'), ('13008', 'Marseille'), ('31000', 'Toulouse'),
+    ('33000', 'Bordeaux'), ('59000', 'Lille'), ('44000', 'Nantes'), ('67000', 'Strasbourg'),
+)
+MOTIFS = (
+    'Produits périmés', 'Erreur de livraison', 'Casse au transport', 'Remise de fin d\'année',
+    'Retour de lot', 'Écart de prix',
+)
+
+
+class LoadDataError(Exception):
+    pass
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _cents(value):
+    return Decimal(max(int(round(value * 100)), 100)).scaleb(-2)
+
+
+def _days(first, last):
+    """Jours de la période et poids cumulés selon la saisonnalité"""
+    days = [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+    weights = itertools.accumulate(SEASONALITY[day.month - 1] for day in days)
+    return days, list(weights)
+
+
+class Generator:
+    def __init__(self, seed, years, end_date, credit_note_ratio):
+        self.rng = random.Random(seed)
+        self.end_date = end_date
+        self.first_date = date(end_date.year - years + 1, 1, 1)
+        self.credit_note_ratio = credit_note_ratio
+        self.now = timezone.now()
+        self.days, self.day_weights = _days(self.first_date, end_date)
+        self.invoice_seq = itertools.count(1)
+        self.credit_note_seq = itertools.count(1)
+
+    @property
+    def years(self):
+        return range(self.first_date.year, self.end_date.year + 1)
+
+    def suppliers(self, count):
+        rng = self.rng
+        suppliers = []
+        for index in range(count):
+            postal_code, city = rng.choice(CITIES)
+            name = f"{rng.choice(SUPPLIER_KINDS)} {rng.choice(SUPPLIER_ROOTS)} {index + 1:05d}"
+            suppliers.append(Supplier(
+                id=_uuid(rng),
+                name=name,
+                code=f"{CODE_PREFIX}{index + 1:06d}",
+                siret=f"{rng.randrange(10 ** 8, 10 ** 9)}{index:05d}",
+                address=f"{rng.randrange(1, 200)} rue {rng.choice(SUPPLIER_ROOTS)}",
+                postal_code=postal_code,
+                city=city,
+                phone=f"0{rng.randrange(1, 6)} {rng.randrange(10, 100)} {rng.randrange(10, 100)} "
+                      f"{rng.randrange(10, 100)} {rng.randrange(10, 100)}",
+                email=f"contact{index + 1}@fournisseur.example",
+                contact_person=f"Contact {index + 1}",
+                payment_terms=rng.choice(PAYMENT_TERMS),
+            ))
+        # Gros fournisseurs d'abord : poids décroissants, montants plus élevés
+        self.supplier_weights = list(itertools.accumulate(
+            1 / (rank ** SUPPLIER_SKEW) for rank in range(1, count + 1)
+        ))
+        self.supplier_scales = [
+            math.exp(rng.gauss(6.5, 0.6) + 0.8 * (1 - rank / count)) for rank in range(count)
+        ]
+        return suppliers
+
+    def users(self, count):
+        roles = (User.Role.PHARMACIEN, User.Role.COMPTABLE)
+        password = make_password(None)
+        return [
+            User(
+                id=_uuid(self.rng),
+                username=f"{USERNAME_PREFIX}{index + 1:04d}",
+                email=f"{USERNAME_PREFIX}{index + 1:04d}@pharmacie.example",
+                role=roles[index % len(roles)],
+                password=password,
+            )
+            for index in range(count)
+        ]
+
+    def grants(self, users, suppliers, per_user):
+        per_user = min(per_user, len(suppliers))
+        return [
+            UserSupplierAccess(user=user, supplier=supplier)
+            for user in users
+            for supplier in self.rng.sample(suppliers, per_user)
+        ]
+
+    def _status(self, invoice_date, due_date):
+        rng = self.rng
+        if (self.end_date - invoice_date).days < 10 and rng.random() < 0.3:
+            return Invoice.Status.DRAFT
+        if due_date < self.end_date - timedelta(days=15):
+            return Invoice.Status.PAID if rng.random() < 0.96 else Invoice.Status.PENDING
+        return Invoice.Status.PENDING
+
+    def batches(self, suppliers, count, chunk_size):
+        """Lots ``(factures, avoirs)`` sous forme de dictionnaires colonne → valeur"""
+        rng = self.rng
+        remaining = count
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            remaining -= size
+            indexes = rng.choices(range(len(suppliers)), cum_weights=self.supplier_weights, k=size)
+            dates = rng.choices(self.days, cum_weights=self.day_weights, k=size)
+
+            invoices, credit_notes = [], []
+            for index, invoice_date in zip(indexes, dates):
+                supplier = suppliers[index]
+                season = SEASONALITY[invoice_date.month - 1]
+                amount = _cents(self.supplier_scales[index] * rng.lognormvariate(0, 0.7) * season ** 0.5)
+                due_date = invoice_date + timedelta(days=supplier.payment_terms)
+                invoice = {
+                    'id': _uuid(rng),
+                    'supplier_id': supplier.id,
+                    'invoice_number': f"F{invoice_date.year}-{next(self.invoice_seq):08d}",
+                    'net_to_pay': amount,
+                    'invoice_date': invoice_date,
+                    'due_date': due_date,
+                    'status': self._status(invoice_date, due_date),
+                    'notes': None,
+                    'month': invoice_date.month,
+                    'year': invoice_date.year,
+                    'is_active': True,
+                    'created_at': self.now,
+                    'updated_at': self.now,
+                }
+                invoices.append(invoice)
+
+                if rng.random() < self.credit_note_ratio:
+                    credit_date = min(invoice_date + timedelta(days=rng.randrange(3, 60)), self.end_date)
+                    credit_notes.append({
+                        'id': _uuid(rng),
+                        'supplier_id': supplier.id,
+                        'invoice_id': invoice['id'],
+                        'credit_note_number': f"A{credit_date.year}-{next(self.credit_note_seq):08d}",
+                        'amount': _cents(float(amount) * rng.uniform(0.02, 0.3)),
+                        'credit_note_date': credit_date,
+                        'motif': rng.choice(MOTIFS),
+                        'month': credit_date.month,
+                        'year': credit_date.year,
+                        'is_active': True,
+                        'created_at': self.now,
+                        'updated_at': self.now,
+                    })
+            yield invoices, credit_notes
+
+
+def _copy(model, rows):
+    """``COPY ... FROM STDIN`` au format CSV (NULL : champ vide)"""
+    fields = model._meta.concrete_fields
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    sql = f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    attnames = [field.attname for field in fields]
+    for row in rows:
+        writer.writerow([row[name] for name in attnames])
+    buffer.seek(0)
+
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, 'copy'):
+            # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            raw.copy_expert(sql, buffer)
+
+
+def _bulk_create(model, rows):
+    model.objects.bulk_create([model(**row) for row in rows])
+
+
+def _writer(method):
+    if method == 'auto':
+        method = 'copy' if connection.vendor == 'postgresql' else 'bulk'
+    if method == 'copy':
+        if connection.vendor != 'postgresql':
+            raise LoadDataError("COPY nécessite PostgreSQL")
+        return method, _copy
+    return method, _bulk_create
+
+
+def generate_load_data(suppliers, invoices, years, seed, end_date=None, credit_note_ratio=DEFAULT_CREDIT_NOTE_RATIO,
+                       users=10, grants_per_user=5, chunk_size=DEFAULT_CHUNK_SIZE, method='auto', progress=None):
+    """
+    Génère et insère le jeu de données ; retourne le nombre de lignes par table.
+
+    ``progress`` est appelé après chaque lot avec le nombre de factures insérées.
+    """
+    if suppliers < 1 or invoices < 0 or years < 1:
+        raise LoadDataError("Il faut au moins un fournisseur et une année")
+    if Supplier.objects.filter(code__startswith=CODE_PREFIX).exists():
+        raise LoadDataError(
+            f"Des données de charge existent déjà (fournisseurs {CODE_PREFIX}...) : partir d'une base vide"
+        )
+
+    method, write = _writer(method)
+    generator = Generator(seed, years, end_date or timezone.localdate(), credit_note_ratio)
+
+    if partitioning_enabled():
+        # Ni COPY ni bulk_create n'émettent pre_save : partitions créées ici
+        for year in generator.years:
+            ensure_year(Invoice, year)
+            ensure_year(CreditNote, year)
+
+    with transaction.atomic():
+        supplier_objects = Supplier.objects.bulk_create(generator.suppliers(suppliers))
+        user_objects = User.objects.bulk_create(generator.users(users))
+        access = UserSupplierAccess.objects.bulk_create(
+            generator.grants(user_objects, supplier_objects, grants_per_user)
+        )
+
+    counts = {'suppliers': len(supplier_objects), 'users': len(user_objects), 'access': len(access),
+              'invoices': 0, 'credit_notes': 0, 'method': method}
+    for invoice_rows, credit_note_rows in generator.batches(supplier_objects, invoices, chunk_size):
+        with transaction.atomic():
+            write(Invoice, invoice_rows)
+            if credit_note_rows:
+                write(CreditNote, credit_note_rows)
+        counts['invoices'] += len(invoice_rows)
+        counts['credit_notes'] += len(credit_note_rows)
+        if progress:
+            progress(counts['invoices'])
+    return counts
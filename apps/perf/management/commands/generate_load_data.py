@@ -0,0 +1,64 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.perf.load_data import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_CREDIT_NOTE_RATIO,
+    LoadDataError,
+    generate_load_data,
+)
+
+PROGRESS_EVERY = 100000
+
+
+class Command(BaseCommand):
+    help = "Génère un jeu de données synthétique reproductible (fournisseurs, factures, avoirs, accès)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--suppliers', type=int, default=200)
+        parser.add_argument('--invoices', type=int, default=100000)
+        parser.add_argument('--years', type=int, default=3, help="Exercices couverts, jusqu'à --end-date")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--end-date', type=date.fromisoformat,
+                            help="Dernier jour de la période (AAAA-MM-JJ) ; par défaut aujourd'hui")
+        parser.add_argument('--credit-note-ratio', type=float, default=DEFAULT_CREDIT_NOTE_RATIO,
+                            help="Fraction des factures recevant un avoir")
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--grants-per-user', type=int, default=5)
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--method', choices=['auto', 'copy', 'bulk'], default='auto',
+                            help="auto : COPY sous PostgreSQL, bulk_create ailleurs")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        reported = [0]
+
+        def progress(inserted):
+            if inserted - reported[0] >= PROGRESS_EVERY or inserted == options['invoices']:
+                reported[0] = inserted
+                self.stdout.write(f"{inserted} facture(s) ({time.monotonic() - started:.0f} s)")
+
+        try:
+            counts = generate_load_data(
+                suppliers=options['suppliers'],
+                invoices=options['invoices'],
+                years=options['years'],
+                seed=options['seed'],
+                end_date=options['end_date'],
+                credit_note_ratio=options['credit_note_ratio'],
+                users=options['users'],
+                grants_per_user=options['grants_per_user'],
+                chunk_size=options['chunk_size'],
+                method=options['method'],
+                progress=progress,
+            )
+        except LoadDataError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['suppliers']} fournisseur(s), {counts['invoices']} facture(s), "
+            f"{counts['credit_notes']} avoir(s), {counts['users']} utilisateur(s), "
+            f"{counts['access']} accès ({counts['method']}, {time.monotonic() - started:.0f} s)"
+        ))
@@ -0,0 +1,69 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Sum
+from django.utils import timezone
+
+from apps.perf.models import SlowQuery
+from apps.perf.slow_queries import flush
+
+SQL_WIDTH = 160
+
+
+class Command(BaseCommand):
+    help = "Empreintes SQL les plus coûteuses (temps cumulé des requêtes lentes capturées)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--hours', type=float, default=24,
+                            help="Fenêtre d'analyse en heures (0 : tout l'historique)")
+        parser.add_argument('--route', help="Seulement les requêtes d'une route (reports:dashboard...)")
+        parser.add_argument('--plans', action='store_true', help="Affiche le dernier plan de chaque empreinte")
+        parser.add_argument('--prune-days', type=int,
+                            help="Supprime d'abord les captures plus anciennes que ce nombre de jours")
+
+    def handle(self, *args, **options):
+        # Captures de ce processus encore en file
+        flush()
+
+        if options['prune_days'] is not None:
+            cutoff = timezone.now() - timedelta(days=options['prune_days'])
+            removed = SlowQuery.objects.filter(captured_at__lt=cutoff).delete()[0]
+            self.stdout.write(f"{removed} capture(s) supprimée(s)")
+
+        captures = SlowQuery.objects.all()
+        if options['hours']:
+            captures = captures.filter(captured_at__gte=timezone.now() - timedelta(hours=options['hours']))
+        if options['route']:
+            captures = captures.filter(route=options['route'])
+
+        top = list(
+            captures.values('fingerprint').annotate(
+                calls=Count('id'), total=Sum('duration_ms'), avg=Avg('duration_ms'), slowest=Max('duration_ms'),
+            ).order_by('-total')[:options['limit']]
+        )
+        if not top:
+            self.stdout.write("Aucune requête lente capturée")
+            return
+
+        for rank, row in enumerate(top, 1):
+            samples = captures.filter(fingerprint=row['fingerprint'])
+            routes = samples.values('route').annotate(calls=Count('id')).order_by('-calls')[:3]
+            latest = samples.order_by('-captured_at').first()
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{rank}. {row['fingerprint']} : {row['total']:.0f} ms au total, {row['calls']} appel(s), "
+                f"moyenne {row['avg']:.1f} ms, max {row['slowest']:.1f} ms"
+            ))
+            self.stdout.write("   routes : " + ", ".join(
+                f"{entry['route'] or '(hors requête)'} ({entry['calls']})" for entry in routes
+            ))
+            self.stdout.write(f"   {latest.sql[:SQL_WIDTH]}")
+            if options['plans']:
+                planned = samples.filter(plan__isnull=False).order_by('-captured_at').first()
+                if planned is None:
+                    self.stdout.write("   plan : aucun échantillon")
+                else:
+                    self.stdout.write(f"   params : {planned.params}")
+                    self.stdout.write("   plan : " + json.dumps(planned.plan, indent=2, ensure_ascii=False))
@@ -0,0 +1,413 @@
+"""
+Métriques au format d'exposition Prometheus (``/api/metrics/``)
+
+Chaque worker écrit ses valeurs dans son propre fichier projeté en mémoire
+(``mmap``), ``metrics_<pid>.db`` sous ``PERF_METRICS_DIR``. L'endpoint,
+servi par n'importe quel worker, lit et additionne les fichiers de tous les
+workers :
+
+- compteurs et histogrammes : tous les fichiers, y compris ceux des workers
+  terminés (recyclés par ``max_requests``), pour rester monotones ;
+- jauges : workers vivants seulement, additionnées, ou une série par
+  ``pid`` (mémoire résidente).
+
+Le répertoire est vidé au démarrage de gunicorn (``config/gunicorn.py``).
+Sans ``PERF_METRICS_DIR`` (tests, serveur de développement), les valeurs
+restent dans la mémoire du processus.
+
+Les métriques par requête sont enregistrées par ``PerformanceMiddleware``.
+Les compteurs cumulés du processus (caches à deux niveaux, pool de
+connexions) et sa mémoire résidente y sont recopiés au plus toutes les
+``PERF_METRICS_REFRESH`` secondes, et à chaque lecture de l'endpoint.
+"""
+import bisect
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+from django.conf import settings
+
+from apps.cache.tiered import all_stats
+from apps.dbpool.pool import pool_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+DEFAULT_REFRESH = 5
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+FILE_PATTERN = 'metrics_*.db'
+INITIAL_FILE_SIZE = 64 * 1024
+# Fichier : octets utilisés, puis entrées (longueur de la clé, clé
+# complétée à un multiple de 8, valeur double alignée sur 8 octets)
+HEADER = struct.Struct('<I4x')
+LENGTH = struct.Struct('<I')
+VALUE = struct.Struct('<d')
+
+
+def _padded(length):
+    return length + (-(LENGTH.size + length) % 8)
+
+
+def read_entries(data):
+    """``(clé, valeur, position)`` des entrées complètes d'un fichier de valeurs"""
+    if len(data) < HEADER.size:
+        return
+    used = min(HEADER.unpack_from(data, 0)[0], len(data))
+    position = HEADER.size
+    while position + LENGTH.size <= used:
+        (length,) = LENGTH.unpack_from(data, position)
+        value_at = position + LENGTH.size + _padded(length)
+        if value_at + VALUE.size > used:
+            return
+        key = bytes(data[position + LENGTH.size:position + LENGTH.size + length]).decode()
+        yield key, VALUE.unpack_from(data, value_at)[0], value_at
+        position = value_at + VALUE.size
+
+
+class MemoryValues:
+    """Valeurs propres au processus (sans ``PERF_METRICS_DIR``)"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.directory = ''
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def add_many(self, amounts):
+        with self._lock:
+            for key, amount in amounts:
+                self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, key, value):
+        with self._lock:
+            self._values[key] = float(value)
+
+    def items(self):
+        with self._lock:
+            return list(self._values.items())
+
+
+class MmapValues:
+    """
+    Valeurs du processus dans ``<répertoire>/metrics_<pid>.db``
+
+    Une entrée est écrite avant la mise à jour du nombre d'octets utilisés :
+    un lecteur ne voit que des entrées complètes. Un fichier existant (pid
+    réutilisé) est repris, ses compteurs continuent.
+    """
+
+    def __init__(self, directory, pid):
+        self.pid = pid
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(os.path.join(directory, f'metrics_{pid}.db'), os.O_RDWR | os.O_CREAT, 0o600)
+        size = os.fstat(self._fd).st_size
+        if size < INITIAL_FILE_SIZE:
+            os.ftruncate(self._fd, INITIAL_FILE_SIZE)
+            size = INITIAL_FILE_SIZE
+        self._map = mmap.mmap(self._fd, size)
+        self._positions = {key: position for key, _, position in read_entries(self._map)}
+        self._used = max(HEADER.unpack_from(self._map, 0)[0], HEADER.size)
+
+    def _position(self, key):
+        position = self._positions.get(key)
+        if position is None:
+            encoded = key.encode()
+            size = LENGTH.size + _padded(len(encoded)) + VALUE.size
+            if self._used + size > len(self._map):
+                self._grow(self._used + size)
+            LENGTH.pack_into(self._map, self._used, len(encoded))
+            self._map[self._used + LENGTH.size:self._used + LENGTH.size + len(encoded)] = encoded
+            position = self._used + size - VALUE.size
+            VALUE.pack_into(self._map, position, 0.0)
+            self._used += size
+            HEADER.pack_into(self._map, 0, self._used)
+            self._positions[key] = position
+        return position
+
+    def _grow(self, needed):
+        size = len(self._map)
+        while size < needed:
+            size *= 2
+        self._map.close()
+        os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    def add_many(self, amounts):
+        with self._lock:
+            for key, amount in amounts:
+                position = self._position(key)
+                VALUE.pack_into(self._map, position, VALUE.unpack_from(self._map, position)[0] + amount)
+
+    def set(self, key, value):
+        with self._lock:
+            VALUE.pack_into(self._map, self._position(key), float(value))
+
+
+_values = None
+_values_lock = threading.Lock()
+
+
+def metrics_dir():
+    return getattr(settings, 'PERF_METRICS_DIR', '')
+
+
+def values():
+    """Valeurs du processus courant (nouveau fichier après un fork)"""
+    global _values
+    current = _values
+    directory, pid = metrics_dir(), os.getpid()
+    if current is None or current.pid != pid or current.directory != directory:
+        with _values_lock:
+            current = _values
+            if current is None or current.pid != pid or current.directory != directory:
+                current = _values = MmapValues(directory, pid) if directory else MemoryValues(pid)
+    return current
+
+
+def _alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def samples():
+    """``(pid, vivant, clé, valeur)`` de tous les processus"""
+    store = values()
+    if isinstance(store, MemoryValues):
+        for key, value in store.items():
+            yield store.pid, True, key, value
+        return
+
+    for path in glob.glob(os.path.join(store.directory, FILE_PATTERN)):
+        try:
+            pid = int(os.path.basename(path)[len('metrics_'):-len('.db')])
+            with open(path, 'rb') as handle:
+                data = handle.read()
+        except (ValueError, OSError):
+            continue
+        alive = _alive(pid)
+        for key, value, _ in read_entries(data):
+            yield pid, alive, key, value
+
+
+def _format(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+_metrics = {}
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _metrics[name] = self
+
+    def _key(self, suffix, labels, extra=()):
+        pairs = [[name, str(value)] for name, value in zip(self.labelnames, labels)]
+        return json.dumps([self.name, suffix, pairs + list(extra)], separators=(',', ':'))
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        values().add_many([(self._key('', labels), amount)])
+
+    def set_total(self, *labels, value):
+        """Compteur tenu ailleurs dans le processus, recopié tel quel"""
+        values().set(self._key('', labels), value)
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), per_process=False):
+        super().__init__(name, documentation, labelnames)
+        # Une série par worker (label pid) plutôt que la somme
+        self.per_process = per_process
+
+    def set(self, *labels, value):
+        values().set(self._key('', labels), value)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self.bounds = [_format(bound) for bound in self.buckets] + ['+Inf']
+
+    def observe(self, value, *labels):
+        bound = self.bounds[bisect.bisect_left(self.buckets, value)]
+        # Compte par intervalle ; les cumuls sont calculés à l'exposition
+        values().add_many([
+            (self._key('_bucket', labels, [['le', bound]]), 1),
+            (self._key('_sum', labels), value),
+            (self._key('_count', labels), 1),
+        ])
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', "Durée des requêtes HTTP par route", ('route', 'method'), LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_queries', "Requêtes SQL par requête HTTP", ('route',), QUERY_BUCKETS,
+)
+REQUESTS = Counter('http_requests_total', "Requêtes HTTP par route et statut", ('route', 'method', 'status'))
+THROTTLED = Counter('ratelimit_rejections_total', "Requêtes refusées par les throttles", ('scope',))
+CACHE_LOOKUPS = Counter(
+    'tiered_cache_lookups_total', "Lectures des caches à deux niveaux (auth:token, auth:stamp...)",
+    ('cache', 'result'),
+)
+DB_POOL_CONNECTIONS = Gauge('db_pool_connections', "Connexions des pools (workers vivants)", ('alias', 'state'))
+DB_POOL_EVENTS = Counter('db_pool_events_total', "Emprunts, attentes et connexions des pools", ('alias', 'event'))
+RESIDENT_MEMORY = Gauge('process_resident_memory_bytes', "Mémoire résidente de chaque worker", per_process=True)
+
+CACHE_RESULTS = (('local_hit', 'local_hits'), ('shared_hit', 'shared_hits'), ('miss', 'misses'))
+POOL_STATES = ('size', 'in_use', 'waiting')
+POOL_EVENTS = ('requests', 'waits', 'timeouts', 'connects', 'connect_errors', 'connections_lost')
+
+
+def record_request(request, response, profile):
+    match = getattr(request, 'resolver_match', None)
+    route = match.view_name if match else 'unmatched'
+    method = request.method if request.method in METHODS else 'other'
+    REQUEST_DURATION.observe(profile.total, route, method)
+    REQUEST_QUERIES.observe(profile.queries, route)
+    REQUESTS.inc(route, method, response.status_code)
+    maybe_collect()
+
+
+def resident_memory():
+    """Mémoire résidente courante (Linux), ou ``None``"""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def collect():
+    """Recopie les compteurs cumulés et la mémoire du processus"""
+    for name, stats in all_stats().items():
+        for result, field in CACHE_RESULTS:
+            CACHE_LOOKUPS.set_total(name, result, value=stats[field])
+
+    for alias in settings.DATABASES:
+        stats = pool_stats(alias)
+        if stats is None:
+            continue
+        for state in POOL_STATES:
+            DB_POOL_CONNECTIONS.set(alias, state, value=stats[state])
+        for event in POOL_EVENTS:
+            DB_POOL_EVENTS.set_total(alias, event, value=stats[event])
+
+    rss = resident_memory()
+    if rss is not None:
+        RESIDENT_MEMORY.set(value=rss)
+
+
+class _Collection:
+    lock = threading.Lock()
+    at = 0.0
+
+
+def maybe_collect():
+    now = time.monotonic()
+    if now - _Collection.at < getattr(settings, 'PERF_METRICS_REFRESH', DEFAULT_REFRESH):
+        return
+    with _Collection.lock:
+        if now - _Collection.at < getattr(settings, 'PERF_METRICS_REFRESH', DEFAULT_REFRESH):
+            return
+        _Collection.at = now
+    collect()
+
+
+def aggregate():
+    """``{(nom, suffixe, labels): valeur}`` additionné sur les workers"""
+    totals = {}
+    for pid, alive, key, value in samples():
+        name, suffix, pairs = json.loads(key)
+        metric = _metrics.get(name)
+        if metric is None:
+            continue
+        if metric.kind == 'gauge':
+            if not alive:
+                continue
+            if metric.per_process:
+                pairs = pairs + [['pid', str(pid)]]
+        sample = (name, suffix, tuple(map(tuple, pairs)))
+        totals[sample] = totals.get(sample, 0.0) + value
+    return totals
+
+
+def _histogram_lines(metric, samples):
+    series = {}
+    for (suffix, pairs), value in samples.items():
+        labels = tuple(pair for pair in pairs if pair[0] != 'le')
+        entry = series.setdefault(labels, {'buckets': {}, '_sum': 0.0, '_count': 0.0})
+        if suffix == '_bucket':
+            entry['buckets'][dict(pairs)['le']] = value
+        else:
+            entry[suffix] = value
+
+    lines = []
+    for labels in sorted(series):
+        entry = series[labels]
+        cumulative = 0.0
+        for bound in metric.bounds:
+            cumulative += entry['buckets'].get(bound, 0.0)
+            lines.append(f"{metric.name}_bucket{_labels(labels + (('le', bound),))} {_format(cumulative)}")
+        lines.append(f"{metric.name}_sum{_labels(labels)} {_format(entry['_sum'])}")
+        lines.append(f"{metric.name}_count{_labels(labels)} {_format(entry['_count'])}")
+    return lines
+
+
+def render():
+    """Texte d'exposition Prometheus (version 0.0.4) de tous les workers"""
+    collect()
+    by_metric = {}
+    for (name, suffix, pairs), value in aggregate().items():
+        by_metric.setdefault(name, {})[(suffix, pairs)] = value
+
+    lines = []
+    for name in sorted(_metrics):
+        metric = _metrics[name]
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        samples = by_metric.get(name, {})
+        if metric.kind == 'histogram':
+            lines.extend(_histogram_lines(metric, samples))
+        else:
+            for (suffix, pairs), value in sorted(samples.items()):
+                lines.append(f"{name}{suffix}{_labels(pairs)} {_format(value)}")
+    return '\n'.join(lines) + '\n'
+
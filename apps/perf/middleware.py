@@ -0,0 +1,122 @@
+"""
+Instrumentation de chaque requête HTTP (voir ``profiling.py``)
+
+- en-tête ``Server-Timing`` pour les administrateurs ;
+- ligne de log ``apps.perf`` au format clé=valeur (données aussi dans
+  ``extra['perf']``) pour une fraction ``PERF_LOG_SAMPLE_RATE`` des
+  requêtes, et pour toutes les requêtes lentes ;
+- requêtes lentes conservées pour ``/api/perf/slow-requests/`` ;
+- histogrammes de latence et de requêtes SQL par route (``/api/metrics/``).
+
+À placer en tête de ``MIDDLEWARE`` pour mesurer toute la chaîne.
+"""
+import logging
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, empty
+
+from apps.cache.tiered import request_counters
+
+from . import metrics
+from .profiling import (
+    RequestProfile, current_profile, install_on_current_thread, slow_request_ms, slow_requests,
+)
+
+logger = logging.getLogger('apps.perf')
+
+DEFAULT_LOG_SAMPLE_RATE = 0.01
+
+
+def _is_admin(request):
+    user = getattr(request, 'user', None)
+    # Utilisateur de session jamais chargé pendant la requête : pas de requête SQL ici
+    if user is None or (isinstance(user, SimpleLazyObject) and user._wrapped is empty):
+        return False
+    return bool(user.is_authenticated and getattr(user, 'is_admin', False))
+
+
+def server_timing(profile):
+    data = profile.as_dict()
+    return ', '.join([
+        f"total;dur={data['total_ms']}",
+        f"db;dur={data['db_ms']};desc=\"{data['queries']} queries, {data['duplicates']} dup\"",
+        f"serialize;dur={data['serialize_ms']}",
+        f"cache;desc=\"{data['cache_hits']} hits, {data['cache_misses']} misses\"",
+    ])
+
+
+class PerformanceMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        install_on_current_thread()
+        profile, tokens = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            self._stop(tokens)
+        return self._finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile, tokens = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._stop(tokens)
+        return self._finish(request, response, profile)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = current_profile.get()
+        if profile is not None and request.resolver_match:
+            profile.route = request.resolver_match.view_name
+
+    def process_template_response(self, request, response):
+        # Appelé juste avant le rendu d'une Response DRF ; le rappel suit le rendu
+        profile = current_profile.get()
+        if profile is not None:
+            profile.start_render()
+            response.add_post_render_callback(lambda rendered: profile.stop_render())
+        return response
+
+    def _start(self):
+        profile = RequestProfile()
+        return profile, (current_profile.set(profile), request_counters.set(profile.cache))
+
+    def _stop(self, tokens):
+        current_profile.reset(tokens[0])
+        request_counters.reset(tokens[1])
+
+    def _finish(self, request, response, profile):
+        profile.finish()
+        metrics.record_request(request, response, profile)
+        if _is_admin(request):
+            response['Server-Timing'] = server_timing(profile)
+
+        slow = profile.total * 1000 >= slow_request_ms()
+        if slow:
+            slow_requests.add(request, response, profile)
+        if slow or random.random() < getattr(settings, 'PERF_LOG_SAMPLE_RATE', DEFAULT_LOG_SAMPLE_RATE):
+            match = getattr(request, 'resolver_match', None)
+            data = {
+                'method': request.method,
+                'route': match.view_name if match else None,
+                'status': response.status_code,
+                'slow': slow,
+                **profile.as_dict(),
+            }
+            logger.info(
+                'request ' + ' '.join(f'{key}={value}' for key, value in data.items()),
+                extra={'perf': data},
+            )
+        return response
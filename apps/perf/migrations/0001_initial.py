@@ -0,0 +1,70 @@
+# Generated by Django 5.0.6 on 2026-10-19 03:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(max_length=16, verbose_name="Empreinte"),
+                ),
+                ("sql", models.TextField(verbose_name="SQL normalisé")),
+                ("params", models.TextField(blank=True, verbose_name="Paramètres")),
+                (
+                    "route",
+                    models.CharField(blank=True, max_length=200, verbose_name="Route"),
+                ),
+                (
+                    "alias",
+                    models.CharField(
+                        default="default", max_length=50, verbose_name="Base de données"
+                    ),
+                ),
+                ("duration_ms", models.FloatField(verbose_name="Durée (ms)")),
+                (
+                    "plan",
+                    models.JSONField(
+                        blank=True, null=True, verbose_name="Plan d'exécution"
+                    ),
+                ),
+                (
+                    "captured_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Capturée le"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Requête lente",
+                "verbose_name_plural": "Requêtes lentes",
+                "db_table": "perf_slow_queries",
+                "indexes": [
+                    models.Index(
+                        fields=["fingerprint", "captured_at"],
+                        name="perf_slow_q_fingerp_5b64f3_idx",
+                    ),
+                    models.Index(
+                        fields=["captured_at"], name="perf_slow_q_capture_b17fd8_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class SlowQuery(models.Model):
+    """
+    Requête SQL plus lente que ``PERF_SLOW_QUERY_MS`` (voir ``slow_queries.py``)
+
+    ``sql`` est la forme normalisée commune à toutes les exécutions d'une
+    même ``fingerprint`` ; ``plan`` n'est renseigné que pour les captures
+    échantillonnées.
+    """
+    fingerprint = models.CharField(
+        max_length=16,
+        verbose_name=_('Empreinte')
+    )
+
+    sql = models.TextField(
+        verbose_name=_('SQL normalisé')
+    )
+
+    params = models.TextField(
+        blank=True,
+        verbose_name=_('Paramètres')
+    )
+
+    # Nom de route de la vue d'origine ; vide hors requête HTTP
+    route = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name=_('Route')
+    )
+
+    alias = models.CharField(
+        max_length=50,
+        default='default',
+        verbose_name=_('Base de données')
+    )
+
+    duration_ms = models.FloatField(
+        verbose_name=_('Durée (ms)')
+    )
+
+    plan = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name=_('Plan d\'exécution')
+    )
+
+    captured_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('Capturée le')
+    )
+
+    class Meta:
+        db_table = 'perf_slow_queries'
+        verbose_name = _('Requête lente')
+        verbose_name_plural = _('Requêtes lentes')
+        indexes = [
+            models.Index(fields=['fingerprint', 'captured_at']),
+            models.Index(fields=['captured_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.fingerprint} ({self.duration_ms:.0f} ms)"
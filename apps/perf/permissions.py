@@ -0,0 +1,23 @@
+import ipaddress
+
+from django.conf import settings
+from rest_framework import permissions
+
+DEFAULT_METRICS_NETWORKS = ('127.0.0.1/32', '::1/128')
+
+
+class FromMetricsNetwork(permissions.BasePermission):
+    """
+    Adresse du client dans ``PERF_METRICS_ALLOWED_NETWORKS``
+
+    Seule ``REMOTE_ADDR`` est lue (``X-Forwarded-For`` se falsifie) :
+    derrière un reverse proxy, autoriser le réseau du proxy et y restreindre
+    ``/api/metrics/``.
+    """
+    def has_permission(self, request, view):
+        try:
+            address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+        except ValueError:
+            return False
+        networks = getattr(settings, 'PERF_METRICS_ALLOWED_NETWORKS', DEFAULT_METRICS_NETWORKS)
+        return any(address in ipaddress.ip_network(network, strict=False) for network in networks)
@@ -0,0 +1,149 @@
+"""
+Profil d'une requête HTTP : temps total, temps et nombre de requêtes SQL,
+requêtes en double, temps de rendu de la réponse, succès et échecs du cache
+
+Le profil de la requête en cours est porté par une ``ContextVar`` : il suit
+la requête dans les threads de ``sync_to_async`` (vues asynchrones). Un
+``execute_wrapper`` posé sur chaque connexion (signal ``connection_created``)
+y enregistre les requêtes SQL, et transmet les plus lentes à
+``slow_queries.capture`` (dans ou hors requête HTTP).
+
+Les requêtes plus lentes que ``PERF_SLOW_REQUEST_MS`` sont gardées dans un
+tampon circulaire du processus (``PERF_SLOW_REQUESTS_SIZE`` entrées).
+"""
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from . import slow_queries
+
+DEFAULT_SLOW_REQUEST_MS = 500
+DEFAULT_SLOW_REQUESTS_SIZE = 100
+# Requêtes en double conservées pour une requête lente
+TOP_DUPLICATES = 3
+SQL_PREVIEW_LENGTH = 200
+
+current_profile = ContextVar('perf_current_profile', default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        # Nom de route de la vue, connu une fois l'URL résolue
+        self.route = None
+        self.total = 0.0
+        self.db_time = 0.0
+        self.queries = 0
+        self.render_time = 0.0
+        self.cache = {'hits': 0, 'misses': 0}
+        self._render_started = None
+        self._statements = Counter()
+
+    def record_query(self, sql, params, many, duration):
+        self.queries += 1
+        self.db_time += duration
+        if not many:
+            self._statements[(sql, repr(params))] += 1
+
+    def start_render(self):
+        self._render_started = time.perf_counter()
+
+    def stop_render(self):
+        if self._render_started is not None:
+            self.render_time += time.perf_counter() - self._render_started
+            self._render_started = None
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+        return self
+
+    @property
+    def duplicates(self):
+        """Exécutions répétées d'une même requête avec les mêmes paramètres"""
+        return sum(count - 1 for count in self._statements.values())
+
+    def top_duplicates(self):
+        return [
+            {'sql': sql[:SQL_PREVIEW_LENGTH], 'count': count}
+            for (sql, _), count in self._statements.most_common(TOP_DUPLICATES)
+            if count > 1
+        ]
+
+    def as_dict(self):
+        return {
+            'total_ms': round(self.total * 1000, 2),
+            'db_ms': round(self.db_time * 1000, 2),
+            'queries': self.queries,
+            'duplicates': self.duplicates,
+            'serialize_ms': round(self.render_time * 1000, 2),
+            'cache_hits': self.cache['hits'],
+            'cache_misses': self.cache['misses'],
+        }
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        profile = current_profile.get()
+        if profile is not None:
+            profile.record_query(sql, params, many, duration)
+        slow_queries.capture(
+            sql, params, many, duration, context['connection'].alias, profile.route if profile else None,
+        )
+
+
+def install_on_connection(sender=None, connection=None, **kwargs):
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+def install_on_current_thread():
+    """Connexions du thread courant ouvertes avant le branchement du signal"""
+    for connection in connections.all(initialized_only=True):
+        install_on_connection(connection=connection)
+
+
+def slow_request_ms():
+    return getattr(settings, 'PERF_SLOW_REQUEST_MS', DEFAULT_SLOW_REQUEST_MS)
+
+
+class SlowRequests:
+    """Tampon circulaire des requêtes lentes du processus"""
+
+    def __init__(self, size):
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, request, response, profile):
+        match = getattr(request, 'resolver_match', None)
+        entry = {
+            'at': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'route': match.view_name if match else None,
+            'status': response.status_code,
+            **profile.as_dict(),
+            'duplicated_sql': profile.top_duplicates(),
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+    def slowest(self):
+        with self._lock:
+            entries = list(self._entries)
+        return sorted(entries, key=lambda entry: entry['total_ms'], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_requests = SlowRequests(getattr(settings, 'PERF_SLOW_REQUESTS_SIZE', DEFAULT_SLOW_REQUESTS_SIZE))
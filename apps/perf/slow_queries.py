@@ -0,0 +1,207 @@
+"""
+Capture des requêtes SQL lentes
+
+Chaque requête plus longue que ``PERF_SLOW_QUERY_MS`` (valeur négative :
+capture désactivée) est notée avec la route de la vue d'origine, son
+empreinte et ses paramètres. L'empreinte est le hachage du SQL normalisé :
+littéraux et paramètres remplacés par ``?``, listes ``IN (...)`` et lignes
+``VALUES`` multiples réduites à ``(...)``.
+
+Rien n'est écrit pendant la requête HTTP : les captures sont mises en file
+et un thread du processus les enregistre (table ``perf_slow_queries``)
+toutes les ``PERF_SLOW_QUERY_FLUSH_INTERVAL`` secondes (``0`` : pas de
+thread, appeler ``flush()``).
+
+Ce thread calcule aussi le plan d'une fraction ``PERF_EXPLAIN_SAMPLE_RATE``
+des ``SELECT`` capturés, au plus une fois par empreinte et par
+``PERF_EXPLAIN_INTERVAL`` secondes : ``EXPLAIN (FORMAT JSON)`` sous
+PostgreSQL, ``EXPLAIN QUERY PLAN`` sous SQLite. Sans ``ANALYZE`` : la
+requête n'est pas réexécutée.
+
+Rapport par empreinte : ``python manage.py slow_queries``.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_QUERY_MS = 200
+DEFAULT_FLUSH_INTERVAL = 5
+DEFAULT_EXPLAIN_SAMPLE_RATE = 0.1
+DEFAULT_EXPLAIN_INTERVAL = 3600
+# Captures en attente au-delà desquelles les suivantes sont ignorées
+QUEUE_SIZE = 10000
+PARAMS_LENGTH = 1000
+
+_SPACE = re.compile(r'\s+')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r'%s|\?')
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LIST = re.compile(r'\(\?(?:, ?\?)*\)')
+_ROWS = re.compile(r'\(\.\.\.\)(?:, ?\(\.\.\.\))+')
+_EXPLAINABLE = re.compile(r'\s*(SELECT|WITH)\b', re.IGNORECASE)
+
+_queue = queue.Queue(maxsize=QUEUE_SIZE)
+# Requêtes du thread d'enregistrement (INSERT, EXPLAIN) : jamais capturées
+_state = threading.local()
+
+
+def threshold_ms():
+    return getattr(settings, 'PERF_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS)
+
+
+def fingerprint(sql):
+    """``(empreinte, SQL normalisé)``"""
+    normalized = _SPACE.sub(' ', sql).strip()
+    normalized = _STRING.sub('?', normalized)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _LIST.sub('(...)', normalized)
+    normalized = _ROWS.sub('(...)', normalized)
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest(), normalized
+
+
+def capture(sql, params, many, duration, alias, route):
+    """Appelée par ``execute_wrapper`` après chaque requête SQL"""
+    threshold = threshold_ms()
+    if threshold < 0 or duration * 1000 < threshold or getattr(_state, 'flushing', False):
+        return
+    try:
+        _queue.put_nowait({
+            'sql': sql,
+            'params': params,
+            'many': many,
+            'duration_ms': duration * 1000,
+            'alias': alias,
+            'route': route or '',
+            'captured_at': timezone.now(),
+        })
+    except queue.Full:
+        return
+    _Flusher.ensure_started()
+
+
+class _Explained:
+    lock = threading.Lock()
+    at = {}
+
+
+def _should_explain(fingerprint, entry):
+    if entry['many'] or not _EXPLAINABLE.match(entry['sql']):
+        return False
+    if random.random() >= getattr(settings, 'PERF_EXPLAIN_SAMPLE_RATE', DEFAULT_EXPLAIN_SAMPLE_RATE):
+        return False
+    now = time.monotonic()
+    with _Explained.lock:
+        last = _Explained.at.get(fingerprint)
+        if last is not None and now - last < getattr(settings, 'PERF_EXPLAIN_INTERVAL', DEFAULT_EXPLAIN_INTERVAL):
+            return False
+        _Explained.at[fingerprint] = now
+    return True
+
+
+def explain(alias, sql, params):
+    """Plan de la requête (JSON), ou ``None`` si le moteur n'est pas pris en charge"""
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        query = f'EXPLAIN (FORMAT JSON) {sql}'
+    elif connection.vendor == 'sqlite':
+        query = f'EXPLAIN QUERY PLAN {sql}'
+    else:
+        return None
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+    except DatabaseError as exc:
+        logger.warning(f"EXPLAIN impossible : {exc}")
+        return None
+
+    if connection.vendor == 'postgresql':
+        plan = rows[0][0]
+        return json.loads(plan) if isinstance(plan, str) else plan
+    return [{'id': row[0], 'parent': row[1], 'detail': row[3]} for row in rows]
+
+
+def flush():
+    """Enregistre les captures en file ; retourne le nombre de lignes créées"""
+    from .models import SlowQuery
+
+    entries = []
+    while True:
+        try:
+            entries.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    if not entries:
+        return 0
+
+    _state.flushing = True
+    try:
+        rows = []
+        for entry in entries:
+            digest, normalized = fingerprint(entry['sql'])
+            plan = None
+            if _should_explain(digest, entry):
+                plan = explain(entry['alias'], entry['sql'], entry['params'])
+            rows.append(SlowQuery(
+                fingerprint=digest,
+                sql=normalized,
+                params='' if entry['params'] is None else repr(entry['params'])[:PARAMS_LENGTH],
+                route=entry['route'],
+                alias=entry['alias'],
+                duration_ms=round(entry['duration_ms'], 2),
+                plan=plan,
+                captured_at=entry['captured_at'],
+            ))
+        SlowQuery.objects.bulk_create(rows)
+    finally:
+        _state.flushing = False
+    return len(rows)
+
+
+class _Flusher(threading.Thread):
+    lock = threading.Lock()
+    instance = None
+
+    def __init__(self, interval):
+        super().__init__(name='slow-query-flusher', daemon=True)
+        self.interval = interval
+        self.pid = os.getpid()
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                flush()
+            except Exception:
+                logger.exception("Enregistrement des requêtes lentes impossible")
+            finally:
+                connections.close_all()
+
+    @classmethod
+    def ensure_started(cls):
+        interval = getattr(settings, 'PERF_SLOW_QUERY_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+        if interval <= 0:
+            return
+        # Après un fork, le thread du parent n'existe plus
+        current = cls.instance
+        if current is not None and current.pid == os.getpid():
+            return
+        with cls.lock:
+            current = cls.instance
+            if current is None or current.pid != os.getpid():
+                cls.instance = cls(interval)
+                cls.instance.start()
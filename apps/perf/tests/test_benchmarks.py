@@ -0,0 +1,38 @@
+from django.test import SimpleTestCase
+
+from benchmarks.endpoints import MIN_LATENCY_DELTA_MS, MIN_MEMORY_DELTA_KB, regressions
+
+THRESHOLDS = {"latency": 0.3, "memory": 0.25, "queries": 0.0}
+
+
+class TestRegressions(SimpleTestCase):
+    def test_relative_threshold(self):
+        baseline = {"list": {"p95_ms": 100.0, "queries": 4, "alloc_kb": 1000.0}}
+
+        self.assertEqual(regressions({"list": {"p95_ms": 129.0, "queries": 4, "alloc_kb": 1240.0}},
+                                     baseline, THRESHOLDS), [])
+        self.assertEqual(
+            regressions({"list": {"p95_ms": 131.0, "queries": 5, "alloc_kb": 1260.0}}, baseline, THRESHOLDS),
+            [("list", "p95_ms", 100.0, 131.0), ("list", "queries", 4, 5), ("list", "alloc_kb", 1000.0, 1260.0)],
+        )
+
+    def test_absolute_floor_absorbs_small_values(self):
+        baseline = {"login": {"p50_ms": 1.0, "alloc_kb": 10.0, "queries": 0}}
+        # +100 % sous l'écart minimal : du bruit
+        results = {"login": {"p50_ms": 1.0 + MIN_LATENCY_DELTA_MS, "alloc_kb": 10.0 + MIN_MEMORY_DELTA_KB,
+                             "queries": 0}}
+        self.assertEqual(regressions(results, baseline, THRESHOLDS), [])
+
+        results = {"login": {"p50_ms": 1.1 + MIN_LATENCY_DELTA_MS, "alloc_kb": 10.0 + MIN_MEMORY_DELTA_KB,
+                             "queries": 1}}
+        self.assertEqual(regressions(results, baseline, THRESHOLDS),
+                         [("login", "p50_ms", 1.0, 1.1 + MIN_LATENCY_DELTA_MS), ("login", "queries", 0, 1)])
+
+    def test_metrics_missing_from_reference_are_not_compared(self):
+        # Référence versionnée : nombres de requêtes seulement
+        baseline = {"dashboard": {"queries": 8}}
+        results = {
+            "dashboard": {"p50_ms": 500.0, "alloc_kb": 9000.0, "queries": 8},
+            "new_endpoint": {"queries": 100},
+        }
+        self.assertEqual(regressions(results, baseline, THRESHOLDS), [])
@@ -0,0 +1,69 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+from django.test import TestCase
+
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.perf.load_data import generate_load_data
+from apps.suppliers.models import Supplier, UserSupplierAccess
+
+
+class TestGenerateLoadData(TestCase):
+    def _snapshot(self):
+        return (
+            list(Supplier.objects.order_by('code').values_list('id', 'name', 'payment_terms')),
+            list(Invoice.objects.order_by('invoice_number').values_list(
+                'id', 'supplier_id', 'net_to_pay', 'invoice_date', 'due_date', 'status',
+            )),
+            list(CreditNote.objects.order_by('credit_note_number').values_list('invoice_id', 'amount')),
+        )
+
+    def test_command_generates_consistent_data(self):
+        out = StringIO()
+        call_command(
+            'generate_load_data', '--suppliers', '20', '--invoices', '3000', '--years', '2',
+            '--seed', '7', '--end-date', '2025-06-30', '--chunk-size', '700', stdout=out,
+        )
+        self.assertIn("3000 facture(s)", out.getvalue())
+        self.assertEqual(Supplier.objects.count(), 20)
+        self.assertEqual(Invoice.objects.count(), 3000)
+        self.assertEqual(UserSupplierAccess.objects.count(), 50)
+
+        invoices = Invoice.objects.all()
+        self.assertFalse(invoices.filter(invoice_date__lt=date(2024, 1, 1)).exists())
+        self.assertFalse(invoices.filter(invoice_date__gt=date(2025, 6, 30)).exists())
+        self.assertTrue(all(
+            invoice.month == invoice.invoice_date.month and invoice.due_date > invoice.invoice_date
+            for invoice in invoices
+        ))
+        # Répartition concentrée sur les gros fournisseurs
+        per_supplier = sorted(invoices.values('supplier').annotate(n=Count('id')).values_list('n', flat=True))
+        self.assertGreater(per_supplier[-1], 5 * per_supplier[0])
+
+        credit_notes = CreditNote.objects.select_related('invoice')
+        self.assertGreater(credit_notes.count(), 0)
+        self.assertTrue(all(
+            note.supplier_id == note.invoice.supplier_id and note.credit_note_date >= note.invoice.invoice_date
+            for note in credit_notes
+        ))
+
+        with self.assertRaises(CommandError):
+            call_command('generate_load_data', '--suppliers', '1', '--invoices', '1', stdout=StringIO())
+
+    def test_same_seed_same_data(self):
+        arguments = dict(suppliers=5, invoices=400, years=1, seed=3, end_date=date(2025, 3, 31), users=2)
+        generate_load_data(**arguments)
+        first = self._snapshot()
+        CreditNote.objects.all().delete()
+        Invoice.objects.all().delete()
+        UserSupplierAccess.objects.all().delete()
+        Supplier.objects.all().delete()
+        from apps.accounts.models import User
+        User.objects.filter(username__startswith='load_user_').delete()
+
+        generate_load_data(**arguments)
+        self.assertEqual(self._snapshot(), first)
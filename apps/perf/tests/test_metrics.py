@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.models import User
+from apps.perf import metrics
+
+
+class TestMmapValues(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_values_survive_reopen_and_growth(self):
+        values = metrics.MmapValues(self.directory, 4242)
+        keys = [f"counter-{index}" * 20 for index in range(500)]
+        values.add_many([(key, 1) for key in keys])
+        values.add_many([(keys[0], 2.5)])
+
+        reopened = metrics.MmapValues(self.directory, 4242)
+        reopened.add_many([(keys[0], 1)])
+        with open(os.path.join(self.directory, "metrics_4242.db"), "rb") as handle:
+            entries = {key: value for key, value, _ in metrics.read_entries(handle.read())}
+        self.assertEqual(len(entries), 500)
+        self.assertEqual(entries[keys[0]], 4.5)
+
+    def test_workers_are_aggregated(self):
+        with override_settings(PERF_METRICS_DIR=self.directory):
+            metrics.THROTTLED.inc("login")
+            metrics.RESIDENT_MEMORY.set(value=100)
+            # Worker terminé : ses compteurs restent, ses jauges disparaissent
+            dead = metrics.MmapValues(self.directory, 2 ** 22 + 1)
+            dead.add_many([(metrics.THROTTLED._key("", ["login"]), 2)])
+            dead.set(metrics.RESIDENT_MEMORY._key("", []), 50)
+            totals = metrics.aggregate()
+
+        self.assertEqual(totals[("ratelimit_rejections_total", "", (("scope", "login"),))], 3)
+        rss = [key for key in totals if key[0] == "process_resident_memory_bytes"]
+        self.assertEqual(rss, [("process_resident_memory_bytes", "", (("pid", str(os.getpid())),))])
+
+
+class TestMetricsEndpoint(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user(username="admin", password="pass", role=User.Role.ADMIN)
+        compta = User.objects.create_user(username="compta", password="pass", role=User.Role.COMPTABLE)
+        cls.admin_auth = {"authorization": f"Token {Token.objects.create(user=admin).key}"}
+        cls.compta_auth = {"authorization": f"Token {Token.objects.create(user=compta).key}"}
+
+    def test_exposition(self):
+        self.client.get("/api/suppliers/", headers=self.compta_auth)
+        response = self.client.get("/api/metrics/", headers=self.admin_auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn("# TYPE http_request_duration_seconds histogram", body)
+        self.assertIn(
+            'http_request_duration_seconds_bucket{route="suppliers:supplier-list",method="GET",le="+Inf"}', body
+        )
+        self.assertIn('http_request_queries_count{route="suppliers:supplier-list"}', body)
+        self.assertIn('tiered_cache_lookups_total{cache="auth:token",result="miss"}', body)
+
+    def test_restricted_by_role_and_network(self):
+        self.assertEqual(self.client.get("/api/metrics/", headers=self.compta_auth).status_code, 403)
+        with override_settings(PERF_METRICS_ALLOWED_NETWORKS=["10.0.0.0/8"]):
+            self.assertEqual(self.client.get("/api/metrics/", headers=self.admin_auth).status_code, 403)
+        response = self.client.get("/api/metrics/", headers=self.admin_auth, REMOTE_ADDR="10.1.2.3")
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,66 @@
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.models import User
+from apps.perf.profiling import RequestProfile, current_profile, install_on_current_thread, slow_requests
+
+
+class TestRequestProfile(TestCase):
+    def test_queries_and_duplicates_are_counted(self):
+        install_on_current_thread()
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        try:
+            for _ in range(3):
+                User.objects.filter(username="x").exists()
+            User.objects.filter(username="y").exists()
+        finally:
+            current_profile.reset(token)
+        self.assertEqual(profile.queries, 4)
+        self.assertEqual(profile.duplicates, 2)
+        self.assertEqual(profile.top_duplicates()[0]["count"], 3)
+
+    def test_queries_outside_requests_are_ignored(self):
+        install_on_current_thread()
+        profile = RequestProfile()
+        User.objects.exists()
+        self.assertEqual(profile.queries, 0)
+
+
+class TestPerformanceMiddleware(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user(username="admin", password="pass", role=User.Role.ADMIN)
+        compta = User.objects.create_user(username="compta", password="pass", role=User.Role.COMPTABLE)
+        cls.admin_auth = {"authorization": f"Token {Token.objects.create(user=admin).key}"}
+        cls.compta_auth = {"authorization": f"Token {Token.objects.create(user=compta).key}"}
+
+    def setUp(self):
+        slow_requests.clear()
+        self.addCleanup(slow_requests.clear)
+
+    def test_server_timing_for_admins_only(self):
+        response = self.client.get("/api/suppliers/", headers=self.admin_auth)
+        self.assertEqual(response.status_code, 200)
+        timing = response["Server-Timing"]
+        for metric in ("total;dur=", "db;dur=", "serialize;dur=", "cache;desc="):
+            self.assertIn(metric, timing)
+
+        response = self.client.get("/api/suppliers/", headers=self.compta_auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(PERF_SLOW_REQUEST_MS=0)
+    def test_slow_requests_endpoint(self):
+        with self.assertLogs("apps.perf", "INFO") as logs:
+            self.client.get("/api/suppliers/", headers=self.compta_auth)
+        self.assertIn("route=suppliers:supplier-list", logs.output[0])
+
+        response = self.client.get("/api/perf/slow-requests/", headers=self.admin_auth)
+        self.assertEqual(response.status_code, 200)
+        entry = response.json()["requests"][0]
+        self.assertEqual(entry["route"], "suppliers:supplier-list")
+        self.assertGreater(entry["queries"], 0)
+
+        response = self.client.get("/api/perf/slow-requests/", headers=self.compta_auth)
+        self.assertEqual(response.status_code, 403)
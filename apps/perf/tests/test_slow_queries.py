@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.models import User
+from apps.perf import slow_queries
+from apps.perf.models import SlowQuery
+
+
+class TestFingerprint(TestCase):
+    def test_literals_parameters_and_lists_are_normalized(self):
+        first = slow_queries.fingerprint('SELECT *  FROM "t" WHERE a = %s AND b IN (%s, %s) AND c = \'x\' LIMIT 21')
+        second = slow_queries.fingerprint('SELECT * FROM "t" WHERE a = %s AND b IN (%s) AND c = \'y\' LIMIT 5')
+        self.assertEqual(first, second)
+        self.assertEqual(first[1], 'SELECT * FROM "t" WHERE a = ? AND b IN (...) AND c = ? LIMIT ?')
+        self.assertNotEqual(first[0], slow_queries.fingerprint('SELECT * FROM "u" WHERE a = %s')[0])
+
+
+@override_settings(PERF_SLOW_QUERY_MS=0, PERF_SLOW_QUERY_FLUSH_INTERVAL=0, PERF_EXPLAIN_SAMPLE_RATE=1.0)
+class TestSlowQueryCapture(TestCase):
+    def setUp(self):
+        slow_queries.flush()
+        slow_queries._Explained.at.clear()
+
+    def test_captured_with_route_and_plan(self):
+        admin = User.objects.create_user(username="admin", password="pass", role=User.Role.ADMIN)
+        token = Token.objects.create(user=admin).key
+        slow_queries.flush()
+        SlowQuery.objects.all().delete()
+
+        self.client.get("/api/suppliers/", {"search": "pharma"}, headers={"authorization": f"Token {token}"})
+        self.assertGreater(slow_queries.flush(), 0)
+
+        captured = SlowQuery.objects.filter(route="suppliers:supplier-list", sql__contains="suppliers")
+        self.assertTrue(captured.exists())
+        self.assertIn("%pharma%", captured.filter(params__contains="pharma").first().params)
+        self.assertTrue(captured.filter(plan__isnull=False).exists())
+        # Les écritures du flush ne sont pas elles-mêmes capturées
+        self.assertFalse(SlowQuery.objects.filter(sql__startswith='INSERT INTO "perf_slow_queries"').exists())
+
+    def test_report_command(self):
+        User.objects.filter(username="nobody").exists()
+        User.objects.filter(username="other").exists()
+        out = StringIO()
+        call_command("slow_queries", "--plans", stdout=out)
+        output = out.getvalue()
+        self.assertIn("2 appel(s)", output)
+        self.assertIn("(hors requête)", output)
+        self.assertIn("plan :", output)
@@ -0,0 +1,65 @@
+import json
+import os
+
+from drf_spectacular.utils import OpenApiTypes, extend_schema
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, throttle_classes
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+
+from apps.accounts.permissions import IsAdminUser
+
+from . import metrics
+from .permissions import FromMetricsNetwork
+from .profiling import slow_request_ms, slow_requests
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Les erreurs (401, 403) restent lisibles
+        text = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+        return text.encode(self.charset)
+
+
+@extend_schema(
+    summary="Requêtes lentes",
+    description=(
+        "Requêtes plus lentes que PERF_SLOW_REQUEST_MS gardées par le worker qui répond "
+        "(tampon circulaire), de la plus lente à la plus rapide"
+    ),
+    tags=["Performances"]
+)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def slow_request_list(request):
+    entries = slow_requests.slowest()
+    return Response({
+        'pid': os.getpid(),
+        'threshold_ms': slow_request_ms(),
+        'count': len(entries),
+        'requests': entries,
+    })
+
+
+@extend_schema(
+    summary="Métriques Prometheus",
+    description=(
+        "Métriques de tous les workers au format d'exposition Prometheus : latence et "
+        "requêtes SQL par route, refus des throttles, caches d'authentification, pool "
+        "de connexions, mémoire des workers. Réservé aux administrateurs depuis "
+        "PERF_METRICS_ALLOWED_NETWORKS"
+    ),
+    responses={200: OpenApiTypes.STR},
+    tags=["Performances"]
+)
+@api_view(['GET'])
+@renderer_classes([PrometheusRenderer])
+@permission_classes([FromMetricsNetwork, IsAdminUser])
+@throttle_classes([])
+def prometheus_metrics(request):
+    return Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,309 @@
+"""
+Backends de limitation de débit (GCRA, opérations atomiques)
+
+Chaque limite ``num_requests / duration`` devient un intervalle d'émission
+``period = duration / num_requests``. L'état d'une clé est un seul nombre,
+le TAT (theoretical arrival time) ; une requête à l'instant ``now`` est
+acceptée si ``max(tat, now) + period - duration <= now``, et le TAT avance
+alors de ``period``. La fenêtre est glissante, sans liste d'horodatages.
+
+``hit_many`` évalue toutes les limites d'une requête en un aller-retour.
+Elle retourne, pour chaque clé, le délai d'attente en secondes (``0`` si la
+requête est acceptée). Backends disponibles :
+
+- ``DatabaseBackend`` : table ``ratelimit_buckets``, un seul
+  ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING`` (PostgreSQL, SQLite) ;
+- ``FileBackend`` : fichiers JSON répartis en shards sous verrou ``flock``
+  (plusieurs workers d'une même machine) ;
+- ``RedisBackend`` : script Lua sur un serveur au protocole Redis (Redis,
+  Valkey, KeyDB...) via ``redis-py``, ou tout client compatible fourni par
+  ``RATELIMIT_REDIS_CLIENT`` (un substitut local par exemple) ;
+- ``MemoryBackend`` : propre au processus, pour les tests et le développement.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from .models import Bucket
+
+DEFAULT_BACKEND = 'apps.ratelimit.backends.DatabaseBackend'
+FILE_SHARDS = 64
+
+
+class RateLimitBackendError(Exception):
+    """Backend indisponible (les throttles laissent alors passer la requête)"""
+
+
+def gcra(tat, now, period, duration):
+    """Retourne ``(nouveau tat, attente)`` ; ``attente > 0`` si la requête est refusée"""
+    tat = now if tat is None or tat < now else tat
+    new_tat = tat + period
+    allow_at = new_tat - duration
+    if allow_at > now:
+        return tat, allow_at - now
+    return new_tat, 0.0
+
+
+class BaseBackend:
+    def hit_many(self, limits, now=None):
+        """
+        ``limits`` : ``{clé: (period, duration)}`` ; retourne ``{clé: attente}``
+        """
+        raise NotImplementedError
+
+    def prune(self, now=None):
+        """Supprime les états expirés ; retourne le nombre d'entrées supprimées"""
+        return 0
+
+
+class MemoryBackend(BaseBackend):
+    def __init__(self):
+        self._tats = {}
+        self._lock = threading.Lock()
+
+    def hit_many(self, limits, now=None):
+        now = time.time() if now is None else now
+        waits = {}
+        with self._lock:
+            for key, (period, duration) in limits.items():
+                self._tats[key], waits[key] = gcra(self._tats.get(key), now, period, duration)
+        return waits
+
+    def prune(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [key for key, tat in self._tats.items() if tat < now]
+            for key in expired:
+                del self._tats[key]
+        return len(expired)
+
+
+class DatabaseBackend(BaseBackend):
+    """
+    Un upsert pour toutes les clés : la condition GCRA est évaluée par la
+    base sur la ligne verrouillée, sans lecture préalable.
+    """
+
+    def __init__(self, alias=None):
+        self.alias = alias or getattr(settings, 'RATELIMIT_DB_ALIAS', 'default')
+
+    def _sql(self, connection, count):
+        qn = connection.ops.quote_name
+        table = qn(Bucket._meta.db_table)
+        key, tat, allowed = qn('key'), qn('tat'), qn('allowed')
+        greatest = 'GREATEST' if connection.vendor == 'postgresql' else 'MAX'
+
+        values = ', '.join(['(%s, CAST(%s AS DOUBLE PRECISION), CAST(%s AS DOUBLE PRECISION))'] * count)
+        duration = f'(SELECT duration FROM input WHERE input.{key} = excluded.{key})'
+        # excluded.tat = now + period
+        new_tat = f'{greatest}({table}.{tat}, %(now)s) + excluded.{tat} - %(now)s'
+        accepted = f'{new_tat} - {duration} <= %(now)s'
+        return (
+            f'WITH input ({key}, period, duration) AS (VALUES {values}) '
+            f'INSERT INTO {table} ({key}, {tat}, {allowed}) '
+            f'SELECT {key}, %(now)s + period, TRUE FROM input WHERE TRUE '
+            f'ON CONFLICT ({key}) DO UPDATE SET '
+            f'{allowed} = ({accepted}), '
+            f'{tat} = CASE WHEN {accepted} THEN {new_tat} ELSE {table}.{tat} END '
+            f'RETURNING {key}, {tat}, {allowed}'
+        )
+
+    def hit_many(self, limits, now=None):
+        if not limits:
+            return {}
+        now = time.time() if now is None else now
+        connection = connections[self.alias]
+
+        # Ordre stable des clés : pas d'interblocage entre upserts concurrents
+        keys = sorted(limits)
+        params = []
+        for key in keys:
+            period, duration = limits[key]
+            params.extend([key, period, duration])
+        # %(now)s apparaît plusieurs fois : substitution avant le passage au driver
+        sql = self._sql(connection, len(keys)).replace('%(now)s', repr(float(now)))
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+        except Exception as exc:
+            raise RateLimitBackendError(str(exc)) from exc
+
+        waits = {}
+        for key, tat, allowed in rows:
+            period, duration = limits[key]
+            waits[key] = 0.0 if allowed else max(tat, now) + period - duration - now
+        return waits
+
+    def prune(self, now=None):
+        now = time.time() if now is None else now
+        return Bucket.objects.using(self.alias).filter(tat__lt=now).delete()[0]
+
+
+class FileBackend(BaseBackend):
+    """
+    États répartis dans ``FILE_SHARDS`` fichiers JSON sous ``RATELIMIT_FILE_DIR``.
+
+    Chaque shard concerné est verrouillé (``flock``), lu, mis à jour et
+    réécrit ; les états expirés sont retirés au passage.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = str(directory or getattr(
+            settings, 'RATELIMIT_FILE_DIR', os.path.join(settings.BASE_DIR, 'var', 'ratelimit')
+        ))
+
+    def _shard(self, key):
+        return int(hashlib.blake2b(key.encode(), digest_size=2).hexdigest(), 16) % FILE_SHARDS
+
+    def _update(self, shard, apply):
+        import fcntl
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'shard-{shard:02x}.json')
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            with os.fdopen(os.dup(fd), 'r+', encoding='utf-8') as handle:
+                raw = handle.read()
+                try:
+                    tats = json.loads(raw) if raw else {}
+                except ValueError:
+                    tats = {}
+                result = apply(tats)
+                handle.seek(0)
+                handle.truncate()
+                json.dump(tats, handle, separators=(',', ':'))
+            return result
+        finally:
+            os.close(fd)
+
+    def hit_many(self, limits, now=None):
+        now = time.time() if now is None else now
+        by_shard = {}
+        for key in limits:
+            by_shard.setdefault(self._shard(key), []).append(key)
+
+        waits = {}
+
+        def apply_to(keys):
+            def apply(tats):
+                for key in [key for key, tat in tats.items() if tat < now]:
+                    del tats[key]
+                for key in keys:
+                    period, duration = limits[key]
+                    tats[key], waits[key] = gcra(tats.get(key), now, period, duration)
+            return apply
+
+        try:
+            for shard in sorted(by_shard):
+                self._update(shard, apply_to(by_shard[shard]))
+        except OSError as exc:
+            raise RateLimitBackendError(str(exc)) from exc
+        return waits
+
+    def prune(self, now=None):
+        now = time.time() if now is None else now
+        removed = 0
+
+        def apply(tats):
+            expired = [key for key, tat in tats.items() if tat < now]
+            for key in expired:
+                del tats[key]
+            return len(expired)
+
+        for shard in range(FILE_SHARDS):
+            if os.path.exists(os.path.join(self.directory, f'shard-{shard:02x}.json')):
+                removed += self._update(shard, apply)
+        return removed
+
+
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local waits = {}
+for i, key in ipairs(KEYS) do
+    local period = tonumber(ARGV[2 * i])
+    local duration = tonumber(ARGV[2 * i + 1])
+    local tat = tonumber(redis.call('GET', key)) or now
+    if tat < now then tat = now end
+    local new_tat = tat + period
+    local allow_at = new_tat - duration
+    if allow_at > now then
+        waits[i] = tostring(allow_at - now)
+    else
+        redis.call('SET', key, tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+        waits[i] = '0'
+    end
+end
+return waits
+"""
+
+
+class RedisBackend(BaseBackend):
+    """
+    Script Lua exécuté atomiquement par le serveur (EVALSHA, un aller-retour).
+
+    Le client est créé par ``RATELIMIT_REDIS_CLIENT`` (chemin d'une fabrique
+    sans argument) ou, à défaut, par ``redis.Redis.from_url(RATELIMIT_REDIS_URL)``.
+    Les clés expirent d'elles-mêmes (``PX``) : pas de purge nécessaire.
+    """
+    key_prefix = 'ratelimit:'
+
+    def __init__(self, client=None):
+        if client is None:
+            factory = getattr(settings, 'RATELIMIT_REDIS_CLIENT', None)
+            if factory:
+                client = import_string(factory)()
+            else:
+                try:
+                    import redis
+                except ImportError:
+                    raise RateLimitBackendError("Le backend Redis nécessite le paquet redis")
+                client = redis.Redis.from_url(
+                    getattr(settings, 'RATELIMIT_REDIS_URL', 'redis://localhost:6379/0')
+                )
+        self.client = client
+        self.script = client.register_script(GCRA_SCRIPT)
+
+    def hit_many(self, limits, now=None):
+        if not limits:
+            return {}
+        now = time.time() if now is None else now
+        keys = list(limits)
+        args = [repr(float(now))]
+        for key in keys:
+            period, duration = limits[key]
+            args.extend([repr(float(period)), repr(float(duration))])
+
+        try:
+            waits = self.script(keys=[self.key_prefix + key for key in keys], args=args)
+        except Exception as exc:
+            raise RateLimitBackendError(str(exc)) from exc
+        return {key: float(wait) for key, wait in zip(keys, waits)}
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Backend configuré par ``RATELIMIT_BACKEND`` (instance partagée du processus)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(getattr(settings, 'RATELIMIT_BACKEND', DEFAULT_BACKEND))()
+    return _backend
+
+
+def reset_backend():
+    global _backend
+    with _backend_lock:
+        _backend = None
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.ratelimit.backends import get_backend
+
+
+class Command(BaseCommand):
+    help = "Supprime les compteurs de débit expirés du backend configuré (RATELIMIT_BACKEND)"
+
+    def handle(self, *args, **options):
+        removed = get_backend().prune()
+        self.stdout.write(self.style.SUCCESS(f"{removed} compteur(s) expiré(s) supprimé(s)"))
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.6 on 2026-10-19 02:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Bucket",
+            fields=[
+                (
+                    "key",
+                    models.CharField(
+                        max_length=255,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Clé",
+                    ),
+                ),
+                ("tat", models.FloatField(verbose_name="Instant théorique d'arrivée")),
+                (
+                    "allowed",
+                    models.BooleanField(
+                        default=True, verbose_name="Dernière requête acceptée"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Compteur de débit",
+                "verbose_name_plural": "Compteurs de débit",
+                "db_table": "ratelimit_buckets",
+                "indexes": [
+                    models.Index(fields=["tat"], name="ratelimit_b_tat_176bc2_idx")
+                ],
+            },
+        ),
+    ]
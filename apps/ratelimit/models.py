@@ -0,0 +1,37 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class Bucket(models.Model):
+    """
+    État GCRA d'une clé de limitation (backend base de données)
+
+    ``tat`` (theoretical arrival time, secondes epoch) est le seul état
+    nécessaire ; une ligne dont le ``tat`` est passé équivaut à une clé neuve.
+    """
+    key = models.CharField(
+        max_length=255,
+        primary_key=True,
+        verbose_name=_('Clé')
+    )
+
+    tat = models.FloatField(
+        verbose_name=_('Instant théorique d\'arrivée')
+    )
+
+    # Résultat du dernier passage, renvoyé par l'upsert (RETURNING)
+    allowed = models.BooleanField(
+        default=True,
+        verbose_name=_('Dernière requête acceptée')
+    )
+
+    class Meta:
+        db_table = 'ratelimit_buckets'
+        verbose_name = _('Compteur de débit')
+        verbose_name_plural = _('Compteurs de débit')
+        indexes = [
+            models.Index(fields=['tat']),
+        ]
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,147 @@
+import importlib.util
+import tempfile
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from apps.ratelimit import backends
+from apps.ratelimit.backends import DatabaseBackend, FileBackend, MemoryBackend, RateLimitBackendError, RedisBackend
+from apps.ratelimit.throttles import GCRARateThrottle
+
+# Serveur au protocole Redis en mémoire ; scripts Lua exécutés par lupa
+HAS_FAKEREDIS = bool(importlib.util.find_spec("fakeredis") and importlib.util.find_spec("lupa"))
+if HAS_FAKEREDIS:
+    import fakeredis
+
+_redis_server = None
+
+
+def fake_redis_client():
+    """Fabrique pour ``RATELIMIT_REDIS_CLIENT``"""
+    return fakeredis.FakeRedis(server=_redis_server)
+
+
+class BurstThrottle(GCRARateThrottle):
+    rate = '3/minute'
+    scope = 'burst'
+
+    def get_cache_key(self, request, view):
+        return f"throttle_burst_{self.get_ident(request)}"
+
+
+class SustainedThrottle(GCRARateThrottle):
+    rate = '100/hour'
+    scope = 'sustained'
+
+    def get_cache_key(self, request, view):
+        return f"throttle_sustained_{self.get_ident(request)}"
+
+
+class PingView(APIView):
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = [BurstThrottle, SustainedThrottle]
+
+    def get(self, request):
+        return Response({'ok': True})
+
+
+class BackendContract:
+    """Même scénario GCRA pour chaque backend"""
+
+    def make_backend(self):
+        raise NotImplementedError
+
+    def test_burst_then_refill(self):
+        backend = self.make_backend()
+        limits = {'k': (20.0, 60.0)}  # 3 requêtes par minute
+
+        self.assertEqual([backend.hit_many(limits, now=1000.0)['k'] for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(backend.hit_many(limits, now=1000.0)['k'], 20.0)
+        self.assertAlmostEqual(backend.hit_many(limits, now=1015.0)['k'], 5.0)
+        self.assertEqual(backend.hit_many(limits, now=1020.0)['k'], 0.0)
+
+    def test_keys_are_independent(self):
+        backend = self.make_backend()
+        backend.hit_many({'a': (60.0, 60.0)}, now=1000.0)
+        waits = backend.hit_many({'a': (60.0, 60.0), 'b': (60.0, 60.0)}, now=1000.0)
+        self.assertGreater(waits['a'], 0)
+        self.assertEqual(waits['b'], 0.0)
+
+    def test_prune_removes_expired_states(self):
+        backend = self.make_backend()
+        backend.hit_many({'a': (1.0, 60.0)}, now=1000.0)
+        self.assertEqual(backend.prune(now=2000.0), 1)
+
+
+class TestMemoryBackend(BackendContract, TestCase):
+    def make_backend(self):
+        return MemoryBackend()
+
+
+class TestDatabaseBackend(BackendContract, TestCase):
+    def make_backend(self):
+        return DatabaseBackend()
+
+
+class TestFileBackend(BackendContract, TestCase):
+    def make_backend(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return FileBackend(directory.name)
+
+
+@skipUnless(HAS_FAKEREDIS, "fakeredis[lua] non installé")
+@override_settings(RATELIMIT_REDIS_CLIENT=f"{__name__}.fake_redis_client")
+class TestRedisBackend(BackendContract, TestCase):
+    def setUp(self):
+        global _redis_server
+        _redis_server = self.server = fakeredis.FakeServer()
+
+    def make_backend(self):
+        return RedisBackend()
+
+    def test_prune_removes_expired_states(self):
+        # Pas de purge : le script pose l'expiration (PX) de chaque clé acceptée
+        backend = self.make_backend()
+        backend.hit_many({'a': (1.0, 60.0)}, now=1000.0)
+        self.assertEqual(backend.prune(now=2000.0), 0)
+        self.assertTrue(0 < backend.client.pttl('ratelimit:a') <= 1000)
+
+    def test_rejection_does_not_move_state(self):
+        backend = self.make_backend()
+        backend.hit_many({'a': (60.0, 60.0)}, now=1000.0)
+        backend.hit_many({'a': (60.0, 60.0)}, now=1000.0)
+        self.assertEqual(float(backend.client.get('ratelimit:a')), 1060.0)
+
+    def test_server_unavailable_raises_backend_error(self):
+        backend = self.make_backend()
+        self.server.connected = False
+        with self.assertRaises(RateLimitBackendError):
+            backend.hit_many({'a': (1.0, 60.0)})
+
+
+class TestThrottles(TestCase):
+    def setUp(self):
+        backends._backend = DatabaseBackend()
+        self.addCleanup(backends.reset_backend)
+        self.view = PingView.as_view()
+        self.factory = APIRequestFactory()
+
+    def test_all_throttles_in_one_round_trip(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.view(self.factory.get('/ping/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+
+    def test_rejection_sets_retry_after(self):
+        for _ in range(3):
+            self.assertEqual(self.view(self.factory.get('/ping/')).status_code, 200)
+        response = self.view(self.factory.get('/ping/'))
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
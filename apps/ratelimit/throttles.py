@@ -0,0 +1,122 @@
+"""
+Throttles DRF adossés aux backends GCRA atomiques
+
+Remplacent ``SimpleRateThrottle`` (liste d'horodatages relue et réécrite
+dans le cache, non atomique, propre au processus avec ``LocMemCache``).
+Les taux, portées et clés restent ceux de DRF (``DEFAULT_THROTTLE_RATES``,
+``throttle_%(scope)s_%(ident)s``).
+
+Le premier throttle évalué pour une requête calcule les clés de tous les
+throttles de la vue et les soumet ensemble au backend (un aller-retour) ;
+les suivants lisent leur résultat sur la requête.
+"""
+import logging
+
+from rest_framework import throttling
+
+from apps.perf.metrics import THROTTLED
+
+from .backends import RateLimitBackendError, get_backend
+
+logger = logging.getLogger(__name__)
+
+
+def evaluate(request, view):
+    """Attente par clé pour tous les throttles GCRA de la vue (mise en cache sur la requête)"""
+    waits = getattr(request, '_ratelimit_waits', None)
+    if waits is not None:
+        return waits
+
+    limits = {}
+    for throttle in view.get_throttles():
+        if isinstance(throttle, GCRARateThrottle):
+            limit = throttle.limit(request, view)
+            if limit is not None:
+                limits.setdefault(*limit)
+
+    try:
+        waits = get_backend().hit_many(limits) if limits else {}
+    except RateLimitBackendError as exc:
+        # Backend indisponible : on laisse passer plutôt que de bloquer l'API
+        logger.warning(f"Rate limit backend unavailable: {exc}")
+        waits = {key: 0.0 for key in limits}
+
+    request._ratelimit_waits = waits
+    return waits
+
+
+class GCRARateThrottle(throttling.SimpleRateThrottle):
+    """
+    ``SimpleRateThrottle`` dont le stockage et l'algorithme sont remplacés
+    (mêmes ``rate``, ``scope``, ``get_cache_key``, ``throttle_failure``)
+    """
+    wait_seconds = None
+
+    def limit(self, request, view):
+        """``(clé, (period, duration))``, ou ``None`` si la requête n'est pas limitée"""
+        if self.rate is None:
+            return None
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return None
+        return key, (self.duration / self.num_requests, self.duration)
+
+    def allow_request(self, request, view):
+        limit = self.limit(request, view)
+        if limit is None:
+            return True
+
+        self.key = limit[0]
+        waits = evaluate(request, view)
+        if self.key not in waits:
+            # Throttle absent de view.get_throttles() : évalué seul
+            try:
+                waits = get_backend().hit_many(dict([limit]))
+            except RateLimitBackendError as exc:
+                logger.warning(f"Rate limit backend unavailable: {exc}")
+                return True
+
+        self.wait_seconds = waits[self.key]
+        if self.wait_seconds > 0:
+            THROTTLED.inc(self.scope or 'unscoped')
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonRateThrottle(GCRARateThrottle):
+    scope = 'anon'
+
+    get_cache_key = throttling.AnonRateThrottle.get_cache_key
+
+
+class UserRateThrottle(GCRARateThrottle):
+    scope = 'user'
+
+    get_cache_key = throttling.UserRateThrottle.get_cache_key
+
+
+class ScopedRateThrottle(GCRARateThrottle):
+    """
+    Portée lue sur la vue (``throttle_scope``), comme ``ScopedRateThrottle`` de DRF
+    """
+    scope_attr = 'throttle_scope'
+
+    def __init__(self):
+        # Taux connu seulement une fois la vue disponible
+        pass
+
+    def limit(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return None
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().limit(request, view)
+
+    get_cache_key = throttling.ScopedRateThrottle.get_cache_key
@@ -0,0 +1,45 @@
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.models import User
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.suppliers.models import Supplier
+
+
+class TestAsyncReports(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user(username="admin", password="pass", role=User.Role.ADMIN)
+        cls.token = Token.objects.create(user=admin).key
+        supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        Invoice.objects.create(supplier=supplier, invoice_number="F1", net_to_pay=100, invoice_date=date(2024, 3, 5))
+        Invoice.objects.create(supplier=supplier, invoice_number="F2", net_to_pay=50, invoice_date=date(2024, 4, 5))
+        CreditNote.objects.create(
+            supplier=supplier, credit_note_number="A1", amount=30, credit_note_date=date(2024, 3, 7)
+        )
+
+    async def test_dashboard_on_async_client(self):
+        response = await self.async_client.get(
+            "/api/reports/dashboard/", {"month": 3, "year": 2024}, headers={"authorization": f"Token {self.token}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        overview = response.json()["overview"]
+        self.assertEqual(overview["current_month"], {
+            "total_invoices": 100.0, "total_credit_notes": 30.0, "net_amount": 70.0,
+            "invoice_count": 1, "credit_note_count": 1,
+        })
+        self.assertEqual(overview["all_time"]["invoice_count"], 2)
+
+    async def test_permissions_still_apply(self):
+        response = await self.async_client.get("/api/reports/monthly/", {"month": 3, "year": 2024})
+        self.assertEqual(response.status_code, 401)
+
+    def test_sync_client_and_health(self):
+        self.assertEqual(self.client.get("/api/health/").status_code, 200)
+        response = self.client.get(
+            "/api/reports/monthly/", {"month": 3, "year": 2024}, HTTP_AUTHORIZATION=f"Token {self.token}"
+        )
+        self.assertEqual(response.json()["totals"]["netToPay"], 70.0)
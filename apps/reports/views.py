@@ -1,7 +1,9 @@
-from rest_framework.decorators import api_view, permission_classes
+from asgiref.sync import sync_to_async
+from rest_framework.decorators import permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, F, Value, Count
+from django.db import connection
+from django.db.models import Sum, F, Value, Count, Q
 from django.db.models.functions import Cast
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
@@ -16,6 +18,8 @@ from apps.invoices.models import Invoice
 from apps.credit_notes.models import CreditNote
 from apps.suppliers.models import Supplier
 from apps.accounts.permissions import IsFinanceUser
+from apps.api.async_views import async_api_view
+from apps.archive.rollups import CREDIT_NOTE, aarchived_totals
 
 
 @extend_schema(
@@ -23,9 +27,9 @@ from apps.accounts.permissions import IsFinanceUser
     description="Statistiques générales pour le dashboard",
     tags=["Reports"]
 )
-@api_view(['GET'])
+@async_api_view(['GET'])
 @permission_classes([IsFinanceUser])
-def dashboard(request):
+async def dashboard(request):
     """
     Endpoint pour le dashboard avec statistiques générales
     """
@@ -60,10 +64,10 @@ def dashboard(request):
         logger.info(f"Using month: {month}, year: {year}")
         
         # Statistiques générales (toujours sur toute la base, non filtrées)
-        total_suppliers = Supplier.objects.filter(is_active=True).count()
+        total_suppliers = await Supplier.active.acount()
         
         # Base querysets pour les KPIs filtrés
-        filtered_invoices = Invoice.objects.filter(is_active=True)
+        filtered_invoices = Invoice.active.all()
         filtered_credit_notes = CreditNote.objects.all()
         
         # Apply supplier filter if provided (sauf pour total_suppliers)
@@ -72,97 +76,82 @@ def dashboard(request):
             filtered_credit_notes = filtered_credit_notes.filter(supplier_id=supplier_id)
             logger.info(f"Filtered by supplier_id {supplier_id}")
         
-        # Statistiques de toute la base (avec filtres)
-        logger.info("Calculating general stats...")
-        total_invoices_all = filtered_invoices.aggregate(
-            total=Sum('net_to_pay')
-        )['total'] or Decimal('0.00')
+        # Toute la base, année et mois demandés : une requête par table
+        in_year = Q(year=year)
+        in_month = Q(month=month, year=year)
+        invoice_stats = await filtered_invoices.aaggregate(
+            total_all=Sum('net_to_pay'),
+            total_year=Sum('net_to_pay', filter=in_year),
+            total_current=Sum('net_to_pay', filter=in_month),
+            count_all=Count('id'),
+            count_year=Count('id', filter=in_year),
+            count_current=Count('id', filter=in_month),
+        )
+        credit_note_stats = await filtered_credit_notes.aaggregate(
+            total_all=Sum('amount'),
+            total_year=Sum('amount', filter=in_year),
+            total_current=Sum('amount', filter=in_month),
+            count_all=Count('id'),
+            count_year=Count('id', filter=in_year),
+            count_current=Count('id', filter=in_month),
+        )
         
-        total_credit_notes_all = filtered_credit_notes.aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0.00')
+        # Les avoirs inactifs comptent : on ajoute les cumuls des exercices archivés
+        archived_credit_notes_all = await aarchived_totals(CREDIT_NOTE, supplier_id=supplier_id)
+        archived_credit_notes_year = await aarchived_totals(CREDIT_NOTE, supplier_id=supplier_id, year=year)
+        archived_credit_notes_current = await aarchived_totals(
+            CREDIT_NOTE, supplier_id=supplier_id, year=year, month=month
+        )
         
+        total_invoices_all = invoice_stats['total_all'] or Decimal('0.00')
+        total_credit_notes_all = (credit_note_stats['total_all'] or Decimal('0.00')) + archived_credit_notes_all[0]
         net_all = total_invoices_all - total_credit_notes_all
         
-        logger.info(f"General stats - filtered_invoices count: {filtered_invoices.count()}")
+        logger.info(f"General stats - filtered_invoices count: {invoice_stats['count_all']}")
         logger.info(f"General stats - total_invoices_all: {total_invoices_all}")
         logger.info(f"General stats - total_credit_notes_all: {total_credit_notes_all}")
         logger.info(f"General stats - net_all: {net_all}")
         
-        # Statistiques de l'année actuelle (avec filtres)
-        logger.info("Calculating yearly stats...")
-        year_invoices = filtered_invoices.filter(year=year)
-        year_credit_notes = filtered_credit_notes.filter(year=year)
-        
-        total_invoices_year = year_invoices.aggregate(
-            total=Sum('net_to_pay')
-        )['total'] or Decimal('0.00')
-        
-        total_credit_notes_year = year_credit_notes.aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0.00')
-        
+        total_invoices_year = invoice_stats['total_year'] or Decimal('0.00')
+        total_credit_notes_year = (credit_note_stats['total_year'] or Decimal('0.00')) + archived_credit_notes_year[0]
         net_year = total_invoices_year - total_credit_notes_year
         
-        logger.info(f"Yearly stats - year_invoices count: {year_invoices.count()}")
+        logger.info(f"Yearly stats - year_invoices count: {invoice_stats['count_year']}")
         logger.info(f"Yearly stats - total_invoices_year: {total_invoices_year}")
         logger.info(f"Yearly stats - total_credit_notes_year: {total_credit_notes_year}")
         logger.info(f"Yearly stats - net_year: {net_year}")
         
-        # Statistiques du mois demandé (avec filtres)
-        logger.info("Calculating current month stats...")
-        current_month_invoices = filtered_invoices.filter(
-            month=month,
-            year=year
+        total_invoices_current = invoice_stats['total_current'] or Decimal('0.00')
+        total_credit_notes_current = (
+            (credit_note_stats['total_current'] or Decimal('0.00')) + archived_credit_notes_current[0]
         )
-        
-        current_month_credit_notes = filtered_credit_notes.filter(
-            month=month,
-            year=year
-        )
-        
-        total_invoices_current = current_month_invoices.aggregate(
-            total=Sum('net_to_pay')
-        )['total'] or Decimal('0.00')
-        
-        total_credit_notes_current = current_month_credit_notes.aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0.00')
-        
         net_current_month = total_invoices_current - total_credit_notes_current
         
-        logger.info(f"Current month stats - current_month_invoices count: {current_month_invoices.count()}")
+        logger.info(f"Current month stats - current_month_invoices count: {invoice_stats['count_current']}")
         logger.info(f"Current month stats - total_invoices_current: {total_invoices_current}")
-        logger.info(f"Current month stats - current_month_credit_notes count: {current_month_credit_notes.count()}")
+        logger.info(f"Current month stats - current_month_credit_notes count: {credit_note_stats['count_current']}")
         logger.info(f"Current month stats - total_credit_notes_current: {total_credit_notes_current}")
         logger.info(f"Current month stats - net_current_month: {net_current_month}")
         
         # Top 5 fournisseurs (avec filtres)
         logger.info("Calculating top suppliers...")
-        top_suppliers = filtered_invoices.values(
-            'supplier__name',
-            'supplier__code'
-        ).annotate(
-            total_amount=Sum('net_to_pay')
-        ).order_by('-total_amount')[:5]
+        top_suppliers = [
+            row async for row in filtered_invoices.values(
+                'supplier__name',
+                'supplier__code'
+            ).annotate(
+                total_amount=Sum('net_to_pay')
+            ).order_by('-total_amount')[:5]
+        ]
         
         logger.info(f"Top suppliers count: {len(top_suppliers)}")
         
-        # Dernières factures (avec filtres)
+        # Dernières factures du mois demandé (avec filtres)
         logger.info("Calculating recent invoices...")
-        recent_invoices = filtered_invoices
-        logger.info(f"Base recent invoices queryset: {recent_invoices.count()} invoices")
-        
-        # Appliquer les mêmes filtres que pour les autres statistiques
-        if supplier_id:
-            recent_invoices = recent_invoices.filter(supplier_id=supplier_id)
-            logger.info(f"Filtered by supplier_id {supplier_id}: {recent_invoices.count()} invoices")
-            
-        if month and year:
-            recent_invoices = recent_invoices.filter(month=month, year=year)
-            logger.info(f"Filtered by month {month} year {year}: {recent_invoices.count()} invoices")
-        
-        recent_invoices = recent_invoices.select_related('supplier').order_by('-invoice_date', '-created_at')[:10]
+        recent_invoices = [
+            invoice async for invoice in filtered_invoices.filter(month=month, year=year)
+            .select_related('supplier').order_by('-invoice_date', '-created_at')[:10]
+        ]
         logger.info(f"Final recent invoices after limit: {len(recent_invoices)}")
         
         recent_invoices_data = []
@@ -218,22 +207,22 @@ def dashboard(request):
                     'total_invoices': float(total_invoices_current),
                     'total_credit_notes': float(total_credit_notes_current),
                     'net_amount': float(net_current_month),
-                    'invoice_count': current_month_invoices.count(),
-                    'credit_note_count': current_month_credit_notes.count()
+                    'invoice_count': invoice_stats['count_current'],
+                    'credit_note_count': credit_note_stats['count_current'] + archived_credit_notes_current[1]
                 },
                 'all_time': {
                     'total_invoices': float(total_invoices_all),
                     'total_credit_notes': float(total_credit_notes_all),
                     'net_amount': float(net_all),
-                    'invoice_count': filtered_invoices.count(),
-                    'credit_note_count': filtered_credit_notes.count()
+                    'invoice_count': invoice_stats['count_all'],
+                    'credit_note_count': credit_note_stats['count_all'] + archived_credit_notes_all[1]
                 },
                 'year_to_date': {
                     'total_invoices': float(total_invoices_year),
                     'total_credit_notes': float(total_credit_notes_year),
                     'net_amount': float(net_year),
-                    'invoice_count': year_invoices.count(),
-                    'credit_note_count': year_credit_notes.count()
+                    'invoice_count': invoice_stats['count_year'],
+                    'credit_note_count': credit_note_stats['count_year'] + archived_credit_notes_year[1]
                 }
             }
         }
@@ -262,9 +251,9 @@ def dashboard(request):
     ),
     tags=["Reports"]
 )
-@api_view(['GET'])
+@async_api_view(['GET'])
 @permission_classes([IsFinanceUser])
-def monthly_report(request):
+async def monthly_report(request):
     month = request.query_params.get('month')
     year = request.query_params.get('year')
 
@@ -279,26 +268,30 @@ def monthly_report(request):
     except ValueError:
         return Response({'error': _('Paramètres month et year invalides')}, status=400)
 
-    invoices_qs = Invoice.objects.filter(month=month_int, year=year_int, is_active=True)
-    credit_notes_qs = CreditNote.objects.filter(month=month_int, year=year_int, is_active=True)
+    invoices_qs = Invoice.active.filter(month=month_int, year=year_int)
+    credit_notes_qs = CreditNote.active.filter(month=month_int, year=year_int)
 
-    invoices_by_supplier = invoices_qs.values(
-        'supplier_id',
-        'supplier__name',
-        'supplier__code',
-    ).annotate(
-        invoice_count=Count('id'),
-        total_amount=Sum('net_to_pay'),
-    )
+    invoices_by_supplier = [
+        row async for row in invoices_qs.values(
+            'supplier_id',
+            'supplier__name',
+            'supplier__code',
+        ).annotate(
+            invoice_count=Count('id'),
+            total_amount=Sum('net_to_pay'),
+        )
+    ]
 
-    credit_notes_by_supplier = credit_notes_qs.values(
-        'supplier_id',
-        'supplier__name',
-        'supplier__code',
-    ).annotate(
-        credit_note_count=Count('id'),
-        total_credit_amount=Sum('amount'),
-    )
+    credit_notes_by_supplier = [
+        row async for row in credit_notes_qs.values(
+            'supplier_id',
+            'supplier__name',
+            'supplier__code',
+        ).annotate(
+            credit_note_count=Count('id'),
+            total_credit_amount=Sum('amount'),
+        )
+    ]
 
     invoices_map = {}
     for row in invoices_by_supplier:
@@ -345,8 +338,10 @@ def monthly_report(request):
 
     supplier_breakdown.sort(key=lambda x: (x.get('supplier', {}).get('name') or '').lower())
 
-    totals_invoices_amount = invoices_qs.aggregate(total=Sum('net_to_pay'))['total'] or Decimal('0.00')
-    totals_credit_notes_amount = credit_notes_qs.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    invoices_totals = await invoices_qs.aaggregate(total=Sum('net_to_pay'), count=Count('id'))
+    credit_notes_totals = await credit_notes_qs.aaggregate(total=Sum('amount'), count=Count('id'))
+    totals_invoices_amount = invoices_totals['total'] or Decimal('0.00')
+    totals_credit_notes_amount = credit_notes_totals['total'] or Decimal('0.00')
 
     payload = {
         'period': {
@@ -357,8 +352,8 @@ def monthly_report(request):
             'totalInvoicesAmount': float(totals_invoices_amount),
             'totalCreditNotesAmount': float(totals_credit_notes_amount),
             'netToPay': float(totals_invoices_amount - totals_credit_notes_amount),
-            'invoicesCount': invoices_qs.count(),
-            'creditNotesCount': credit_notes_qs.count(),
+            'invoicesCount': invoices_totals['count'],
+            'creditNotesCount': credit_notes_totals['count'],
         },
         'supplierBreakdown': supplier_breakdown,
         'count': len(supplier_breakdown),
@@ -372,9 +367,9 @@ def monthly_report(request):
     description="Calculer le net mensuel exact par fournisseur : (Σ factures) - (Σ avoirs)",
     tags=["Reports"]
 )
-@api_view(['GET'])
+@async_api_view(['GET'])
 @permission_classes([IsFinanceUser])
-def monthly_summary(request):
+async def monthly_summary(request):
     """
     Endpoint pour le résumé mensuel par fournisseur
     Calcule: Net = (Σ net_à_payer des factures) – (Σ montant des avoirs)
@@ -400,17 +395,15 @@ def monthly_summary(request):
         }, status=400)
     
     # Base queryset pour les factures
-    invoices_queryset = Invoice.objects.filter(
+    invoices_queryset = Invoice.active.filter(
         month=month,
-        year=year,
-        is_active=True
+        year=year
     )
     
     # Base queryset pour les avoirs
-    credit_notes_queryset = CreditNote.objects.filter(
+    credit_notes_queryset = CreditNote.active.filter(
         month=month,
-        year=year,
-        is_active=True
+        year=year
     )
     
     # Filtrer par fournisseur si spécifié
@@ -419,22 +412,28 @@ def monthly_summary(request):
         credit_notes_queryset = credit_notes_queryset.filter(supplier_id=supplier_id)
     
     # Agrégation des factures par fournisseur
-    invoices_summary = invoices_queryset.values(
-        'supplier_id',
-        'supplier__name',
-        'supplier__code'
-    ).annotate(
-        total_invoices=Sum('net_to_pay'),
-        invoice_count=Count('id')
-    ).order_by('supplier__name')
+    invoices_summary = [
+        row async for row in invoices_queryset.values(
+            'supplier_id',
+            'supplier__name',
+            'supplier__code'
+        ).annotate(
+            total_invoices=Sum('net_to_pay'),
+            invoice_count=Count('id')
+        ).order_by('supplier__name')
+    ]
     
     # Agrégation des avoirs par fournisseur
-    credit_notes_summary = credit_notes_queryset.values(
-        'supplier_id'
-    ).annotate(
-        total_credit_notes=Sum('amount'),
-        credit_note_count=Count('id')
-    )
+    credit_notes_summary = {
+        row['supplier_id']: row async for row in credit_notes_queryset.values(
+            'supplier_id',
+            'supplier__name',
+            'supplier__code'
+        ).annotate(
+            total_credit_notes=Sum('amount'),
+            credit_note_count=Count('id')
+        )
+    }
     
     # Fusionner les résultats
     result = []
@@ -442,8 +441,8 @@ def monthly_summary(request):
         supplier_id = invoice_data['supplier_id']
         
         # Trouver les avoirs correspondants
-        credit_data = next(
-            (cn for cn in credit_notes_summary if cn['supplier_id'] == supplier_id),
+        credit_data = credit_notes_summary.get(
+            supplier_id,
             {'total_credit_notes': Decimal('0.00'), 'credit_note_count': 0}
         )
         
@@ -465,15 +464,14 @@ def monthly_summary(request):
     
     # Ajouter les fournisseurs avec uniquement des avoirs
     supplier_ids_with_invoices = {item['supplier_id'] for item in result}
-    for credit_data in credit_notes_summary:
+    for credit_data in credit_notes_summary.values():
         if credit_data['supplier_id'] not in supplier_ids_with_invoices:
-            supplier = Supplier.objects.get(id=credit_data['supplier_id'])
             total_credit_notes = credit_data['total_credit_notes'] or Decimal('0.00')
             
             result.append({
                 'supplier_id': credit_data['supplier_id'],
-                'supplier_name': supplier.name,
-                'supplier_code': supplier.code,
+                'supplier_name': credit_data['supplier__name'],
+                'supplier_code': credit_data['supplier__code'],
                 'month': month,
                 'year': year,
                 'total_invoices': Decimal('0.00'),
@@ -508,19 +506,24 @@ def monthly_summary(request):
     })
 
 
+def _fetch_dicts(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
 @extend_schema(
     summary="Requête SQL agrégée exemple",
     description="Exemple de requête SQL optimisée pour les calculs financiers",
     tags=["Reports"]
 )
-@api_view(['GET'])
+@async_api_view(['GET'])
 @permission_classes([IsFinanceUser])
-def sql_example(request):
+async def sql_example(request):
     """
     Endpoint montrant la requête SQL générée pour les calculs
     """
-    from django.db import connection
-    
     month = request.query_params.get('month', '1')
     year = request.query_params.get('year', '2024')
     
@@ -569,15 +572,8 @@ def sql_example(request):
     ORDER BY supplier_name;
     """
     
-    with connection.cursor() as cursor:
-        cursor.execute(sql_query, [month, year, month, year, month, year])
-        columns = [col[0] for col in cursor.description]
-        results = cursor.fetchall()
-    
-    # Formatter les résultats
-    formatted_results = []
-    for row in results:
-        formatted_results.append(dict(zip(columns, row)))
+    # Pas de curseur asynchrone dans Django : la requête brute passe par un thread
+    formatted_results = await sync_to_async(_fetch_dicts)(sql_query, [month, year, month, year, month, year])
     
     return Response({
         'sql_query': sql_query,
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-19 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("suppliers", "0002_supplier_optional_fields"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(
+                fields=["updated_at"], name="suppliers_s_updated_1da40b_idx"
+            ),
+        ),
+    ]
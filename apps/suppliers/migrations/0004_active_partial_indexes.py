@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-19 02:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY : pas de verrou d'écriture sur la table
+    atomic = False
+
+    dependencies = [
+        ("suppliers", "0003_supplier_suppliers_s_updated_1da40b_idx"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="supplier",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["name"],
+                name="suppliers_active_name_idx",
+            ),
+        ),
+        RemoveIndexConcurrently(
+            model_name="supplier",
+            name="suppliers_s_is_acti_9c2146_idx",
+        ),
+    ]
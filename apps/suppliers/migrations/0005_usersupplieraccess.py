@@ -0,0 +1,76 @@
+# Generated by Django 5.0.6 on 2026-10-19 04:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("suppliers", "0004_active_partial_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserSupplierAccess",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "granted_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Accordé le"),
+                ),
+                (
+                    "granted_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="granted_access",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Accordé par",
+                    ),
+                ),
+                (
+                    "supplier",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_access",
+                        to="suppliers.supplier",
+                        verbose_name="Fournisseur",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="supplier_access",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Utilisateur",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Accès fournisseur",
+                "verbose_name_plural": "Accès fournisseurs",
+                "db_table": "suppliers_user_access",
+                "indexes": [
+                    models.Index(
+                        fields=["user"], name="suppliers_u_user_id_a85e47_idx"
+                    ),
+                    models.Index(
+                        fields=["supplier"], name="suppliers_u_supplie_a3a0f0_idx"
+                    ),
+                ],
+                "unique_together": {("user", "supplier")},
+            },
+        ),
+    ]
@@ -5,6 +5,7 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 from drf_spectacular.types import OpenApiTypes
+from apps.api.managers import ActiveManager, ActiveQuerySet
 
 
 class UserSupplierAccess(models.Model):
@@ -106,7 +107,7 @@ class Supplier(models.Model):
     def invoice_count(self):
         """Nombre de factures"""
         from apps.invoices.models import Invoice
-        return Invoice.objects.filter(supplier=self, is_active=True).count()
+        return Invoice.active.filter(supplier=self).count()
     
     @property
     def credit_note_count(self):
@@ -118,7 +119,7 @@ class Supplier(models.Model):
     def total_invoices_amount(self):
         """Montant total des factures"""
         from apps.invoices.models import Invoice
-        return Invoice.objects.filter(supplier=self, is_active=True).aggregate(
+        return Invoice.active.filter(supplier=self).aggregate(
             total=models.Sum('net_to_pay')
         )['total'] or 0
     
@@ -217,6 +218,9 @@ class Supplier(models.Model):
         auto_now=True,
         verbose_name=_('Mis à jour le')
     )
+
+    objects = ActiveQuerySet.as_manager()
+    active = ActiveManager()
     
     class Meta:
         db_table = 'suppliers_suppliers'
@@ -226,8 +230,14 @@ class Supplier(models.Model):
         indexes = [
             models.Index(fields=['name']),
             models.Index(fields=['code']),
-            models.Index(fields=['is_active']),
             models.Index(fields=['siret']),
+            models.Index(fields=['updated_at']),
+            # Liste des fournisseurs actifs (Supplier.active), triée par nom
+            models.Index(
+                fields=['name'],
+                name='suppliers_active_name_idx',
+                condition=models.Q(is_active=True),
+            ),
         ]
     
     def __str__(self):
@@ -247,13 +257,13 @@ class Supplier(models.Model):
     def get_invoice_count(self):
         """Retourne le nombre de factures pour ce fournisseur"""
         from apps.invoices.models import Invoice
-        return Invoice.objects.filter(supplier=self, is_active=True).count()
+        return Invoice.active.filter(supplier=self).count()
     
     @extend_schema_field(OpenApiTypes.INT)
     def get_credit_note_count(self):
         """Retourne le nombre d'avoirs pour ce fournisseur"""
         from apps.credit_notes.models import CreditNote
-        return CreditNote.objects.filter(supplier=self, is_active=True).count()
+        return CreditNote.active.filter(supplier=self).count()
     
     @extend_schema_field(OpenApiTypes.DECIMAL)
     def get_total_invoices_amount(self):
@@ -261,10 +271,7 @@ class Supplier(models.Model):
         from apps.invoices.models import Invoice
         from django.db.models import Sum
         
-        result = Invoice.objects.filter(
-            supplier=self, 
-            is_active=True
-        ).aggregate(total=Sum('net_to_pay'))
+        result = Invoice.active.filter(supplier=self).aggregate(total=Sum('net_to_pay'))
         
         return result['total'] or 0
     
@@ -274,9 +281,6 @@ class Supplier(models.Model):
         from apps.credit_notes.models import CreditNote
         from django.db.models import Sum
         
-        result = CreditNote.objects.filter(
-            supplier=self, 
-            is_active=True
-        ).aggregate(total=Sum('amount'))
+        result = CreditNote.active.filter(supplier=self).aggregate(total=Sum('amount'))
         
         return result['total'] or 0
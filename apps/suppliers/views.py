@@ -12,10 +12,11 @@ from .serializers import (
     SupplierCreateSerializer,
     SupplierUpdateSerializer
 )
+from apps.api.sparse_fields import SparseFieldsetMixin, SPARSE_FIELDS_PARAMETER
 from apps.accounts.permissions import IsFinanceUser, IsAdminUser
 
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet pour la gestion des fournisseurs
     """
@@ -46,7 +47,8 @@ class SupplierViewSet(viewsets.ModelViewSet):
     
     @extend_schema(
         summary="Lister les fournisseurs",
-        description="Lister tous les fournisseurs avec filtres et recherche"
+        description="Lister tous les fournisseurs avec filtres et recherche",
+        parameters=[SPARSE_FIELDS_PARAMETER]
     )
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
@@ -153,6 +155,6 @@ class SupplierViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsFinanceUser])
     def active(self, request):
         """Lister les fournisseurs actifs"""
-        queryset = self.queryset.filter(is_active=True)
+        queryset = Supplier.active.all()
         serializer = SupplierListSerializer(queryset, many=True)
         return Response(serializer.data)
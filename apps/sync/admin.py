@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Tombstone
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    list_display = ['model_label', 'object_id', 'deleted_at']
+    list_filter = ['model_label']
+    search_fields = ['object_id']
+    readonly_fields = ['model_label', 'object_id', 'deleted_at']
@@ -0,0 +1,143 @@
+"""
+Calcul des deltas pour la synchronisation incrémentale (/api/sync/)
+
+Le jeton ``since`` est un horodatage serveur en microseconds epoch. Chaque
+réponse renvoie le jeton suivant, pris *avant* la lecture : une ligne modifiée
+pendant la requête sera renvoyée à nouveau au prochain appel (livraison au
+moins une fois, les clients appliquent les changements par ``id``).
+
+Une marge ``SYNC_CLOCK_SKEW_SECONDS`` est retranchée du jeton reçu pour couvrir
+les transactions dont ``updated_at`` est antérieur à leur commit.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.api.fast_render import get_renderer
+from apps.credit_notes.models import CreditNote
+from apps.credit_notes.serializers import CreditNoteListSerializer
+from apps.invoices.models import Invoice
+from apps.invoices.serializers import InvoiceListSerializer
+from apps.suppliers.models import Supplier
+from apps.suppliers.serializers import SupplierListSerializer
+from .models import Tombstone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Champs synchronisés par entité (``None`` = tous les champs du serializer)
+SYNC_ENTITIES = (
+    ('suppliers', Supplier, SupplierListSerializer,
+     {'id', 'name', 'code', 'city', 'phone', 'email', 'is_active'}),
+    ('invoices', Invoice, InvoiceListSerializer, None),
+    ('credit_notes', CreditNote, CreditNoteListSerializer, None),
+)
+
+
+class InvalidToken(ValueError):
+    """Jeton ``since`` illisible"""
+
+
+def encode_token(moment):
+    delta = moment - EPOCH
+    return str((delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+
+
+def decode_token(token):
+    try:
+        value = int(token)
+    except (TypeError, ValueError):
+        raise InvalidToken(token)
+    if value < 0:
+        raise InvalidToken(token)
+    try:
+        return EPOCH + timedelta(microseconds=value)
+    except OverflowError:
+        # Au-delà de datetime.max
+        raise InvalidToken(token)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def tombstone_cutoff(now=None):
+    """Plus ancienne suppression encore connue (rétention des tombstones)"""
+    days = _setting('SYNC_TOMBSTONE_RETENTION_DAYS', 30)
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def _render(serializer_class, fields, queryset):
+    renderer = get_renderer(serializer_class, fields)
+    if renderer is not None:
+        return renderer.render(renderer.rows(queryset))
+
+    serializer = serializer_class(queryset, many=True)
+    if fields is not None:
+        for name in list(serializer.child.fields):
+            if name not in fields:
+                serializer.child.fields.pop(name)
+    return serializer.data
+
+
+class FullResyncRequired(Exception):
+    """Le client doit recharger les listes complètes"""
+
+
+def _entity_delta(model, serializer_class, fields, since, max_rows):
+    changed_qs = model.active.filter(updated_at__gte=since).order_by('updated_at', 'pk')
+    if model is not Supplier:
+        changed_qs = changed_qs.select_related('supplier')
+    if model is CreditNote:
+        changed_qs = changed_qs.select_related('invoice')
+
+    deactivated = list(
+        model.objects.filter(updated_at__gte=since, is_active=False)
+        .order_by('updated_at', 'pk')
+        .values_list('pk', flat=True)[:max_rows + 1]
+    )
+    changed = _render(serializer_class, fields, changed_qs[:max_rows + 1])
+    if len(changed) + len(deactivated) > max_rows:
+        raise FullResyncRequired
+
+    return {
+        'changed': changed,
+        'deactivated': [str(pk) for pk in deactivated],
+    }
+
+
+def compute_delta(since_token=None):
+    """
+    Changements depuis ``since_token``.
+
+    Retourne ``{'token', 'full_resync', ...entités}``. ``full_resync`` vaut
+    ``True`` sans jeton, si le jeton précède la rétention des tombstones, ou
+    si le volume dépasse ``SYNC_MAX_ROWS`` par entité.
+    """
+    now = timezone.now()
+    payload = {'token': encode_token(now), 'full_resync': True}
+
+    if since_token in (None, ''):
+        return payload
+
+    since = decode_token(since_token)
+    if since < tombstone_cutoff(now):
+        return payload
+
+    since -= timedelta(seconds=_setting('SYNC_CLOCK_SKEW_SECONDS', 5))
+    max_rows = _setting('SYNC_MAX_ROWS', 5000)
+
+    try:
+        for name, model, serializer_class, fields in SYNC_ENTITIES:
+            payload[name] = _entity_delta(model, serializer_class, fields, since, max_rows)
+    except FullResyncRequired:
+        return payload
+
+    payload['credit_notes']['deleted'] = [
+        str(pk) for pk in Tombstone.objects.filter(
+            model_label=CreditNote._meta.label_lower,
+            deleted_at__gte=since,
+        ).values_list('object_id', flat=True)
+    ]
+    payload['full_resync'] = False
+    return payload
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.sync.delta import tombstone_cutoff
+from apps.sync.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Supprime les tombstones plus anciennes que SYNC_TOMBSTONE_RETENTION_DAYS"
+
+    def handle(self, *args, **options):
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=tombstone_cutoff()).delete()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} tombstone(s) supprimée(s)"))
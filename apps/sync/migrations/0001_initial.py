@@ -0,0 +1,50 @@
+# Generated by Django 5.0.6 on 2026-10-19 02:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "model_label",
+                    models.CharField(max_length=100, verbose_name="Modèle"),
+                ),
+                ("object_id", models.UUIDField(verbose_name="Identifiant")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Supprimé le"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Suppression",
+                "verbose_name_plural": "Suppressions",
+                "db_table": "sync_tombstones",
+                "ordering": ["deleted_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["model_label", "deleted_at"],
+                        name="sync_tombst_model_l_527b09_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class Tombstone(models.Model):
+    """
+    Trace d'une suppression définitive, pour la synchronisation incrémentale
+    """
+    model_label = models.CharField(
+        max_length=100,
+        verbose_name=_('Modèle')
+    )
+
+    object_id = models.UUIDField(
+        verbose_name=_('Identifiant')
+    )
+
+    deleted_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('Supprimé le')
+    )
+
+    class Meta:
+        db_table = 'sync_tombstones'
+        verbose_name = _('Suppression')
+        verbose_name_plural = _('Suppressions')
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['model_label', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} - {self.object_id}"
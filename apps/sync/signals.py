@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.credit_notes.models import CreditNote
+from .models import Tombstone
+
+
+@receiver(post_delete, sender=CreditNote, dispatch_uid='sync_credit_note_tombstone')
+def record_credit_note_deletion(sender, instance, **kwargs):
+    """Les avoirs sont supprimés physiquement : on garde une trace pour /api/sync/"""
+    Tombstone.objects.create(
+        model_label=CreditNote._meta.label_lower,
+        object_id=instance.pk,
+    )
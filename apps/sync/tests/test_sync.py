@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.credit_notes.models import CreditNote
+from apps.invoices.models import Invoice
+from apps.suppliers.models import Supplier
+from apps.sync.delta import encode_token
+
+
+class TestDeltaSync(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="compta", password="pass", role=User.Role.COMPTABLE)
+        self.supplier = Supplier.objects.create(name="SUP A", code="SUPA", siret="12345678901234")
+        self.invoice = Invoice.objects.create(
+            supplier=self.supplier, invoice_number="F1", net_to_pay=10,
+            invoice_date=date(2026, 1, 5)
+        )
+        self.credit_note = CreditNote.objects.create(
+            supplier=self.supplier, invoice=self.invoice, credit_note_number="A1",
+            amount=5, credit_note_date=date(2026, 1, 7)
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_without_token_requires_full_resync(self):
+        r = self.client.get(reverse("sync:sync"))
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.data["full_resync"])
+        self.assertIn("token", r.data)
+
+    def test_delta_contains_changes_deactivations_and_deletions(self):
+        since = encode_token(timezone.now() - timedelta(minutes=1))
+        Invoice.objects.filter(pk=self.invoice.pk).update(is_active=False, updated_at=timezone.now())
+        credit_note_id = str(self.credit_note.pk)
+        self.credit_note.delete()
+
+        r = self.client.get(reverse("sync:sync"), {"since": since})
+
+        self.assertEqual(r.status_code, 200)
+        self.assertFalse(r.data["full_resync"])
+        self.assertEqual([row["id"] for row in r.data["suppliers"]["changed"]], [str(self.supplier.pk)])
+        self.assertEqual(r.data["invoices"]["changed"], [])
+        self.assertEqual(r.data["invoices"]["deactivated"], [str(self.invoice.pk)])
+        self.assertEqual(r.data["credit_notes"]["deleted"], [credit_note_id])
+
+    def test_invalid_token(self):
+        # Illisible, négatif, hors de timedelta, au-delà de datetime.max
+        for since in ("abc", "-1", str(10 ** 20), "253402300800000000"):
+            with self.subTest(since=since):
+                r = self.client.get(reverse("sync:sync"), {"since": since})
+                self.assertEqual(r.status_code, 400)
@@ -0,0 +1,40 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from apps.accounts.permissions import IsFinanceUser
+from .delta import InvalidToken, compute_delta
+
+
+@extend_schema(
+    summary="Synchronisation incrémentale",
+    description=(
+        "Renvoie fournisseurs, factures et avoirs modifiés depuis le jeton `since`, "
+        "les identifiants désactivés et les avoirs supprimés, ainsi que le jeton "
+        "à utiliser au prochain appel. Si `full_resync` vaut true, le client doit "
+        "recharger les listes complètes."
+    ),
+    parameters=[
+        OpenApiParameter(
+            name='since',
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description="Jeton renvoyé par l'appel précédent",
+        ),
+    ],
+    tags=["Sync"]
+)
+@api_view(['GET'])
+@permission_classes([IsFinanceUser])
+def sync(request):
+    """
+    Delta des données depuis le dernier jeton du client
+    """
+    try:
+        payload = compute_delta(request.query_params.get('since'))
+    except InvalidToken:
+        return Response({'error': 'Jeton since invalide'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(payload)
@@ -0,0 +1,144 @@
+"""
+Benchmark : rendu des listes par ModelSerializer vs FastRowRenderer
+
+Compare, à 20, 500 et 5000 lignes, le temps CPU de rendu de
+``InvoiceListSerializer`` et ``CreditNoteListSerializer`` avec le chemin
+rapide (``?render=fast``), et vérifie que le JSON produit est identique.
+
+Les instances sont construites en mémoire (pas de base requise) ; le coût
+d'hydratation des modèles par l'ORM, évité par le chemin rapide, n'est pas
+compté côté serializer : les gains mesurés sont donc un minimum.
+
+Usage :
+    python benchmarks/bench_list_rendering.py [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from apps.api.fast_render import FastRowRenderer  # noqa: E402
+from apps.credit_notes.models import CreditNote  # noqa: E402
+from apps.credit_notes.serializers import CreditNoteListSerializer  # noqa: E402
+from apps.invoices.models import Invoice  # noqa: E402
+from apps.invoices.serializers import InvoiceListSerializer  # noqa: E402
+from apps.suppliers.models import Supplier  # noqa: E402
+
+SIZES = (20, 500, 5000)
+
+
+def build_invoices(count):
+    suppliers = [
+        Supplier(id=uuid.uuid4(), name=f"Fournisseur {i}", code=f"SUP{i:03d}")
+        for i in range(20)
+    ]
+    created = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+    return [
+        Invoice(
+            id=uuid.uuid4(),
+            supplier=suppliers[i % len(suppliers)],
+            invoice_number=f"FA-{i:06d}",
+            net_to_pay=Decimal(f"{(i * 37) % 100000}.{i % 100:02d}"),
+            invoice_date=date(2026, 1, 1) + timedelta(days=i % 300),
+            due_date=(date(2026, 2, 1) + timedelta(days=i % 300)) if i % 3 else None,
+            status=Invoice.Status.PENDING,
+            notes="Livraison partielle, reliquat à facturer" if i % 4 == 0 else None,
+            month=1 + i % 12,
+            year=2026,
+            is_active=True,
+            created_at=created + timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def build_credit_notes(count):
+    invoices = build_invoices(max(count // 2, 1))
+    return [
+        CreditNote(
+            id=uuid.uuid4(),
+            supplier=invoices[i % len(invoices)].supplier,
+            invoice=invoices[i % len(invoices)] if i % 2 else None,
+            credit_note_number=f"AV-{i:06d}",
+            amount=Decimal(f"{(i * 13) % 5000 + 1}.50"),
+            credit_note_date=date(2026, 1, 1) + timedelta(days=i % 300),
+            motif="Produits périmés" if i % 3 == 0 else None,
+            month=1 + i % 12,
+            year=2026,
+            is_active=True,
+        )
+        for i in range(count)
+    ]
+
+
+def as_rows(instances, paths):
+    """Tuples équivalents à ``values_list(*paths)``"""
+    def resolve(instance, path):
+        for part in path.split('__'):
+            if instance is None:
+                return None
+            field = instance._meta.get_field(part)
+            if field.is_relation and part != path.split('__')[-1]:
+                instance = getattr(instance, part)
+            elif field.is_relation:
+                instance = getattr(instance, field.attname)
+            else:
+                instance = getattr(instance, part)
+        return instance
+
+    return [tuple(resolve(instance, path) for path in paths) for instance in instances]
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def run(repeat):
+    json_renderer = JSONRenderer()
+    cases = [
+        ('invoices', InvoiceListSerializer, build_invoices),
+        ('credit_notes', CreditNoteListSerializer, build_credit_notes),
+    ]
+
+    print(f"{'liste':<14}{'lignes':>8}{'serializer (ms)':>18}{'rapide (ms)':>14}{'gain':>8}")
+    for label, serializer_class, builder in cases:
+        renderer = FastRowRenderer(serializer_class)
+        for size in SIZES:
+            instances = builder(size)
+            rows = as_rows(instances, renderer.paths)
+
+            slow, expected = timed(lambda: serializer_class(instances, many=True).data, repeat)
+            fast, produced = timed(lambda: renderer.render(rows), repeat)
+
+            if json_renderer.render(expected) != json_renderer.render(produced):
+                raise SystemExit(f"Sortie différente pour {label} ({size} lignes)")
+
+            print(
+                f"{label:<14}{size:>8}{slow * 1000:>18.2f}{fast * 1000:>14.2f}"
+                f"{slow / fast if fast else float('inf'):>7.1f}x"
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    run(parser.parse_args().repeat)
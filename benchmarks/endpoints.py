@@ -0,0 +1,307 @@
+"""
+Benchmark des endpoints clés, avec référence JSON et seuils de régression
+
+Mesure, pour chaque endpoint, la latence p50/p95 (``--repeat`` requêtes
+après ``--warmup`` requêtes de chauffe), le nombre de requêtes SQL (le plus
+petit de quelques appels) et la mémoire allouée (pic ``tracemalloc`` pendant
+la requête, mesuré dans une passe séparée pour ne pas fausser les latences).
+
+Les requêtes passent par le client de test Django, dans le processus : ni
+réseau ni serveur, toute la pile (middlewares, authentification, throttles,
+rendu) est mesurée. Réglages par défaut : ``benchmarks.settings_load``
+(throttles évalués sans jamais refuser), base configurée (``DATABASE_URL``...).
+
+Endpoints : ``dashboard``, ``monthly_report``, ``monthly_summary``, listes et
+recherches de factures, d'avoirs et de fournisseurs, ``statistics`` du plus
+gros fournisseur et ``login`` (hachage du mot de passe compris). Les rapports
+portent sur le dernier mois de données.
+
+Une mesure régresse si elle dépasse la référence de plus de son seuil
+(``--latency-threshold``, ``--memory-threshold``, ``--queries-threshold``,
+relatifs) et d'un écart absolu minimal (latence, mémoire) qui absorbe le
+bruit des petites valeurs. Le code de sortie est alors 1 ; il vaut 2 si la
+référence n'existe pas (sauf avec ``--save``).
+
+Seules les mesures présentes dans la référence sont comparées.
+``benchmarks/baselines/queries.json``, versionnée, ne contient que les
+nombres de requêtes SQL, indépendants de la machine : ``--baseline queries``
+fait échouer toute requête supplémentaire. Elle a été enregistrée sous
+PostgreSQL, après ``migrate``, sur ``generate_load_data --suppliers 50
+--invoices 20000 --years 2 --seed 1 --end-date 2025-12-31`` (les recherches
+dépendent du nombre de résultats). Les latences et la mémoire s'enregistrent
+dans une référence locale, sur la machine de mesure.
+
+La référence fige l'existant, pas une cible : ``supplier_list`` (42) et
+``supplier_search`` (26) comptent deux requêtes par fournisseur de la page
+(N+1 sur ``invoice_count`` et ``credit_note_count``). Une correction les fera
+baisser ; la référence sera alors réenregistrée avec ``--save``.
+
+Le compte administrateur utilisé (mot de passe aléatoire) est créé pour
+l'exécution et supprimé à la fin.
+
+Usage :
+    # base peuplée, date de fin fixée pour des données identiques d'une fois à l'autre
+    python manage.py generate_load_data --suppliers 500 --invoices 1000000 --years 3 \\
+        --seed 1 --end-date 2025-12-31
+
+    python benchmarks/endpoints.py --save          # enregistre benchmarks/baselines/default.json
+    python benchmarks/endpoints.py                 # compare à la référence
+    python benchmarks/endpoints.py --only dashboard --only login --repeat 50
+
+    # nombres de requêtes seulement (référence versionnée)
+    python benchmarks/endpoints.py --baseline queries --metrics queries --repeat 1 [--save]
+"""
+import argparse
+import json
+import os
+import platform
+import secrets
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings_load')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.db.models import Count, Max  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from apps.accounts.models import User  # noqa: E402
+from apps.credit_notes.models import CreditNote  # noqa: E402
+from apps.invoices.models import Invoice  # noqa: E402
+from apps.suppliers.models import Supplier  # noqa: E402
+
+BASELINES = Path(__file__).resolve().parent / 'baselines'
+HOST = 'localhost'
+METRICS = {
+    'latency': ('p50_ms', 'p95_ms'),
+    'queries': ('queries',),
+    'memory': ('alloc_kb',),
+}
+
+# Écarts absolus en deçà desquels une hausse n'est pas une régression
+MIN_LATENCY_DELTA_MS = 2.0
+MIN_MEMORY_DELTA_KB = 64.0
+QUERY_SAMPLES = 3
+
+
+def create_user():
+    """Administrateur propre à l'exécution, mot de passe aléatoire ; à supprimer ensuite"""
+    password = secrets.token_urlsafe(24)
+    user = User.objects.create_user(
+        username=f'benchmark_{secrets.token_hex(6)}', password=password, role=User.Role.ADMIN
+    )
+    return user, password, Token.objects.create(user=user).key
+
+
+def dataset():
+    """Volumétrie de la base : une référence ne vaut que pour le même jeu de données"""
+    return {
+        'suppliers': Supplier.objects.count(),
+        'invoices': Invoice.objects.count(),
+        'credit_notes': CreditNote.objects.count(),
+    }
+
+
+def scenarios(username, password):
+    """``{nom: (méthode, chemin, données)}``"""
+    latest = Invoice.objects.aggregate(latest=Max('invoice_date'))['latest'] or timezone.localdate()
+    period = {'month': latest.month, 'year': latest.year}
+    biggest = (
+        Invoice.objects.values('supplier').annotate(count=Count('id')).order_by('-count').first()
+    )
+    supplier = biggest['supplier'] if biggest else Supplier.objects.values_list('id', flat=True).first()
+    name = Supplier.objects.filter(pk=supplier).values_list('name', flat=True).first() or ''
+    search = name.split()[0] if name else 'Pharma'
+
+    cases = {
+        'dashboard': ('get', '/api/reports/dashboard/', period),
+        'monthly_report': ('get', '/api/reports/monthly/', period),
+        'monthly_summary': ('get', '/api/reports/monthly-summary/', period),
+        'invoice_list': ('get', '/api/invoices/', {}),
+        'invoice_search': ('get', '/api/invoices/', {'search': search}),
+        'credit_note_list': ('get', '/api/credit-notes/', {}),
+        'credit_note_search': ('get', '/api/credit-notes/', {'search': search}),
+        'supplier_list': ('get', '/api/suppliers/', {}),
+        'supplier_search': ('get', '/api/suppliers/', {'search': search}),
+        'login': ('post', '/api/auth/login/', {'username': username, 'password': password}),
+    }
+    if supplier:
+        cases['supplier_statistics'] = ('get', f'/api/suppliers/{supplier}/statistics/', {})
+    return cases
+
+
+class Runner:
+    def __init__(self, token):
+        self.client = Client(SERVER_NAME=HOST)
+        self.headers = {'authorization': f'Token {token}'}
+        self.calls = 0
+
+    def call(self, method, path, data):
+        self.calls += 1
+        if method == 'post':
+            # Le throttle de login (5/minute par IP) ne vise pas le benchmark : une IP par appel
+            address = f'10.{self.calls // 65536 % 256}.{self.calls // 256 % 256}.{self.calls % 256}'
+            response = self.client.post(path, data, content_type='application/json', REMOTE_ADDR=address)
+        else:
+            response = self.client.get(path, data, headers=self.headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"{method.upper()} {path} : HTTP {response.status_code}")
+        return response
+
+    def measure(self, method, path, data, warmup, repeat, metrics=tuple(METRICS)):
+        for _ in range(warmup):
+            self.call(method, path, data)
+        results = {}
+
+        if 'latency' in metrics:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                self.call(method, path, data)
+                timings.append((time.perf_counter() - started) * 1000)
+            results['p50_ms'] = round(statistics.median(timings), 2)
+            results['p95_ms'] = round(statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0], 2)
+
+        if 'queries' in metrics:
+            # Minimum de quelques requêtes : un rafraîchissement ponctuel d'un cache
+            # (token, security stamp) ne compte pas comme une régression
+            counts = []
+            for _ in range(QUERY_SAMPLES):
+                with CaptureQueriesContext(connection) as queries:
+                    self.call(method, path, data)
+                # Lu avant la requête suivante (request_started vide le journal des requêtes)
+                counts.append(len(queries))
+            results['queries'] = min(counts)
+
+        if 'memory' in metrics:
+            tracemalloc.start()
+            try:
+                base = tracemalloc.get_traced_memory()[0]
+                self.call(method, path, data)
+                peak = tracemalloc.get_traced_memory()[1] - base
+            finally:
+                tracemalloc.stop()
+            results['alloc_kb'] = round(peak / 1024, 1)
+
+        return results
+
+
+def regressions(results, baseline, thresholds):
+    """Liste ``(endpoint, mesure, référence, valeur)`` des dépassements"""
+    found = []
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric, value in metrics.items():
+            if metric not in reference:
+                continue
+            kind = 'latency' if metric.endswith('_ms') else 'memory' if metric == 'alloc_kb' else 'queries'
+            allowed = reference[metric] * (1 + thresholds[kind])
+            floor = {'latency': MIN_LATENCY_DELTA_MS, 'memory': MIN_MEMORY_DELTA_KB, 'queries': 0}[kind]
+            if value > allowed and value - reference[metric] > floor:
+                found.append((name, metric, reference[metric], value))
+    return found
+
+
+def print_results(results, baseline):
+    print(f"{'endpoint':<22}{'p50 ms':>18}{'p95 ms':>18}{'requêtes':>14}{'alloc Ko':>18}")
+    for name, metrics in results.items():
+        reference = baseline.get(name, {})
+
+        def cell(metric, width):
+            if metric not in metrics:
+                return f"{'-':>{width}}"
+            value = f"{metrics[metric]:g}"
+            if metric in reference and reference[metric]:
+                value += f" ({(metrics[metric] / reference[metric] - 1) * 100:+.0f}%)"
+            return f"{value:>{width}}"
+
+        print(f"{name:<22}{cell('p50_ms', 18)}{cell('p95_ms', 18)}{cell('queries', 14)}{cell('alloc_kb', 18)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baseline', default='default', help="Nom de la référence (benchmarks/baselines/<nom>.json)")
+    parser.add_argument('--save', action='store_true', help="Enregistre les mesures comme référence")
+    parser.add_argument('--only', action='append', help="Endpoint à mesurer (répétable)")
+    parser.add_argument('--metrics', action='append', choices=list(METRICS),
+                        help="Mesures à prendre (répétable, défaut : toutes)")
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--latency-threshold', type=float, default=0.3)
+    parser.add_argument('--memory-threshold', type=float, default=0.25)
+    parser.add_argument('--queries-threshold', type=float, default=0.0)
+    args = parser.parse_args()
+
+    path = BASELINES / f'{args.baseline}.json'
+    stored = json.loads(path.read_text()) if path.exists() else None
+    if stored is None and not args.save:
+        print(f"Aucune référence {path.relative_to(ROOT)} : relancer avec --save pour l'enregistrer", file=sys.stderr)
+        return 2
+
+    user, password, token = create_user()
+    try:
+        cases = scenarios(user.username, password)
+        selected = args.only or list(cases)
+        unknown = set(selected) - set(cases)
+        if unknown:
+            parser.error(f"endpoint(s) inconnu(s) : {', '.join(sorted(unknown))} (disponibles : {', '.join(cases)})")
+
+        runner = Runner(token)
+        metrics = args.metrics or list(METRICS)
+        results = {name: runner.measure(*cases[name], args.warmup, args.repeat, metrics) for name in selected}
+    finally:
+        user.delete()
+    current_dataset = dataset()
+
+    if args.save:
+        BASELINES.mkdir(exist_ok=True)
+        endpoints = {**(stored or {}).get('endpoints', {}), **results} if args.only else results
+        path.write_text(json.dumps({
+            'meta': {
+                'dataset': current_dataset,
+                'vendor': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'repeat': args.repeat,
+                'metrics': metrics,
+                'recorded_at': timezone.now().isoformat(timespec='seconds'),
+            },
+            'endpoints': endpoints,
+        }, indent=2) + '\n')
+        print_results(results, {})
+        print(f"\nRéférence enregistrée : {path.relative_to(ROOT)}")
+        return 0
+
+    baseline = stored['endpoints']
+    print_results(results, baseline)
+    if stored['meta'].get('dataset') != current_dataset:
+        print(f"\nAttention : jeu de données différent de la référence ({stored['meta'].get('dataset')})")
+
+    found = regressions(results, baseline, {
+        'latency': args.latency_threshold, 'memory': args.memory_threshold, 'queries': args.queries_threshold,
+    })
+    if found:
+        print("\nRégressions :")
+        for name, metric, reference, value in found:
+            print(f"  {name} {metric} : {reference:g} -> {value:g}")
+        return 1
+    print("\nAucune régression")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+Plans d'exécution des accès « lignes actives » (index partiels WHERE is_active)
+
+Affiche ``EXPLAIN`` pour les requêtes des viewsets et rapports qui passent par
+``Model.active``. À lancer avant et après la migration des index partiels sur
+une base peuplée (``ANALYZE`` conseillé) pour comparer les plans.
+
+Usage :
+    python benchmarks/explain_active_indexes.py [--analyze]
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from apps.credit_notes.models import CreditNote  # noqa: E402
+from apps.invoices.models import Invoice  # noqa: E402
+from apps.suppliers.models import Supplier  # noqa: E402
+
+
+def queries():
+    invoice = Invoice.objects.order_by().values('supplier_id', 'month', 'year', 'invoice_date').first() or {}
+    supplier_id = invoice.get('supplier_id')
+    month, year = invoice.get('month', 1), invoice.get('year', 2026)
+    day = invoice.get('invoice_date')
+
+    yield "factures actives d'un fournisseur", Invoice.active.filter(supplier_id=supplier_id).order_by('-invoice_date')
+    yield "factures actives sur une période", Invoice.active.filter(month=month, year=year)
+    yield "factures actives depuis une date", Invoice.active.filter(invoice_date__gte=day).order_by('invoice_date') \
+        if day else Invoice.active.order_by('invoice_date')
+    yield "avoirs actifs d'un fournisseur", CreditNote.active.filter(supplier_id=supplier_id).order_by('-credit_note_date')
+    yield "avoirs actifs sur une période", CreditNote.active.filter(month=month, year=year)
+    yield "fournisseurs actifs", Supplier.active.order_by('name')
+
+
+def run(analyze):
+    options = {}
+    if analyze and connection.vendor == 'postgresql':
+        options = {'analyze': True, 'buffers': True}
+
+    for label, queryset in queries():
+        print(f"-- {label}")
+        print(queryset.explain(**options))
+        print()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--analyze', action='store_true', help="EXPLAIN ANALYZE (PostgreSQL)")
+    run(parser.parse_args().analyze)
@@ -0,0 +1,199 @@
+"""
+Test de charge : profils gunicorn ``sync`` (WSGI) et ``asgi`` (uvicorn)
+
+Trafic de tableau de bord concurrent : ``dashboard`` (3/5 des requêtes),
+``monthly`` (1/5) et ``health`` (1/5), envoyé par ``--concurrency`` clients
+(connexions keep-alive) pendant ``--duration`` secondes. Affiche, par
+endpoint, le nombre de requêtes, les erreurs et les latences p50/p95/max,
+ainsi que le débit global.
+
+La latence de ``health`` sous charge montre si des rapports lents
+monopolisent les workers.
+
+Usage :
+    # serveur déjà lancé, token d'un utilisateur finance
+    python benchmarks/load_dashboard.py --url http://127.0.0.1:8000 --token <clé>
+
+    # lance gunicorn dans chaque profil (réglages benchmarks.settings_load)
+    # et compare ; utilise la base configurée (DATABASE_URL...)
+    python benchmarks/load_dashboard.py --compare [--workers 3] [--concurrency 32]
+"""
+import argparse
+import http.client
+import itertools
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings_load')
+
+LOAD_USERNAME = 'loadtest'
+
+
+def traffic_mix(month, year):
+    period = urlencode({'month': month, 'year': year})
+    return [
+        ('dashboard', '/api/reports/dashboard/'),
+        ('dashboard', '/api/reports/dashboard/'),
+        ('dashboard', f'/api/reports/dashboard/?{period}'),
+        ('monthly', f'/api/reports/monthly/?{period}'),
+        ('health', '/api/health/'),
+    ]
+
+
+def ensure_token():
+    """Token d'un administrateur dédié aux tests de charge"""
+    import django
+
+    django.setup()
+
+    from rest_framework.authtoken.models import Token
+
+    from apps.accounts.models import User
+
+    user, created = User.objects.get_or_create(username=LOAD_USERNAME, defaults={'role': User.Role.ADMIN})
+    if created:
+        user.set_unusable_password()
+        user.save()
+    return Token.objects.get_or_create(user=user)[0].key
+
+
+def run_load(base_url, token, concurrency, duration, month, year):
+    parts = urlsplit(base_url)
+    headers = {'Authorization': f'Token {token}', 'Connection': 'keep-alive'}
+    mix = traffic_mix(month, year)
+    timings = {name: [] for name, _ in mix}
+    errors = {name: 0 for name, _ in mix}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+        requests = itertools.islice(itertools.cycle(mix), offset, None)
+        local = []
+        while time.monotonic() < deadline:
+            name, path = next(requests)
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                failed = response.status >= 400
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+                failed = True
+            local.append((name, time.perf_counter() - started, failed))
+        connection.close()
+        with lock:
+            for name, elapsed, failed in local:
+                if failed:
+                    errors[name] += 1
+                else:
+                    timings[name].append(elapsed)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    results = {}
+    for name in timings:
+        values = sorted(timings[name])
+        results[name] = {
+            'requests': len(values),
+            'errors': errors[name],
+            'p50_ms': statistics.median(values) * 1000 if values else None,
+            'p95_ms': values[int(len(values) * 0.95) - 1] * 1000 if values else None,
+            'max_ms': values[-1] * 1000 if values else None,
+        }
+    total = sum(len(values) for values in timings.values())
+    return results, total / elapsed
+
+
+def print_results(title, results, throughput):
+    print(f"\n{title} — {throughput:.1f} req/s")
+    print(f"{'endpoint':<10} {'requêtes':>9} {'erreurs':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for name, row in results.items():
+        cells = [f"{row[key]:9.1f}" if row[key] is not None else f"{'-':>9}" for key in ('p50_ms', 'p95_ms', 'max_ms')]
+        print(f"{name:<10} {row['requests']:>9} {row['errors']:>8} {' '.join(cells)}")
+
+
+def wait_ready(base_url, timeout=30):
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            connection.request('GET', '/api/health/')
+            if connection.getresponse().status == 200:
+                return
+        except (OSError, http.client.HTTPException):
+            pass
+        time.sleep(0.3)
+    raise RuntimeError(f"Serveur injoignable : {base_url}")
+
+
+def compare(args):
+    token = ensure_token()
+    base_url = f'http://127.0.0.1:{args.port}'
+    for profile in ('sync', 'asgi'):
+        env = dict(
+            os.environ,
+            GUNICORN_PROFILE=profile,
+            GUNICORN_BIND=f'127.0.0.1:{args.port}',
+            GUNICORN_WORKERS=str(args.workers),
+            GUNICORN_ACCESSLOG='',
+        )
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'config/gunicorn.py'],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_ready(base_url)
+            run_load(base_url, token, args.concurrency, 2, args.month, args.year)  # chauffe
+            results, throughput = run_load(
+                base_url, token, args.concurrency, args.duration, args.month, args.year
+            )
+            print_results(f"profil {profile} ({args.workers} workers, {args.concurrency} clients)", results, throughput)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--token')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--month', type=int, default=time.localtime().tm_mon)
+    parser.add_argument('--year', type=int, default=time.localtime().tm_year)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args)
+        return
+
+    results, throughput = run_load(
+        args.url, args.token or ensure_token(), args.concurrency, args.duration, args.month, args.year
+    )
+    print_results(args.url, results, throughput)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+"""
+Réglages des tests de charge : ``config.settings`` avec des taux de
+throttling relevés (les throttles restent évalués, sans jamais refuser)
+"""
+from config.settings import *  # noqa: F401,F403
+from config.settings import REST_FRAMEWORK
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {
+        scope: '1000000/hour' for scope in REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {})
+    },
+}
@@ -0,0 +1,75 @@
+"""
+Configuration gunicorn : ``gunicorn -c config/gunicorn.py``
+
+``GUNICORN_PROFILE`` choisit le mode de service :
+
+- ``sync`` (défaut) : workers synchrones, ``config.wsgi`` ; une requête
+  occupe un worker du début à la fin ;
+- ``asgi`` : workers uvicorn (paquet ``uvicorn-worker``), ``config.asgi`` ;
+  les vues asynchrones (rapports, health check) rendent la main à la boucle
+  pendant leurs requêtes SQL, un worker sert plusieurs requêtes à la fois.
+
+Sous ASGI, les connexions persistantes (``CONN_MAX_AGE``) ne sont pas
+réutilisées d'une requête à l'autre : chaque requête ouvre sa connexion.
+
+Comparaison des deux profils : ``benchmarks/load_dashboard.py --compare``.
+
+Les workers partagent leurs métriques (``/api/metrics/``) par des fichiers
+sous ``PERF_METRICS_DIR`` (un répertoire temporaire par défaut), vidé au
+démarrage du serveur.
+"""
+import glob
+import os
+import tempfile
+
+PROFILES = {
+    'sync': {
+        'worker_class': 'sync',
+        'wsgi_app': 'config.wsgi:application',
+    },
+    'asgi': {
+        'worker_class': 'uvicorn_worker.UvicornWorker',
+        'wsgi_app': 'config.asgi:application',
+    },
+}
+
+profile = os.environ.get('GUNICORN_PROFILE', 'sync')
+if profile not in PROFILES:
+    raise ValueError(f"GUNICORN_PROFILE inconnu : {profile} (attendu : {', '.join(PROFILES)})")
+
+worker_class = PROFILES[profile]['worker_class']
+wsgi_app = PROFILES[profile]['wsgi_app']
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 3))
+worker_connections = 1000
+max_requests = 1000
+max_requests_jitter = 100
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = 2
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None
+errorlog = '-'
+
+# Hérité par les workers ; lu par les settings (PERF_METRICS_DIR)
+metrics_dir = os.environ.setdefault('PERF_METRICS_DIR', os.path.join(tempfile.gettempdir(), 'pharmacy-metrics'))
+
+
+def on_starting(server):
+    # Compteurs remis à zéro à chaque démarrage (voir apps/perf/metrics.py)
+    for path in glob.glob(os.path.join(metrics_dir, 'metrics_*.db')):
+        os.remove(path)
+
+
+def post_worker_init(worker):
+    # Purge périodique des ExpiringToken (EXPIRING_TOKEN_SWEEP_INTERVAL) : dans
+    # les workers du serveur seulement, jamais dans les commandes manage.py.
+    # Application pas encore chargée sous uvicorn : Django initialisé ici.
+    import django
+    from django.apps import apps
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    if not apps.ready:
+        django.setup()
+
+    from apps.accounts.token_sweeper import start_periodic_sweep
+    start_periodic_sweep()
@@ -16,7 +16,14 @@ else:
     
     # Basic configuration for unknown environment
     DEBUG = False
+    # Un seul processus (tests) : compteurs de débit et cache en mémoire
+    RATELIMIT_BACKEND = os.environ.get("RATELIMIT_BACKEND", "apps.ratelimit.backends.MemoryBackend")
+    CACHES = {"default": CACHE_BACKENDS[os.environ.get("CACHE_BACKEND", "locmem")]}
     ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
+    # Blacklist JWT comme en production, si simplejwt est installé (tests)
+    import importlib.util
+    if importlib.util.find_spec("rest_framework_simplejwt"):
+        INSTALLED_APPS = INSTALLED_APPS + ["rest_framework_simplejwt.token_blacklist"]
     
     # Database fallback
     import dj_database_url
@@ -35,13 +42,14 @@ else:
                 "PORT": os.environ.get("DB_PORT", "5432"),
             }
         }
+    DATABASES["default"] = with_connection_settings(DATABASES["default"])
 
 # ======================
 # DJANGO REST FRAMEWORK
 # ======================
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "apps.accounts.token_auth.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -57,8 +65,8 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     # Rate limiting
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
+        "apps.ratelimit.throttles.AnonRateThrottle",
+        "apps.ratelimit.throttles.UserRateThrottle"
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/hour",
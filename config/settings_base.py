@@ -3,7 +3,7 @@ Base settings for Pharmacy Backend
 Common settings shared across environments
 """
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 import dj_database_url
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -62,12 +62,19 @@ INSTALLED_APPS = [
     "apps.credit_notes",
     "apps.reports",
     "apps.health",
+    "apps.sync",
+    "apps.partitioning",
+    "apps.archive",
+    "apps.ratelimit",
+    "apps.perf",
 ]
 
 # ======================
 # MIDDLEWARE
 # ======================
 MIDDLEWARE = [
+    # Mesure toute la chaîne : en premier
+    "apps.perf.middleware.PerformanceMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -83,7 +90,7 @@ MIDDLEWARE = [
 # ======================
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "apps.accounts.token_auth.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -96,9 +103,9 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
     ],
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.ScopedRateThrottle",
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
+        "apps.ratelimit.throttles.ScopedRateThrottle",
+        "apps.ratelimit.throttles.AnonRateThrottle",
+        "apps.ratelimit.throttles.UserRateThrottle"
     ],
     "DEFAULT_THROTTLE_RATES": {
         "login": "5/minute",
@@ -167,6 +174,105 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# ======================
+# DATABASE CONNECTIONS
+# ======================
+# Connexions persistantes (workers sync) : réutilisées pendant DB_CONN_MAX_AGE
+# secondes, vérifiées avant réutilisation (CONN_HEALTH_CHECKS).
+# DB_POOL : pool psycopg 3 par processus (workers ASGI ou threads), nécessite
+# le paquet psycopg[pool] ; voir apps/dbpool.
+DB_CONN_MAX_AGE = config("DB_CONN_MAX_AGE", default=60, cast=int)
+DB_CONN_HEALTH_CHECKS = config("DB_CONN_HEALTH_CHECKS", default=True, cast=bool)
+DB_POOL = config("DB_POOL", default=False, cast=bool)
+DB_POOL_MIN_SIZE = config("DB_POOL_MIN_SIZE", default=2, cast=int)
+DB_POOL_MAX_SIZE = config("DB_POOL_MAX_SIZE", default=10, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=10.0, cast=float)
+
+
+def with_connection_settings(database):
+    """Réglages de connexion communs, appliqués au DATABASES["default"] de chaque environnement"""
+    database = dict(database)
+    if DB_POOL and database.get("ENGINE") == "django.db.backends.postgresql":
+        database["ENGINE"] = "apps.dbpool.postgresql"
+        # La connexion est rendue au pool à la fin de chaque requête
+        database["CONN_MAX_AGE"] = 0
+    else:
+        database["CONN_MAX_AGE"] = DB_CONN_MAX_AGE
+    database["CONN_HEALTH_CHECKS"] = DB_CONN_HEALTH_CHECKS
+    return database
+
+
+# ======================
+# DATABASE PARTITIONING
+# ======================
+# Partitionnement par année des factures et avoirs (PostgreSQL, voir apps/partitioning)
+DB_PARTITION_BY_YEAR = config("DB_PARTITION_BY_YEAR", default=False, cast=bool)
+
+# ======================
+# CACHE
+# ======================
+# Cache partagé entre workers, second niveau de apps/cache/tiered.py :
+# file (défaut), db (table créée par createcachetable), redis (tout serveur
+# au protocole Redis, paquet redis requis) ou locmem (propre au processus)
+CACHE_BACKENDS = {
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": config("CACHE_FILE_DIR", default=str(BASE_DIR / "var" / "cache")),
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": config("CACHE_REDIS_URL", default="redis://localhost:6379/1"),
+    },
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+}
+CACHES = {"default": CACHE_BACKENDS[config("CACHE_BACKEND", default="file")]}
+
+# ======================
+# PERFORMANCE INSTRUMENTATION
+# ======================
+# Profil de chaque requête (apps/perf) : Server-Timing pour les administrateurs,
+# log échantillonné, tampon des requêtes lentes (/api/perf/slow-requests/)
+PERF_SLOW_REQUEST_MS = config("PERF_SLOW_REQUEST_MS", default=500, cast=int)
+PERF_SLOW_REQUESTS_SIZE = config("PERF_SLOW_REQUESTS_SIZE", default=100, cast=int)
+PERF_LOG_SAMPLE_RATE = config("PERF_LOG_SAMPLE_RATE", default=0.01, cast=float)
+# /api/metrics/ : fichiers partagés par les workers (vide : mémoire du processus),
+# réseaux autorisés, intervalle de recopie des compteurs cumulés (secondes)
+PERF_METRICS_DIR = config("PERF_METRICS_DIR", default="")
+PERF_METRICS_ALLOWED_NETWORKS = config("PERF_METRICS_ALLOWED_NETWORKS", default="127.0.0.1/32,::1/128", cast=Csv())
+PERF_METRICS_REFRESH = config("PERF_METRICS_REFRESH", default=5, cast=int)
+# Requêtes SQL lentes (apps/perf/slow_queries.py ; seuil négatif : désactivé),
+# enregistrées hors requête ; plan EXPLAIN pour une fraction d'entre elles
+PERF_SLOW_QUERY_MS = config("PERF_SLOW_QUERY_MS", default=200, cast=int)
+PERF_SLOW_QUERY_FLUSH_INTERVAL = config("PERF_SLOW_QUERY_FLUSH_INTERVAL", default=5, cast=int)
+PERF_EXPLAIN_SAMPLE_RATE = config("PERF_EXPLAIN_SAMPLE_RATE", default=0.1, cast=float)
+PERF_EXPLAIN_INTERVAL = config("PERF_EXPLAIN_INTERVAL", default=3600, cast=int)
+
+# ======================
+# AUTH TOKEN CACHE
+# ======================
+# Instantanés token → utilisateur (voir apps/accounts/token_auth.py)
+AUTH_TOKEN_CACHE_TTL = config("AUTH_TOKEN_CACHE_TTL", default=300, cast=int)
+AUTH_TOKEN_CACHE_LOCAL_TTL = config("AUTH_TOKEN_CACHE_LOCAL_TTL", default=2, cast=int)
+# Purge des ExpiringToken expirés ou révoqués (apps/accounts/token_sweeper.py) ;
+# thread périodique dans les workers gunicorn seulement (config/gunicorn.py) ;
+# 0 : pas de thread périodique, commande sweep_expiring_tokens seulement
+EXPIRING_TOKEN_SWEEP_INTERVAL = config("EXPIRING_TOKEN_SWEEP_INTERVAL", default=0, cast=int)
+EXPIRING_TOKEN_SWEEP_BATCH_SIZE = config("EXPIRING_TOKEN_SWEEP_BATCH_SIZE", default=1000, cast=int)
+
+# ======================
+# RATE LIMITING
+# ======================
+# Backend GCRA partagé des throttles (apps/ratelimit/backends.py) :
+# DatabaseBackend, FileBackend, RedisBackend ou MemoryBackend (un seul processus)
+RATELIMIT_BACKEND = config("RATELIMIT_BACKEND", default="apps.ratelimit.backends.DatabaseBackend")
+RATELIMIT_REDIS_URL = config("RATELIMIT_REDIS_URL", default="redis://localhost:6379/0")
+
 # ======================
 # DEFAULT FIELD
 # ======================
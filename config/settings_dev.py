@@ -37,6 +37,7 @@ DATABASES = {
         }
     }
 }
+DATABASES["default"] = with_connection_settings(DATABASES["default"])
 
 # ======================
 # CORS - DEV
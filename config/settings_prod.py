@@ -36,6 +36,8 @@ X_FRAME_OPTIONS = 'DENY'
 # ======================
 # API STATELESS = PAS de CSRF middleware
 MIDDLEWARE = [
+    # Mesure toute la chaîne : en premier
+    "apps.perf.middleware.PerformanceMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # DOIT être en premier
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -95,6 +97,8 @@ else:
         }
     }
 
+DATABASES["default"] = with_connection_settings(DATABASES["default"])
+
 # ======================
 # TEMPLATES - PRODUCTION
 # ======================
@@ -197,6 +201,17 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Blacklist des refresh tokens (ROTATE_REFRESH_TOKENS / BLACKLIST_AFTER_ROTATION),
+# purgée par `manage.py prune_jwt_tokens`
+INSTALLED_APPS = INSTALLED_APPS + ["rest_framework_simplejwt.token_blacklist"]
+
+# JTI blacklistés : filtre de Bloom par processus (apps/accounts/blacklist_filter.py)
+JWT_BLACKLIST_FILTER_REFRESH = int(os.environ.get('JWT_BLACKLIST_FILTER_REFRESH', '300'))
+
+# Utilisateur reconstruit depuis les claims (rôle, is_active, security stamp)
+# au lieu d'une lecture de accounts_users par requête (apps/accounts/token_user.py)
+JWT_STATELESS_USER = os.environ.get('JWT_STATELESS_USER', 'false').lower() == 'true'
+
 # ======================
 # DJANGO REST FRAMEWORK
 # ======================
@@ -217,9 +232,9 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     # Rate limiting
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.ScopedRateThrottle",
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
+        "apps.ratelimit.throttles.ScopedRateThrottle",
+        "apps.ratelimit.throttles.AnonRateThrottle",
+        "apps.ratelimit.throttles.UserRateThrottle"
     ],
     "DEFAULT_THROTTLE_RATES": {
         "login": "5/minute",
@@ -21,6 +21,8 @@ from django.conf.urls.static import static
 from django.http import JsonResponse
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from apps.perf.views import prometheus_metrics
+
 def api_info(request):
     """API root endpoint with basic information"""
     # En production, ne pas révéler les endpoints
@@ -43,7 +45,8 @@ def api_info(request):
             'suppliers': '/api/suppliers/',
             'invoices': '/api/invoices/',
             'credit_notes': '/api/credit-notes/',
-            'reports': '/api/reports/'
+            'reports': '/api/reports/',
+            'sync': '/api/sync/'
         }
     })
 
@@ -63,6 +66,9 @@ urlpatterns = [
     path('api/invoices/', include('apps.invoices.urls')),
     path('api/credit-notes/', include('apps.credit_notes.urls')),
     path('api/reports/', include('apps.reports.urls')),
+    path('api/sync/', include('apps.sync.urls')),
+    path('api/perf/', include('apps.perf.urls')),
+    path('api/metrics/', prometheus_metrics, name='metrics'),
 ]
 
 # API root seulement en développement